@@ -1,5 +1,11 @@
+import asyncio
 import os
-from ldap3 import Server, Connection, ALL, NTLM, SUBTREE
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ldap3 import Server, Connection, NONE, NTLM
+from ldap3.utils.conv import escape_filter_chars
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -7,34 +13,151 @@ load_dotenv()
 LDAP_SERVER_URI = os.getenv("LDAP_SERVER_URI")
 LDAP_BASE_DN = os.getenv("LDAP_BASE_DN")
 
-def authenticate_ldap_user(username, password):
-    if not LDAP_SERVER_URI:
-        return None
-
-    try:
-        server = Server(LDAP_SERVER_URI, get_info=ALL)
-        conn = Connection(server, user=username, password=password, authentication=NTLM, auto_bind=True)
-        
-        if conn.bound:
+# Tamanho do pool de conexões (e de threads) usado para autenticar no LDAP.
+LDAP_POOL_SIZE = int(os.getenv("LDAP_POOL_SIZE", "4"))
+# Timeouts, em segundos, para abrir a conexão e para aguardar respostas do servidor.
+LDAP_CONNECT_TIMEOUT = float(os.getenv("LDAP_CONNECT_TIMEOUT", "5"))
+LDAP_RECEIVE_TIMEOUT = float(os.getenv("LDAP_RECEIVE_TIMEOUT", "10"))
+# Por quanto tempo (segundos) um usuário autenticado localmente deixa de ser tentado no LDAP.
+LDAP_LOCAL_USER_CACHE_TTL = float(os.getenv("LDAP_LOCAL_USER_CACHE_TTL", "900"))
+
+
+class LDAPAuthenticator:
+    """
+    Autenticador LDAP com pool de conexões, executado fora do event loop.
+
+    As conexões são reaproveitadas entre logins: cada autenticação pega uma
+    conexão ociosa do pool, faz o rebind NTLM com as credenciais do usuário,
+    busca os atributos e devolve a conexão. Usuários que já se autenticaram
+    localmente (sem `ldap_dn`) ficam num cache negativo e não passam pelo LDAP
+    até o cache expirar.
+    """
+
+    def __init__(
+        self,
+        server_uri: str | None,
+        base_dn: str | None,
+        pool_size: int = 4,
+        connect_timeout: float = 5,
+        receive_timeout: float = 10,
+        local_user_ttl: float = 900,
+    ):
+        self.server_uri = server_uri
+        self.base_dn = base_dn
+        self.pool_size = max(1, pool_size)
+        self.connect_timeout = connect_timeout
+        self.receive_timeout = receive_timeout
+        self.local_user_ttl = local_user_ttl
+        self._server = None
+        self._idle: "queue.LifoQueue[Connection]" = queue.LifoQueue(maxsize=self.pool_size)
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="ldap-auth")
+        self._local_only: dict[str, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.server_uri)
+
+    # --- Cache negativo de usuários locais ---
+
+    def is_local_only(self, username: str) -> bool:
+        expires_at = self._local_only.get(username)
+        if expires_at is None:
+            return False
+        if expires_at < time.monotonic():
+            del self._local_only[username]
+            return False
+        return True
+
+    def mark_local_only(self, username: str):
+        if self.local_user_ttl > 0:
+            self._local_only[username] = time.monotonic() + self.local_user_ttl
+
+    def forget_local_only(self, username: str):
+        self._local_only.pop(username, None)
+
+    # --- Pool de conexões ---
+
+    def _get_server(self) -> Server:
+        if self._server is None:
+            # get_info=NONE evita a leitura do schema/DSE a cada nova conexão.
+            self._server = Server(self.server_uri, get_info=NONE, connect_timeout=self.connect_timeout)
+        return self._server
+
+    def _acquire(self) -> Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return Connection(
+                self._get_server(),
+                authentication=NTLM,
+                receive_timeout=self.receive_timeout,
+            )
+
+    def _release(self, conn: Connection):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            self._discard(conn)
+
+    def _discard(self, conn: Connection):
+        try:
+            conn.unbind()
+        except Exception:
+            pass
+
+    def authenticate_sync(self, username: str, password: str) -> dict | None:
+        if not self.enabled:
+            return None
+
+        conn = self._acquire()
+        try:
+            if not conn.rebind(user=username, password=password, authentication=NTLM):
+                self._release(conn)
+                return None
+
             # search_filter = f'(sAMAccountName={username.split("\\")[-1]})' # for Active Directory
-            search_filter = f'(uid={username})' # for OpenLDAP
-            conn.search(LDAP_BASE_DN, search_filter, attributes=['cn', 'displayName'])
-            
-            if conn.entries:
-                user_entry = conn.entries[0]
-                user_info = {
-                    "username": username,
-                    "dn": user_entry.entry_dn,
-                    "cn": user_entry.cn.value if 'cn' in user_entry else user_entry.displayName.value
-                }
-                conn.unbind()
-                return user_info
-            else:
-                conn.unbind()
-                return None # User authenticated but not found in search
-
-    except Exception as e:
-        print(f"LDAP Authentication failed: {e}")
-        return None
-    
-    return None
+            search_filter = f'(uid={escape_filter_chars(username)})' # for OpenLDAP
+            conn.search(self.base_dn, search_filter, attributes=['cn', 'displayName', 'mail'])
+            entries = list(conn.entries)
+            self._release(conn)
+        except Exception as e:
+            print(f"LDAP Authentication failed: {e}")
+            # A conexão pode ter ficado em estado inconsistente; não volta para o pool.
+            self._discard(conn)
+            return None
+
+        if not entries:
+            return None # User authenticated but not found in search
+
+        user_entry = entries[0]
+        return {
+            "username": username,
+            "dn": user_entry.entry_dn,
+            "cn": user_entry.cn.value if 'cn' in user_entry else user_entry.displayName.value,
+            "mail": user_entry.mail.value if 'mail' in user_entry else None,
+        }
+
+    async def authenticate(self, username: str, password: str) -> dict | None:
+        """
+        Autentica o usuário no LDAP sem bloquear o event loop.
+        Retorna None se o LDAP não estiver configurado, se o usuário for
+        conhecido como local ou se as credenciais forem recusadas.
+        """
+        if not self.enabled or self.is_local_only(username):
+            return None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.authenticate_sync, username, password)
+
+
+ldap_authenticator = LDAPAuthenticator(
+    LDAP_SERVER_URI,
+    LDAP_BASE_DN,
+    pool_size=LDAP_POOL_SIZE,
+    connect_timeout=LDAP_CONNECT_TIMEOUT,
+    receive_timeout=LDAP_RECEIVE_TIMEOUT,
+    local_user_ttl=LDAP_LOCAL_USER_CACHE_TTL,
+)
+
+
+def authenticate_ldap_user(username, password):
+    return ldap_authenticator.authenticate_sync(username, password)
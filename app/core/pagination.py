@@ -0,0 +1,70 @@
+import base64
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+
+# Cabeçalho HTTP em que as listagens devolvem o cursor da próxima página.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+_DECODERS = {
+    uuid.UUID: uuid.UUID,
+    datetime: datetime.fromisoformat,
+    date: date.fromisoformat,
+    Decimal: Decimal,
+    int: int,
+    float: float,
+    str: str,
+}
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Serializa os valores da chave do último item em um cursor opaco (base64)."""
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else str(v) for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> list:
+    """Converte o cursor de volta para valores tipados conforme as colunas da chave."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if len(raw) != len(columns):
+            raise ValueError("cursor length mismatch")
+        return [_DECODERS[column.type.python_type](value) for column, value in zip(columns, raw)]
+    except (ValueError, KeyError, TypeError, NotImplementedError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor de paginação inválido.")
+
+
+def paginate(stmt, columns: Sequence, cursor: Optional[str], skip: int, limit: int, descending: bool = False):
+    """
+    Ordena a consulta pela chave `columns` (que deve terminar em uma coluna única, ex.: id)
+    e aplica a paginação por cursor (keyset) quando `cursor` é informado.
+    Sem cursor, mantém o comportamento de skip/limit, agora com ordenação estável.
+    """
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        key = tuple_(*columns)
+        stmt = stmt.filter(key < tuple_(*values) if descending else key > tuple_(*values))
+    elif skip:
+        stmt = stmt.offset(skip)
+    order = [c.desc() for c in columns] if descending else list(columns)
+    return stmt.order_by(*order).limit(limit)
+
+
+def next_cursor(items: Sequence, columns: Sequence, limit: int) -> Optional[str]:
+    """Cursor para a página seguinte, ou None se a página atual foi a última."""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor([getattr(last, column.key) for column in columns])
+
+
+def set_next_cursor(response: Response, items: Sequence, columns: Sequence, limit: int):
+    cursor = next_cursor(items, columns, limit)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -1,4 +1,6 @@
 # Importações de bibliotecas para manipulação de data/hora, tipos e segurança.
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
@@ -35,6 +37,51 @@ def get_password_hash(password: str) -> str:
     """
     return pwd_context.hash(password)
 
+# --- Hashing de Senhas fora do event loop ---
+
+# O bcrypt leva ~100-300 ms por chamada. Executá-lo diretamente dentro de uma rota
+# assíncrona bloqueia o event loop e todas as outras requisições do worker.
+# As versões assíncronas abaixo delegam o trabalho a um pool de threads limitado
+# (a biblioteca bcrypt libera o GIL durante o cálculo).
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+# Número de operações submetidas ao pool que ainda não terminaram (em execução + na fila).
+_password_jobs_pending = 0
+
+async def _run_in_password_pool(func, *args):
+    global _password_jobs_pending
+    loop = asyncio.get_running_loop()
+    _password_jobs_pending += 1
+    try:
+        return await loop.run_in_executor(_password_executor, func, *args)
+    finally:
+        _password_jobs_pending -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Versão assíncrona de `verify_password`, executada no pool de hashing.
+    """
+    return await _run_in_password_pool(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Versão assíncrona de `get_password_hash`, executada no pool de hashing.
+    """
+    return await _run_in_password_pool(get_password_hash, password)
+
+def password_pool_stats() -> dict:
+    """
+    Retorna o tamanho do pool e a profundidade da fila de hashing de senhas.
+    """
+    workers = settings.PASSWORD_HASH_WORKERS
+    return {
+        "workers": workers,
+        "pending": _password_jobs_pending,
+        "queue_depth": max(0, _password_jobs_pending - workers),
+    }
+
 # --- Manipulação de Token JWT ---
 
 # Função para criar um novo token de acesso JWT.
@@ -80,7 +127,7 @@ def decode_access_token(token: str):
             return None
         
         # Retorna os dados do payload validados pelo schema TokenData.
-        return TokenData(username=username)
+        return TokenData(username=username, tenant_id=payload.get("tenant_id"))
     except JWTError as e:
         print(f"DEBUG: JWTError decoding token: {e}")
         # Se qualquer erro de JWT ocorrer (assinatura inválida, expirado, etc.), retorna None.
@@ -0,0 +1,118 @@
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Limite de arquivos por subpasta de documentos.
+FILES_PER_FOLDER = 400
+
+INDEX_FILE_NAME = ".slots.json"
+LOCK_FILE_NAME = ".slots.lock"
+
+
+@contextmanager
+def _exclusive_lock(lock_path: Path):
+    """Lock exclusivo entre processos (vários workers do uvicorn) sobre um arquivo."""
+    with open(lock_path, "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class FolderAllocator:
+    """
+    Aloca vagas em subpastas sequenciais (0001, 0002, ...) de no máximo
+    `files_per_folder` arquivos, sem listar diretórios a cada arquivo salvo.
+
+    O estado de cada diretório base (pasta atual e quantas vagas já foram
+    entregues nela) fica num índice `.slots.json` dentro dele, protegido por
+    um lock de arquivo, então alocações concorrentes de vários workers não
+    entregam a mesma vaga além do limite.
+
+    O índice se corrige sozinho: é reconstruído a partir do disco quando não
+    existe, está corrompido ou quando já existe uma pasta depois da atual, e a
+    contagem recomeça se a pasta atual tiver sido removida. Cada alocação custa
+    duas verificações de existência, independente do número de documentos.
+
+    `allocate` bloqueia (espera o lock e faz E/S): em código assíncrono, chame-o
+    via asyncio.to_thread para não parar o event loop.
+    """
+
+    def __init__(self, files_per_folder: int = FILES_PER_FOLDER, prefix: str = "", width: int = 4):
+        self.files_per_folder = files_per_folder
+        self.prefix = prefix
+        self.width = width
+
+    def folder_name(self, index: int) -> str:
+        return f"{self.prefix}{index:0{self.width}d}"
+
+    def _folder_index(self, name: str):
+        if not name.startswith(self.prefix):
+            return None
+        suffix = name[len(self.prefix):]
+        return int(suffix) if suffix.isdigit() else None
+
+    def _scan(self, base_path: Path) -> dict:
+        """Reconstrói o índice a partir do sistema de arquivos (pasta mais alta e seus arquivos)."""
+        indexes = [
+            index for index in (self._folder_index(d.name) for d in base_path.iterdir() if d.is_dir())
+            if index is not None
+        ]
+        if not indexes:
+            return {"folder": 1, "count": 0}
+        latest = max(indexes)
+        count = sum(1 for f in (base_path / self.folder_name(latest)).iterdir() if f.is_file())
+        return {"folder": latest, "count": count}
+
+    def _read_index(self, index_path: Path):
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            return {"folder": int(state["folder"]), "count": int(state["count"])}
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_index(self, index_path: Path, state: dict):
+        tmp_path = index_path.with_name(index_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, index_path)
+
+    def allocate(self, base_path: Path) -> Path:
+        """Reserva uma vaga e devolve a subpasta (já criada) onde o arquivo deve ser gravado."""
+        base_path = Path(base_path)
+        base_path.mkdir(parents=True, exist_ok=True)
+        index_path = base_path / INDEX_FILE_NAME
+
+        with _exclusive_lock(base_path / LOCK_FILE_NAME):
+            state = self._read_index(index_path)
+            if state is None or (base_path / self.folder_name(state["folder"] + 1)).exists():
+                # Sem índice, ou índice atrás do sistema de arquivos (pastas criadas por fora,
+                # backup restaurado): reconstrói a partir do disco.
+                state = self._scan(base_path)
+            elif not (base_path / self.folder_name(state["folder"])).is_dir():
+                # Pasta atual removida (ex.: limpeza de pastas vazias): recomeça a contagem nela.
+                state = {"folder": state["folder"], "count": 0}
+            if state["count"] >= self.files_per_folder:
+                state = {"folder": state["folder"] + 1, "count": 0}
+            state["count"] += 1
+            folder = base_path / self.folder_name(state["folder"])
+            folder.mkdir(exist_ok=True)
+            self._write_index(index_path, state)
+        return folder
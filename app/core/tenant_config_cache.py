@@ -0,0 +1,140 @@
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Mapping, Optional
+
+from .config import settings
+from ..models.tenant_configs import ConfigKey
+
+
+@dataclass(frozen=True)
+class TenantConfigSnapshot:
+    """Todas as configurações de um tenant, lidas numa única consulta, com acesso tipado."""
+
+    tenant_id: uuid.UUID
+    values: Mapping[ConfigKey, str] = field(default_factory=dict)
+
+    def get(self, key: ConfigKey, default: Optional[str] = None) -> Optional[str]:
+        return self.values.get(key, default)
+
+    def get_bool(self, key: ConfigKey) -> bool:
+        return (self.values.get(key) or "").lower() == "true"
+
+    def get_int(self, key: ConfigKey) -> Optional[int]:
+        value = self.values.get(key)
+        try:
+            return int(value) if value else None
+        except ValueError:
+            return None
+
+    @property
+    def smtp_host(self) -> Optional[str]:
+        return self.get(ConfigKey.smtp_host)
+
+    @property
+    def smtp_port(self) -> Optional[int]:
+        return self.get_int(ConfigKey.smtp_port)
+
+    @property
+    def smtp_user(self) -> Optional[str]:
+        return self.get(ConfigKey.smtp_user)
+
+    @property
+    def smtp_password(self) -> Optional[str]:
+        return self.get(ConfigKey.smtp_password)
+
+    @property
+    def smtp_use_ssl(self) -> bool:
+        return self.get_bool(ConfigKey.smtp_use_ssl)
+
+    @property
+    def smtp_use_tls(self) -> bool:
+        return self.get_bool(ConfigKey.smtp_use_tls)
+
+    @property
+    def smtp_configured(self) -> bool:
+        return bool(self.smtp_host and self.smtp_port and self.smtp_user and self.smtp_password)
+
+    @property
+    def sms_api_key(self) -> Optional[str]:
+        return self.get(ConfigKey.sms_api_key)
+
+    @property
+    def sms_sender_id(self) -> Optional[str]:
+        return self.get(ConfigKey.sms_sender_id)
+
+
+class TenantConfigCache:
+    """
+    Cache em memória (por processo) dos snapshots de configuração dos tenants.
+
+    Preenchido por `crud/tenant_configs.get_tenant_config_snapshot` e invalidado
+    pelo create/update/delete do mesmo módulo. Como no cache de usuários, cada
+    worker do uvicorn tem o seu; o TTL limita por quanto tempo um worker pode
+    enxergar uma alteração feita em outro. O contador de geração impede que uma
+    leitura iniciada antes de uma invalidação grave o snapshot antigo.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[uuid.UUID, tuple]" = OrderedDict()
+        self._generations: dict[uuid.UUID, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def generation(self, tenant_id: uuid.UUID) -> int:
+        return self._generations.get(tenant_id, 0)
+
+    def get(self, tenant_id: uuid.UUID) -> Optional[TenantConfigSnapshot]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(tenant_id)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[tenant_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(tenant_id)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, snapshot: TenantConfigSnapshot, generation: int):
+        """Guarda o snapshot, a menos que o tenant tenha sido invalidado depois de `generation`."""
+        if not self.enabled or self.generation(snapshot.tenant_id) != generation:
+            return
+        self._entries[snapshot.tenant_id] = (time.monotonic() + self.ttl_seconds, snapshot)
+        self._entries.move_to_end(snapshot.tenant_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, tenant_id: uuid.UUID):
+        self._generations[tenant_id] = self.generation(tenant_id) + 1
+        self._entries.pop(tenant_id, None)
+
+    def clear(self):
+        for tenant_id in list(self._entries):
+            self.invalidate(tenant_id)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# Instância única usada pelos serviços (notificações, e-mails) e invalidada por `crud/tenant_configs.py`.
+tenant_config_cache = TenantConfigCache(
+    max_entries=settings.TENANT_CONFIG_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.TENANT_CONFIG_CACHE_TTL_SECONDS,
+)
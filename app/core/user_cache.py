@@ -0,0 +1,139 @@
+import datetime
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from .config import settings
+from ..models.roles import UserRole
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """
+    Cópia imutável dos dados do usuário autenticado, sem vínculo com a sessão.
+
+    É o que fica no cache: a instância ORM pertence à sessão da requisição que a
+    carregou e expira quando essa sessão faz rollback, o que quebraria os acessos
+    de requisições seguintes. A senha (hash) não é copiada.
+    """
+
+    id: uuid.UUID
+    username: str
+    email: str
+    nome: str
+    role: UserRole
+    especialidade: Optional[str]
+    ativo: bool
+    default_tenant_id: Optional[uuid.UUID]
+    color: Optional[str]
+    created_at: Optional[datetime.datetime]
+    updated_at: Optional[datetime.datetime]
+    my_advisors: Tuple["AuthenticatedUser", ...] = ()
+
+    @classmethod
+    def from_orm_user(cls, user, with_advisors: bool = True) -> "AuthenticatedUser":
+        """Copia as colunas (e os orientadores, já carregados) de um SystemUser."""
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            nome=user.nome,
+            role=user.role,
+            especialidade=user.especialidade,
+            ativo=user.ativo,
+            default_tenant_id=user.default_tenant_id,
+            color=user.color,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+            my_advisors=tuple(cls.from_orm_user(a, with_advisors=False) for a in user.my_advisors) if with_advisors else (),
+        )
+
+
+class PrincipalCache:
+    """
+    Cache em memória (por processo) dos usuários autenticados.
+
+    Evita que `get_current_user` consulte o banco a cada requisição. As entradas
+    são indexadas por (username do token, tenant do token), expiram após
+    `ttl_seconds` e o cache é limitado a `max_entries` itens (LRU).
+    Cada worker do uvicorn mantém o seu próprio cache; o TTL limita o tempo
+    em que um worker pode enxergar dados desatualizados. Os valores são
+    AuthenticatedUser, nunca instâncias ligadas a uma sessão.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._by_scope: dict[str, dict[str, int]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def _record(self, scope: Optional[str], hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        if scope:
+            counters = self._by_scope.setdefault(scope, {"hits": 0, "misses": 0})
+            counters["hits" if hit else "misses"] += 1
+
+    def get(self, username: str, tenant_id: Optional[str], scope: Optional[str] = None) -> Optional[AuthenticatedUser]:
+        """Retorna o usuário em cache ou None (registrando hit/miss)."""
+        if not self.enabled:
+            return None
+        key = (username, tenant_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            self._record(scope, hit=False)
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self._record(scope, hit=False)
+            return None
+        self._entries.move_to_end(key)
+        self._record(scope, hit=True)
+        return user
+
+    def set(self, username: str, tenant_id: Optional[str], user: AuthenticatedUser):
+        if not self.enabled:
+            return
+        key = (username, tenant_id)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, user)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, username: str):
+        """Remove todas as entradas de um usuário, independente do tenant."""
+        for key in [k for k in self._entries if k[0] == username]:
+            del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "by_scope": {scope: dict(counters) for scope, counters in self._by_scope.items()},
+        }
+
+
+# Instância única usada por `routes/auth.py` e invalidada por `crud/users.py`.
+principal_cache = PrincipalCache(
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
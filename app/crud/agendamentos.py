@@ -1,30 +1,98 @@
+import asyncio
+import hashlib
+import os
 import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import and_
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 from ..models import agendamentos as models, pacientes as paciente_models
 from ..schemas import agendamentos as agendamentos_schemas
 from ..services.notification_service import NotificationService
 from typing import Optional
-from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm import joinedload, selectinload, noload
 from ..models.tratamentos import Tratamento
 from ..models.tratamento_servicos import TratamentoServico
-from datetime import datetime, date
-import jinja2
-from xhtml2pdf import pisa
+from datetime import datetime, date, timedelta
 from ..models import tenants as tenant_models
+from ..models.users import SystemUser
+from ..models.servicos import Servico
+from ..core.pagination import paginate
+from ..core.config import settings
+from ..services.template_registry import ATENDIMENTO_TEMPLATE
+from ..services.pdf_renderer import render as render_pdf
+from ..services.pdf_jobs import pdf_job_worker
+from ..services.email_dispatcher import email_dispatcher
+from ..models.pdf_jobs import PdfJobTipo
+from . import pdf_jobs as pdf_jobs_crud
+from . import atendimentos_diarios as atendimentos_diarios_crud
+
+# Perfis de carregamento dos relacionamentos de Agendamento.
+# - calendar: apenas os nomes necessários para montar a agenda;
+# - summary: paciente, acadêmico, orientador e serviço, sem a árvore do tratamento;
+# - full: tudo, inclusive o tratamento com seus serviços.
+# Relacionamentos fora do perfil usam noload e ficam como None, evitando lazy loads.
+AGENDAMENTO_LOAD_PROFILES = {
+    "calendar": (
+        joinedload(models.Agendamento.paciente).load_only(paciente_models.Paciente.id, paciente_models.Paciente.nome),
+        joinedload(models.Agendamento.academico).load_only(SystemUser.id, SystemUser.nome, SystemUser.color),
+        joinedload(models.Agendamento.servico).load_only(Servico.id, Servico.nome),
+        noload(models.Agendamento.orientador),
+        noload(models.Agendamento.tratamento),
+    ),
+    "summary": (
+        joinedload(models.Agendamento.paciente),
+        joinedload(models.Agendamento.academico),
+        joinedload(models.Agendamento.orientador),
+        joinedload(models.Agendamento.servico),
+        noload(models.Agendamento.tratamento),
+    ),
+    "full": (
+        joinedload(models.Agendamento.paciente),
+        joinedload(models.Agendamento.academico),
+        joinedload(models.Agendamento.orientador),
+        joinedload(models.Agendamento.tratamento).selectinload(Tratamento.servicos).joinedload(TratamentoServico.servico),
+        joinedload(models.Agendamento.servico),
+    ),
+}
+
+# Chave da paginação por cursor das listagens de agendamentos.
+AGENDAMENTO_KEYSET = (models.Agendamento.inicio, models.Agendamento.id)
+
+# Campos que mudam a contribuição de um agendamento concluído aos agregados diários (models/atendimentos_diarios).
+_CAMPOS_AGREGADOS = frozenset({"status", "inicio", "fim", "academico_id", "servico_id"})
+
+def _is_overlap_violation(error: IntegrityError) -> bool:
+    # 23P01 = exclusion_violation no PostgreSQL
+    return getattr(error.orig, "sqlstate", None) == "23P01" or models.OVERLAP_CONSTRAINT_NAME in str(error.orig)
 
-async def get_agendamento(db: AsyncSession, agendamento_id: uuid.UUID, tenant_id: uuid.UUID):
+async def _flush_agendamento(db: AsyncSession):
+    """
+    Envia o INSERT/UPDATE ao banco, convertendo a violação da restrição de
+    sobreposição no 409 que a API já devolvia.
+    """
+    try:
+        await db.flush()
+    except IntegrityError as e:
+        await db.rollback()
+        if _is_overlap_violation(e):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Appointment overlaps with an existing appointment for this academic."
+            )
+        raise
+
+def _load_options(profile: str = "full"):
+    try:
+        return AGENDAMENTO_LOAD_PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown load profile: {profile}")
+
+async def get_agendamento(db: AsyncSession, agendamento_id: uuid.UUID, tenant_id: uuid.UUID, profile: str = "full"):
     result = await db.execute(
         select(models.Agendamento)
-        .options(
-            joinedload(models.Agendamento.paciente),
-            joinedload(models.Agendamento.academico),
-            joinedload(models.Agendamento.orientador),
-            joinedload(models.Agendamento.tratamento).selectinload(Tratamento.servicos).joinedload(TratamentoServico.servico),
-            joinedload(models.Agendamento.servico)
-        )
+        .options(*_load_options(profile))
         .filter(models.Agendamento.id == agendamento_id, models.Agendamento.tenant_id == tenant_id)
     )
     return result.scalars().first()
@@ -37,15 +105,11 @@ async def get_agendamentos(
     servico_id: Optional[uuid.UUID] = None,
     date: Optional[date] = None,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    profile: str = "full",
+    cursor: Optional[str] = None
 ):
-    stmt = select(models.Agendamento).options(
-        joinedload(models.Agendamento.paciente),
-        joinedload(models.Agendamento.academico),
-        joinedload(models.Agendamento.orientador),
-        joinedload(models.Agendamento.tratamento).selectinload(Tratamento.servicos).joinedload(TratamentoServico.servico),
-        joinedload(models.Agendamento.servico)
-    )
+    stmt = select(models.Agendamento).options(*_load_options(profile))
     if tenant_id is not None:
         stmt = stmt.filter(models.Agendamento.tenant_id == tenant_id)
     
@@ -63,56 +127,45 @@ async def get_agendamentos(
         end_of_day = datetime.combine(date, datetime.max.time())
         stmt = stmt.filter(models.Agendamento.inicio >= start_of_day, models.Agendamento.inicio <= end_of_day)
 
-    result = await db.execute(stmt.offset(skip).limit(limit))
+    result = await db.execute(paginate(stmt, AGENDAMENTO_KEYSET, cursor, skip, limit))
     agendamentos = result.scalars().all()
 
     # Não fazer expunge para manter os relacionamentos carregados
     return agendamentos
 
+def _marcar_lembrete_se_proximo(db_agendamento: models.Agendamento):
+    """O aviso enviado agora já serve de lembrete se o horário cai na janela do agendador de lembretes."""
+    if db_agendamento.inicio <= datetime.now() + timedelta(hours=settings.REMINDER_HORIZON_HOURS):
+        db_agendamento.lembrete_enviado_para = db_agendamento.inicio
+
 async def create_agendamento(db: AsyncSession, agendamento: agendamentos_schemas.AgendamentoCreate, tenant_id: uuid.UUID):
     if agendamento.inicio.tzinfo is not None:
         agendamento.inicio = agendamento.inicio.replace(tzinfo=None)
     if agendamento.fim.tzinfo is not None:
         agendamento.fim = agendamento.fim.replace(tzinfo=None)
 
-    overlapping_appointments = await db.execute(
-        select(models.Agendamento).filter(
-            and_(
-                models.Agendamento.academico_id == agendamento.academico_id,
-                models.Agendamento.tenant_id == tenant_id,
-                models.Agendamento.fim > agendamento.inicio,
-                models.Agendamento.inicio < agendamento.fim
-            )
-        )
-    )
-    if overlapping_appointments.scalars().first():
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Appointment overlaps with an existing appointment for this academic."
-        )
-
+    # A sobreposição com outros agendamentos do acadêmico é verificada pela
+    # restrição de exclusão do banco, o que também cobre reservas simultâneas.
     db_agendamento = models.Agendamento(
         **agendamento.model_dump(exclude_unset=True),
         tenant_id=tenant_id
     )
     db.add(db_agendamento)
+    await _flush_agendamento(db)
+    if db_agendamento.status == models.AppointmentStatus.concluido:
+        await atendimentos_diarios_crud.contabilizar_agendamento(db, db_agendamento.id)
     # No db.commit() or db.refresh() here. Commit after reload.
 
     # Recarregar o agendamento com os relacionamentos carregados
     result = await db.execute(
         select(models.Agendamento)
-        .options(
-            joinedload(models.Agendamento.paciente),
-            joinedload(models.Agendamento.academico),
-            joinedload(models.Agendamento.orientador),
-            joinedload(models.Agendamento.tratamento).selectinload(Tratamento.servicos).joinedload(TratamentoServico.servico),
-            joinedload(models.Agendamento.servico)
-        )
+        .options(*_load_options("full"))
         .filter(models.Agendamento.id == db_agendamento.id)
     )
     db_agendamento = result.scalars().first()
-    await db.commit() # Commit after the object is fully loaded
 
+    # O aviso por e-mail entra na outbox na mesma transação; quem envia é o email_dispatcher.
+    db_email = None
     if db_agendamento.status == models.AppointmentStatus.agendado:
         paciente = await db.execute(select(paciente_models.Paciente).filter_by(id=db_agendamento.paciente_id, tenant_id=tenant_id))
         db_paciente = paciente.scalars().first()
@@ -125,7 +178,12 @@ Este é um lembrete do seu agendamento para {db_agendamento.servico_id} em {db_a
 
 Atenciosamente,
 Sua Clínica"""
-            await notification_service.send_email(tenant_id, db_paciente.email, subject, body)
+            db_email = await notification_service.send_email(tenant_id, db_paciente.email, subject, body)
+            _marcar_lembrete_se_proximo(db_agendamento)
+
+    await db.commit() # Commit after the object is fully loaded
+    if db_email:
+        email_dispatcher.notify()
 
     return db_agendamento
 
@@ -137,57 +195,42 @@ async def update_agendamento(db: AsyncSession, agendamento_id: uuid.UUID, agenda
 
     update_data = agendamento_data.model_dump(exclude_unset=True)
 
-    # Overlap check logic
-    if 'inicio' in update_data or 'fim' in update_data or 'academico_id' in update_data:
-        new_inicio = update_data.get('inicio', db_agendamento.inicio)
-        new_fim = update_data.get('fim', db_agendamento.fim)
-        academico_id = update_data.get('academico_id', db_agendamento.academico_id)
-
-        if hasattr(new_inicio, 'tzinfo') and new_inicio.tzinfo is not None:
-            new_inicio = new_inicio.replace(tzinfo=None)
-        if hasattr(new_fim, 'tzinfo') and new_fim.tzinfo is not None:
-            new_fim = new_fim.replace(tzinfo=None)
-
-        overlapping_appointments = await db.execute(
-            select(models.Agendamento).filter(
-                and_(
-                    models.Agendamento.id != agendamento_id,
-                    models.Agendamento.academico_id == academico_id,
-                    models.Agendamento.tenant_id == tenant_id,
-                    models.Agendamento.fim > new_inicio,
-                    models.Agendamento.inicio < new_fim
-                )
-            )
-        )
-        if overlapping_appointments.scalars().first():
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="Appointment overlaps with an existing appointment for this academic."
-            )
+    # Agendamento concluído: a contribuição antiga sai dos agregados diários e a nova entra após o flush.
+    recontabilizar = not _CAMPOS_AGREGADOS.isdisjoint(update_data)
+    if recontabilizar and db_agendamento.status == models.AppointmentStatus.concluido:
+        await atendimentos_diarios_crud.contabilizar_agendamento(db, db_agendamento.id, sinal=-1)
 
     # Update attributes
     for key, value in update_data.items():
         if (key == 'inicio' or key == 'fim') and hasattr(value, 'tzinfo') and value.tzinfo is not None:
             value = value.replace(tzinfo=None)
         setattr(db_agendamento, key, value)
-    
+
+    # A atualização parcial só valida fim > inicio quando os dois vêm no corpo; um
+    # intervalo invertido faria o tsrange da restrição de exclusão falhar com DataError.
+    if db_agendamento.fim <= db_agendamento.inicio:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="End time must be after start time"
+        )
+
+    # Sobreposição de horários verificada pela restrição de exclusão do banco.
+    await _flush_agendamento(db)
+    if recontabilizar and db_agendamento.status == models.AppointmentStatus.concluido:
+        await atendimentos_diarios_crud.contabilizar_agendamento(db, db_agendamento.id)
     # No db.commit() or db.refresh() here. Commit after reload.
 
     # Recarregar o agendamento com os relacionamentos carregados
     result = await db.execute(
         select(models.Agendamento)
-        .options(
-            joinedload(models.Agendamento.paciente),
-            joinedload(models.Agendamento.academico),
-            joinedload(models.Agendamento.orientador),
-            joinedload(models.Agendamento.tratamento).selectinload(Tratamento.servicos).joinedload(TratamentoServico.servico),
-            joinedload(models.Agendamento.servico)
-        )
+        .options(*_load_options("full"))
         .filter(models.Agendamento.id == db_agendamento.id)
     )
     db_agendamento = result.scalars().first()
-    await db.commit() # Commit after the object is fully loaded
 
+    # O aviso por e-mail entra na outbox na mesma transação; quem envia é o email_dispatcher.
+    db_email = None
     if db_agendamento.status == models.AppointmentStatus.agendado:
         paciente = await db.execute(select(paciente_models.Paciente).filter_by(id=db_agendamento.paciente_id, tenant_id=tenant_id))
         db_paciente = paciente.scalars().first()
@@ -200,7 +243,12 @@ Seu agendamento para {db_agendamento.servico_id} foi atualizado para {db_agendam
 
 Atenciosamente,
 Sua Clínica"""
-            await notification_service.send_email(tenant_id, db_paciente.email, subject, body)
+            db_email = await notification_service.send_email(tenant_id, db_paciente.email, subject, body)
+            _marcar_lembrete_se_proximo(db_agendamento)
+
+    await db.commit() # Commit after the object is fully loaded
+    if db_email:
+        email_dispatcher.notify()
 
     return db_agendamento
 
@@ -208,10 +256,52 @@ async def delete_agendamento(db: AsyncSession, agendamento_id: uuid.UUID, tenant
     result = await db.execute(select(models.Agendamento).filter(models.Agendamento.id == agendamento_id, models.Agendamento.tenant_id == tenant_id))
     db_agendamento = result.scalars().first()
     if db_agendamento:
+        if db_agendamento.status == models.AppointmentStatus.concluido:
+            await atendimentos_diarios_crud.contabilizar_agendamento(db, db_agendamento.id, sinal=-1)
         await db.delete(db_agendamento)
         await db.commit()
     return db_agendamento
 
+async def reservar_lembretes(db: AsyncSession, inicio_ate: datetime, limit: int):
+    """
+    Seleciona, de todos os tenants, até `limit` agendamentos 'agendado' entre agora e
+    `inicio_ate` que ainda não receberam lembrete para o horário atual, e grava o
+    marcador (lembrete_enviado_para = inicio). Sem commit: os e-mails devem ser
+    enfileirados na mesma transação, assim cada agendamento é avisado uma única vez.
+    FOR UPDATE SKIP LOCKED permite rodar o agendador em mais de um processo.
+    Retorna linhas com id, tenant_id, inicio, paciente_nome, paciente_email e servico_nome.
+    """
+    stmt = (
+        select(
+            models.Agendamento.id,
+            models.Agendamento.tenant_id,
+            models.Agendamento.inicio,
+            paciente_models.Paciente.nome.label("paciente_nome"),
+            paciente_models.Paciente.email.label("paciente_email"),
+            Servico.nome.label("servico_nome"),
+        )
+        .join(paciente_models.Paciente, paciente_models.Paciente.id == models.Agendamento.paciente_id)
+        .outerjoin(Servico, Servico.id == models.Agendamento.servico_id)
+        .where(
+            models.Agendamento.status == models.AppointmentStatus.agendado,
+            models.Agendamento.inicio > datetime.now(),
+            models.Agendamento.inicio <= inicio_ate,
+            models.Agendamento.lembrete_enviado_para.is_distinct_from(models.Agendamento.inicio),
+        )
+        .order_by(models.Agendamento.inicio)
+        .limit(limit)
+        .with_for_update(of=models.Agendamento, skip_locked=True)
+    )
+    rows = (await db.execute(stmt)).all()
+    if rows:
+        await db.execute(
+            update(models.Agendamento)
+            .where(models.Agendamento.id.in_([row.id for row in rows]))
+            .values(lembrete_enviado_para=models.Agendamento.inicio)
+            .execution_options(synchronize_session=False)
+        )
+    return rows
+
 async def get_agendamentos_detalhes(db: AsyncSession, tenant_id: uuid.UUID, skip: int = 0, limit: int = 100):
     query = select(models.AgendamentoDetalhesView).filter(models.AgendamentoDetalhesView.tenant_id == tenant_id).offset(skip).limit(limit)
     result = await db.execute(query)
@@ -222,15 +312,10 @@ async def get_agendamentos_by_paciente(
     paciente_id: uuid.UUID,
     tenant_id: Optional[uuid.UUID] = None,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    profile: str = "full"
 ):
-    stmt = select(models.Agendamento).options(
-        joinedload(models.Agendamento.paciente),
-        joinedload(models.Agendamento.academico),
-        joinedload(models.Agendamento.orientador),
-        joinedload(models.Agendamento.tratamento).selectinload(Tratamento.servicos).joinedload(TratamentoServico.servico),
-        joinedload(models.Agendamento.servico)
-    ).filter(models.Agendamento.paciente_id == paciente_id)
+    stmt = select(models.Agendamento).options(*_load_options(profile)).filter(models.Agendamento.paciente_id == paciente_id)
     
     if tenant_id is not None:
         stmt = stmt.filter(models.Agendamento.tenant_id == tenant_id)
@@ -241,40 +326,103 @@ async def get_agendamentos_by_paciente(
     # Não fazer expunge para manter os relacionamentos carregados
     return agendamentos
 
+# Transições de status permitidas: novo status -> status anteriores aceitos.
+# Usada como guarda do UPDATE em transicionar_status, de modo que uma transição
+# inválida é recusada pelo próprio banco, sem SELECT prévio.
+ALLOWED_STATUS_TRANSITIONS = {
+    models.AppointmentStatus.aguardando: frozenset({
+        models.AppointmentStatus.agendado,
+        models.AppointmentStatus.iniciado,
+    }),
+    models.AppointmentStatus.iniciado: frozenset({
+        models.AppointmentStatus.agendado,
+        models.AppointmentStatus.aguardando,
+    }),
+    models.AppointmentStatus.em_atendimento: frozenset({
+        models.AppointmentStatus.agendado,
+        models.AppointmentStatus.aguardando,
+        models.AppointmentStatus.iniciado,
+    }),
+    models.AppointmentStatus.concluido: frozenset({
+        models.AppointmentStatus.agendado,
+        models.AppointmentStatus.aguardando,
+        models.AppointmentStatus.iniciado,
+        models.AppointmentStatus.em_atendimento,
+    }),
+}
+
+async def _aplicar_transicao(
+    db: AsyncSession,
+    agendamento_id: uuid.UUID,
+    tenant_id: uuid.UUID,
+    novo_status: models.AppointmentStatus,
+    **valores
+) -> bool:
+    """
+    Altera o status de um agendamento com um único UPDATE ... RETURNING,
+    condicionado aos status anteriores permitidos. Não faz commit.
+
+    Retorna False se o agendamento não existir e levanta 409 se a transição não for permitida.
+    """
+    status_anteriores = ALLOWED_STATUS_TRANSITIONS[novo_status]
+    stmt = (
+        update(models.Agendamento)
+        .where(
+            models.Agendamento.id == agendamento_id,
+            models.Agendamento.tenant_id == tenant_id,
+            models.Agendamento.status.in_(status_anteriores)
+        )
+        .values(status=novo_status, **valores)
+        .returning(models.Agendamento.id)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    if result.scalar_one_or_none() is None:
+        await db.rollback()
+        # Só no caminho de erro: distingue "não encontrado" de "transição inválida".
+        status_result = await db.execute(
+            select(models.Agendamento.status).filter(
+                models.Agendamento.id == agendamento_id,
+                models.Agendamento.tenant_id == tenant_id
+            )
+        )
+        status_atual = status_result.scalar_one_or_none()
+        if status_atual is None:
+            return False
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Transição de status inválida: {status_atual.value} -> {novo_status.value}."
+        )
+    return True
+
+async def transicionar_status(
+    db: AsyncSession,
+    agendamento_id: uuid.UUID,
+    tenant_id: uuid.UUID,
+    novo_status: models.AppointmentStatus,
+    **valores
+):
+    """
+    Aplica a transição de status, faz commit e recarrega os relacionamentos.
+    Retorna None se o agendamento não existir.
+    """
+    if not await _aplicar_transicao(db, agendamento_id, tenant_id, novo_status, **valores):
+        return None
+    await db.commit()
+
+    return await get_agendamento(db, agendamento_id=agendamento_id, tenant_id=tenant_id)
+
 async def iniciar_atendimento(
     db: AsyncSession, 
     agendamento_id: uuid.UUID, 
     tenant_id: uuid.UUID
 ):
     """Inicia um atendimento, marcando o horário de início"""
-    result = await db.execute(
-        select(models.Agendamento).filter(
-            models.Agendamento.id == agendamento_id, 
-            models.Agendamento.tenant_id == tenant_id
-        )
+    return await transicionar_status(
+        db, agendamento_id, tenant_id,
+        models.AppointmentStatus.iniciado,
+        hora_inicio_atendimento=datetime.now()
     )
-    db_agendamento = result.scalars().first()
-    if not db_agendamento:
-        return None
-    
-    db_agendamento.status = models.AppointmentStatus.iniciado
-    db_agendamento.hora_inicio_atendimento = datetime.datetime.now()
-    await db.commit()
-    await db.refresh(db_agendamento)
-    
-    # Recarregar os relacionamentos após o commit
-    result = await db.execute(
-        select(models.Agendamento).options(
-            joinedload(models.Agendamento.paciente),
-            joinedload(models.Agendamento.academico),
-            joinedload(models.Agendamento.orientador),
-            joinedload(models.Agendamento.tratamento).selectinload(Tratamento.servicos).joinedload(TratamentoServico.servico),
-            joinedload(models.Agendamento.servico)
-        ).filter(models.Agendamento.id == agendamento_id)
-    )
-    db_agendamento = result.scalars().first()
-    
-    return db_agendamento
 
 async def aguardar_atendimento(
     db: AsyncSession, 
@@ -282,33 +430,7 @@ async def aguardar_atendimento(
     tenant_id: uuid.UUID
 ):
     """Marca um atendimento como aguardando"""
-    result = await db.execute(
-        select(models.Agendamento).filter(
-            models.Agendamento.id == agendamento_id, 
-            models.Agendamento.tenant_id == tenant_id
-        )
-    )
-    db_agendamento = result.scalars().first()
-    if not db_agendamento:
-        return None
-    
-    db_agendamento.status = models.AppointmentStatus.aguardando
-    await db.commit()
-    await db.refresh(db_agendamento)
-    
-    # Recarregar os relacionamentos após o commit
-    result = await db.execute(
-        select(models.Agendamento).options(
-            joinedload(models.Agendamento.paciente),
-            joinedload(models.Agendamento.academico),
-            joinedload(models.Agendamento.orientador),
-            joinedload(models.Agendamento.tratamento).selectinload(Tratamento.servicos).joinedload(TratamentoServico.servico),
-            joinedload(models.Agendamento.servico)
-        ).filter(models.Agendamento.id == agendamento_id)
-    )
-    db_agendamento = result.scalars().first()
-    
-    return db_agendamento
+    return await transicionar_status(db, agendamento_id, tenant_id, models.AppointmentStatus.aguardando)
 
 async def em_atendimento(
     db: AsyncSession, 
@@ -316,33 +438,7 @@ async def em_atendimento(
     tenant_id: uuid.UUID
 ):
     """Marca um atendimento como em andamento"""
-    result = await db.execute(
-        select(models.Agendamento).filter(
-            models.Agendamento.id == agendamento_id, 
-            models.Agendamento.tenant_id == tenant_id
-        )
-    )
-    db_agendamento = result.scalars().first()
-    if not db_agendamento:
-        return None
-    
-    db_agendamento.status = models.AppointmentStatus.em_atendimento
-    await db.commit()
-    await db.refresh(db_agendamento)
-    
-    # Recarregar os relacionamentos após o commit
-    result = await db.execute(
-        select(models.Agendamento).options(
-            joinedload(models.Agendamento.paciente),
-            joinedload(models.Agendamento.academico),
-            joinedload(models.Agendamento.orientador),
-            joinedload(models.Agendamento.tratamento).selectinload(Tratamento.servicos).joinedload(TratamentoServico.servico),
-            joinedload(models.Agendamento.servico)
-        ).filter(models.Agendamento.id == agendamento_id)
-    )
-    db_agendamento = result.scalars().first()
-    
-    return db_agendamento
+    return await transicionar_status(db, agendamento_id, tenant_id, models.AppointmentStatus.em_atendimento)
 
 async def concluir_atendimento(
     db: AsyncSession, 
@@ -350,200 +446,107 @@ async def concluir_atendimento(
     tenant_id: uuid.UUID,
     observacoes: Optional[str] = None
 ):
-    """Conclui um atendimento, marcando o horário de fim e gerando PDF"""
-    result = await db.execute(
-        select(models.Agendamento).options(
-            joinedload(models.Agendamento.paciente),
-            joinedload(models.Agendamento.academico),
-            joinedload(models.Agendamento.orientador),
-            joinedload(models.Agendamento.tratamento).selectinload(Tratamento.servicos).joinedload(TratamentoServico.servico),
-            joinedload(models.Agendamento.servico)
-        ).filter(
-            models.Agendamento.id == agendamento_id, 
-            models.Agendamento.tenant_id == tenant_id
-        )
-    )
-    db_agendamento = result.scalars().first()
-    if not db_agendamento:
-        return None
-    
-    db_agendamento.status = models.AppointmentStatus.concluido
-    db_agendamento.hora_fim_atendimento = datetime.datetime.now()
+    """
+    Conclui um atendimento, marcando o horário de fim, e enfileira a geração do PDF
+    na mesma transação. Retorna (agendamento, job) ou None se não existir.
+    """
+    valores = {"hora_fim_atendimento": datetime.now()}
     if observacoes:
-        db_agendamento.observacoes = observacoes
-    
-    # Gerar PDF do atendimento
-    await gerar_pdf_atendimento(db, db_agendamento, tenant_id)
-    
+        valores["observacoes"] = observacoes
+    if not await _aplicar_transicao(db, agendamento_id, tenant_id, models.AppointmentStatus.concluido, **valores):
+        return None
+    await atendimentos_diarios_crud.contabilizar_agendamento(db, agendamento_id)
+
+    # O PDF é gerado pelo worker de jobs (services/pdf_jobs), fora da requisição.
+    db_job = await pdf_jobs_crud.enqueue_pdf_job(db, tenant_id, PdfJobTipo.atendimento, agendamento_id)
     await db.commit()
-    await db.refresh(db_agendamento)
-    
-    # Recarregar os relacionamentos após o commit
-    result = await db.execute(
-        select(models.Agendamento).options(
-            joinedload(models.Agendamento.paciente),
-            joinedload(models.Agendamento.academico),
-            joinedload(models.Agendamento.orientador),
-            joinedload(models.Agendamento.tratamento).selectinload(Tratamento.servicos).joinedload(TratamentoServico.servico),
-            joinedload(models.Agendamento.servico)
-        ).filter(models.Agendamento.id == agendamento_id)
-    )
-    db_agendamento = result.scalars().first()
-    
-    return db_agendamento
+    pdf_job_worker.notify()
+
+    db_agendamento = await get_agendamento(db, agendamento_id=agendamento_id, tenant_id=tenant_id)
+    return db_agendamento, db_job
 
 async def gerar_pdf_atendimento(
     db: AsyncSession, 
     agendamento: models.Agendamento, 
     tenant_id: uuid.UUID
 ):
-    """Gera PDF do atendimento e salva no storage"""
+    """
+    Gera o PDF do atendimento, salva no storage e registra o DocumentoPaciente.
+    Executado pelo worker de jobs de PDF (services/pdf_jobs); erros são propagados
+    para que o job registre a falha.
+    """
+    # Buscar informações do tenant
+    tenant_result = await db.execute(
+        select(tenant_models.Tenant).filter(tenant_models.Tenant.id == tenant_id)
+    )
+    tenant = tenant_result.scalars().first()
+    
+    # Calcular duração
+    duracao = "N/A"
+    if agendamento.hora_inicio_atendimento and agendamento.hora_fim_atendimento:
+        diff = agendamento.hora_fim_atendimento - agendamento.hora_inicio_atendimento
+        horas = diff.total_seconds() // 3600
+        minutos = (diff.total_seconds() % 3600) // 60
+        duracao = f"{int(horas)}h {int(minutos)}min"
+    
+    context = dict(
+        tenant_name=getattr(tenant, "nome", "N/A"),
+        paciente_nome=getattr(agendamento.paciente, "nome", "N/A"),
+        academico_nome=getattr(agendamento.academico, "nome", "N/A"),
+        orientador_nome=getattr(agendamento.orientador, "nome", "N/A") if agendamento.orientador else "N/A",
+        servico_nome=getattr(agendamento.servico, "nome", "N/A") if agendamento.servico else "N/A",
+        tratamento_nome=getattr(agendamento.tratamento, "nome", "N/A") if agendamento.tratamento else "N/A",
+        data_agendada=agendamento.inicio.strftime("%d/%m/%Y"),
+        hora_inicio=agendamento.hora_inicio_atendimento.strftime("%H:%M") if agendamento.hora_inicio_atendimento else "N/A",
+        hora_fim=agendamento.hora_fim_atendimento.strftime("%H:%M") if agendamento.hora_fim_atendimento else "N/A",
+        duracao=duracao,
+        observacoes=agendamento.observacoes or "",
+        # O template padrão mostra a conclusão, não o momento do render: regerar o mesmo
+        # atendimento produz o mesmo HTML e usa o pdf_cache. data_geracao continua
+        # disponível para templates de tenant que a exibem (esses não aproveitam o cache).
+        data_conclusao=agendamento.hora_fim_atendimento.strftime("%d/%m/%Y %H:%M:%S") if agendamento.hora_fim_atendimento else "N/A",
+        data_geracao=datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
+        agendamento_id=str(agendamento.id)
+    )
+    pdf_bytes = await render_pdf(ATENDIMENTO_TEMPLATE, context, tenant_id=tenant_id)
+    
+    # Usar o sistema de storage existente
+    from ..core.storage import get_storage_path
+    
+    # Nome do arquivo baseado no acadêmico e data
+    nome_arquivo = f"atendimento_{getattr(agendamento.academico, 'nome', 'academico').replace(' ', '_')}_{agendamento.inicio.strftime('%Y%m%d_%H%M')}"
+    
+    # Obter caminho do storage (a alocação da pasta usa flock e E/S do índice: fora do event loop)
+    file_path = await asyncio.to_thread(
+        get_storage_path,
+        tenant_name=getattr(tenant, "nome", "tenant"),
+        document_type="prontuarios",
+        record_id=nome_arquivo,
+        file_extension=".pdf"
+    )
+    
+    # Gravar PDF
+    arquivo_existia = os.path.exists(file_path)
+    with open(file_path, "wb") as f:
+        f.write(pdf_bytes)
+    
+    # Salvar referência do documento no banco
+    from ..schemas.documento_paciente import DocumentoPacienteCreate
+    from ..crud.documentos_paciente import create_documento_paciente
+
+    documento_data = DocumentoPacienteCreate(
+        paciente_id=agendamento.paciente_id,
+        nome_arquivo=os.path.basename(file_path),
+        caminho_arquivo=file_path,
+        tipo_documento="Relatório de Atendimento",
+        checksum_sha256=hashlib.sha256(pdf_bytes).hexdigest(),
+        tamanho_bytes=len(pdf_bytes),
+    )
     try:
-        # Buscar informações do tenant
-        tenant_result = await db.execute(
-            select(tenant_models.Tenant).filter(tenant_models.Tenant.id == tenant_id)
-        )
-        tenant = tenant_result.scalars().first()
-        
-        # Template HTML do relatório de atendimento
-        template_str = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8" />
-            <title>Relatório de Atendimento</title>
-            <style>
-                body { font-family: Arial, sans-serif; margin: 20px; }
-                h1, h2 { text-align: center; color: #2c3e50; }
-                .header { background-color: #ecf0f1; padding: 20px; border-radius: 5px; margin-bottom: 20px; }
-                .info-section { margin: 20px 0; }
-                .info-row { display: flex; margin: 10px 0; }
-                .info-label { font-weight: bold; width: 150px; }
-                .info-value { flex: 1; }
-                .observacoes { background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin: 20px 0; }
-                .footer { text-align: center; margin-top: 30px; color: #7f8c8d; font-size: 12px; }
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>Relatório de Atendimento</h1>
-                <h2>{{ tenant_name }}</h2>
-            </div>
-            
-            <div class="info-section">
-                <div class="info-row">
-                    <div class="info-label">Paciente:</div>
-                    <div class="info-value">{{ paciente_nome }}</div>
-                </div>
-                <div class="info-row">
-                    <div class="info-label">Acadêmico:</div>
-                    <div class="info-value">{{ academico_nome }}</div>
-                </div>
-                <div class="info-row">
-                    <div class="info-label">Orientador:</div>
-                    <div class="info-value">{{ orientador_nome }}</div>
-                </div>
-                <div class="info-row">
-                    <div class="info-label">Serviço:</div>
-                    <div class="info-value">{{ servico_nome }}</div>
-                </div>
-                <div class="info-row">
-                    <div class="info-label">Tratamento:</div>
-                    <div class="info-value">{{ tratamento_nome }}</div>
-                </div>
-            </div>
-            
-            <div class="info-section">
-                <div class="info-row">
-                    <div class="info-label">Data Agendada:</div>
-                    <div class="info-value">{{ data_agendada }}</div>
-                </div>
-                <div class="info-row">
-                    <div class="info-label">Hora Início:</div>
-                    <div class="info-value">{{ hora_inicio }}</div>
-                </div>
-                <div class="info-row">
-                    <div class="info-label">Hora Fim:</div>
-                    <div class="info-value">{{ hora_fim }}</div>
-                </div>
-                <div class="info-row">
-                    <div class="info-label">Duração:</div>
-                    <div class="info-value">{{ duracao }}</div>
-                </div>
-            </div>
-            
-            {% if observacoes %}
-            <div class="observacoes">
-                <h3>Observações:</h3>
-                <p>{{ observacoes }}</p>
-            </div>
-            {% endif %}
-            
-            <div class="footer">
-                <p>Relatório gerado automaticamente em {{ data_geracao }}</p>
-                <p>ID do Atendimento: {{ agendamento_id }}</p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Calcular duração
-        duracao = "N/A"
-        if agendamento.hora_inicio_atendimento and agendamento.hora_fim_atendimento:
-            diff = agendamento.hora_fim_atendimento - agendamento.hora_inicio_atendimento
-            horas = diff.total_seconds() // 3600
-            minutos = (diff.total_seconds() % 3600) // 60
-            duracao = f"{int(horas)}h {int(minutos)}min"
-        
-        template = jinja2.Template(template_str)
-        html_content = template.render(
-            tenant_name=getattr(tenant, "nome", "N/A"),
-            paciente_nome=getattr(agendamento.paciente, "nome", "N/A"),
-            academico_nome=getattr(agendamento.academico, "nome", "N/A"),
-            orientador_nome=getattr(agendamento.orientador, "nome", "N/A") if agendamento.orientador else "N/A",
-            servico_nome=getattr(agendamento.servico, "nome", "N/A") if agendamento.servico else "N/A",
-            tratamento_nome=getattr(agendamento.tratamento, "nome", "N/A") if agendamento.tratamento else "N/A",
-            data_agendada=agendamento.inicio.strftime("%d/%m/%Y"),
-            hora_inicio=agendamento.hora_inicio_atendimento.strftime("%H:%M") if agendamento.hora_inicio_atendimento else "N/A",
-            hora_fim=agendamento.hora_fim_atendimento.strftime("%H:%M") if agendamento.hora_fim_atendimento else "N/A",
-            duracao=duracao,
-            observacoes=agendamento.observacoes or "",
-            data_geracao=datetime.datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
-            agendamento_id=str(agendamento.id)
-        )
-        
-        # Usar o sistema de storage existente
-        from ..core.storage import get_storage_path
-        
-        # Nome do arquivo baseado no acadêmico e data
-        nome_arquivo = f"atendimento_{getattr(agendamento.academico, 'nome', 'academico').replace(' ', '_')}_{agendamento.inicio.strftime('%Y%m%d_%H%M')}"
-        
-        # Obter caminho do storage
-        file_path = get_storage_path(
-            tenant_name=getattr(tenant, "nome", "tenant"),
-            document_type="prontuarios",
-            record_id=nome_arquivo,
-            file_extension=".pdf"
-        )
-        
-        # Gerar PDF
-        with open(file_path, "wb") as f:
-            pisa.CreatePDF(html_content, dest=f)
-        
-        # Salvar referência do documento no banco
-        from ..models.documentos_paciente import DocumentoPaciente
-        from ..schemas.documentos_paciente import DocumentoPacienteCreate
-        
-        documento_data = DocumentoPacienteCreate(
-            paciente_id=agendamento.paciente_id,
-            tipo="Relatório de Atendimento",
-            arquivo_url=file_path,
-            observacoes=f"Relatório do atendimento realizado em {agendamento.inicio.strftime('%d/%m/%Y')} pelo acadêmico {getattr(agendamento.academico, 'nome', 'N/A')}"
-        )
-        
-        from ..crud.documentos_paciente import create_documento_paciente
-        await create_documento_paciente(db, documento_data, tenant_id)
-        
-    except Exception as e:
-        print(f"Erro ao gerar PDF do atendimento: {e}")
-        # Não interrompe o fluxo principal
\ No newline at end of file
+        return await create_documento_paciente(db, documento_data)
+    except Exception:
+        # Sem o registro, o PDF recém-gravado ficaria órfão no disco (um arquivo que já
+        # existia pode ter registro de uma geração anterior e fica).
+        if not arquivo_existia:
+            os.remove(file_path)
+        raise
@@ -0,0 +1,93 @@
+import uuid
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from sqlalchemy import cast, delete, text, Date, Float
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+
+from ..models.agendamentos import Agendamento, AppointmentStatus
+from ..models.atendimentos_diarios import AtendimentoDiario, SEM_SERVICO
+
+async def contabilizar_agendamentos(db: AsyncSession, *criterios, sinal: int = 1) -> int:
+    """
+    Soma (sinal=1) ou subtrai (sinal=-1) dos agregados diários os agendamentos
+    concluídos que atendem `criterios`, num único INSERT ... SELECT ... ON CONFLICT,
+    sem commit. Deve rodar na mesma transação que conclui, altera ou remove o
+    agendamento. Retorna quantas linhas do agregado foram tocadas.
+    """
+    dia = cast(Agendamento.inicio, Date)
+    segundos = cast(func.extract('epoch', Agendamento.fim - Agendamento.inicio), Float)
+    origem = (
+        select(
+            Agendamento.tenant_id,
+            dia,
+            Agendamento.academico_id,
+            func.coalesce(Agendamento.servico_id, SEM_SERVICO),
+            sinal * func.count(),
+            sinal * func.sum(segundos),
+        )
+        .where(Agendamento.status == AppointmentStatus.concluido, *criterios)
+        .group_by(Agendamento.tenant_id, dia, Agendamento.academico_id, Agendamento.servico_id)
+    )
+    stmt = insert(AtendimentoDiario).from_select(
+        [
+            AtendimentoDiario.tenant_id,
+            AtendimentoDiario.dia,
+            AtendimentoDiario.academico_id,
+            AtendimentoDiario.servico_id,
+            AtendimentoDiario.quantidade,
+            AtendimentoDiario.segundos_atendimento,
+        ],
+        origem,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            AtendimentoDiario.tenant_id,
+            AtendimentoDiario.dia,
+            AtendimentoDiario.academico_id,
+            AtendimentoDiario.servico_id,
+        ],
+        set_={
+            "quantidade": AtendimentoDiario.quantidade + stmt.excluded.quantidade,
+            "segundos_atendimento": AtendimentoDiario.segundos_atendimento + stmt.excluded.segundos_atendimento,
+            "updated_at": func.now(),
+        },
+    )
+    result = await db.execute(stmt)
+    return result.rowcount
+
+async def contabilizar_agendamento(db: AsyncSession, agendamento_id: uuid.UUID, sinal: int = 1) -> int:
+    """Atalho de contabilizar_agendamentos para um único agendamento (sem efeito se não estiver concluído)."""
+    return await contabilizar_agendamentos(db, Agendamento.id == agendamento_id, sinal=sinal)
+
+async def reconstruir(
+    db: AsyncSession,
+    desde: Optional[date] = None,
+    ate: Optional[date] = None,
+    tenant_id: Optional[uuid.UUID] = None,
+) -> int:
+    """
+    Recalcula a partir de `agendamentos` os agregados dos dias entre `desde` e `ate`
+    (inclusive; sem limite quando None), de um tenant ou de todos. Sem commit.
+
+    O LOCK bloqueia as atualizações incrementais até o commit: uma conclusão
+    confirmada antes entra na reconstrução, uma confirmada depois é somada por
+    cima dela, e nenhuma é contada duas vezes.
+    """
+    await db.execute(text("LOCK TABLE atendimentos_diarios IN SHARE ROW EXCLUSIVE MODE"))
+
+    filtros_dia, criterios = [], []
+    if tenant_id is not None:
+        filtros_dia.append(AtendimentoDiario.tenant_id == tenant_id)
+        criterios.append(Agendamento.tenant_id == tenant_id)
+    if desde is not None:
+        filtros_dia.append(AtendimentoDiario.dia >= desde)
+        criterios.append(Agendamento.inicio >= datetime.combine(desde, time.min))
+    if ate is not None:
+        filtros_dia.append(AtendimentoDiario.dia <= ate)
+        criterios.append(Agendamento.inicio < datetime.combine(ate + timedelta(days=1), time.min))
+
+    await db.execute(delete(AtendimentoDiario).where(*filtros_dia))
+    return await contabilizar_agendamentos(db, *criterios)
@@ -6,6 +6,10 @@ from sqlalchemy.future import select
 
 from ..models import despesas as models
 from ..schemas import despesas as schemas
+from ..core.pagination import paginate
+
+# Chave da paginação por cursor da listagem de despesas (mais recentes primeiro).
+DESPESA_KEYSET = (models.Despesa.data_despesa, models.Despesa.id)
 
 async def get_despesa(db: AsyncSession, despesa_id: uuid.UUID, tenant_id: uuid.UUID) -> Optional[models.Despesa]:
     result = await db.execute(
@@ -13,13 +17,9 @@ async def get_despesa(db: AsyncSession, despesa_id: uuid.UUID, tenant_id: uuid.U
     )
     return result.scalars().first()
 
-async def get_despesas(db: AsyncSession, tenant_id: uuid.UUID, skip: int = 0, limit: int = 100) -> List[models.Despesa]:
-    result = await db.execute(
-        select(models.Despesa)
-        .filter(models.Despesa.tenant_id == tenant_id)
-        .offset(skip)
-        .limit(limit)
-    )
+async def get_despesas(db: AsyncSession, tenant_id: uuid.UUID, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[models.Despesa]:
+    stmt = select(models.Despesa).filter(models.Despesa.tenant_id == tenant_id)
+    result = await db.execute(paginate(stmt, DESPESA_KEYSET, cursor, skip, limit, descending=True))
     return result.scalars().all()
 
 async def create_despesa(db: AsyncSession, despesa: schemas.DespesaCreate, tenant_id: uuid.UUID) -> models.Despesa:
@@ -1,8 +1,9 @@
 from sqlalchemy.ext.asyncio import AsyncSession # Changed from Session
 from sqlalchemy import select, update, delete # Added imports
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 
+from app.crud import file_blobs as file_blobs_crud
 from app.models.documentos_paciente import DocumentoPaciente
 from app.schemas.documento_paciente import DocumentoPacienteCreate, DocumentoPacienteUpdate
 
@@ -26,11 +27,37 @@ async def create_documento_paciente(db: AsyncSession, documento: DocumentoPacien
     await db.refresh(db_documento)
     return db_documento
 
-async def update_documento_paciente(db: AsyncSession, documento_id: UUID, documento: DocumentoPacienteUpdate) -> Optional[DocumentoPaciente]:
-    stmt = update(DocumentoPaciente).where(DocumentoPaciente.id == documento_id).values(**documento.dict(exclude_unset=True))
+async def update_documento_paciente(db: AsyncSession, documento_id: UUID, documento: DocumentoPacienteUpdate) -> Tuple[Optional[DocumentoPaciente], Optional[str]]:
+    """
+    Atualiza o registro e faz commit. Se o caminho do arquivo mudar, a referência passa
+    do blob antigo para o novo (file_blobs) na mesma transação.
+    Retorna (db_documento, caminho liberado): o caminho antigo quando ficou sem referências,
+    para ser apagado com file_storage_service.delete_released_file após o commit.
+    """
+    values = documento.dict(exclude_unset=True)
+    arquivo_liberado = None
+    if "caminho_arquivo" in values:
+        result = await db.execute(
+            select(DocumentoPaciente.caminho_arquivo).where(DocumentoPaciente.id == documento_id).with_for_update()
+        )
+        row = result.first()
+        if row is None:
+            return None, None
+        caminho_anterior, caminho_novo = row.caminho_arquivo, values["caminho_arquivo"]
+        if caminho_novo != caminho_anterior:
+            blob = await file_blobs_crud.retain_blob(db, caminho_novo) if caminho_novo else None
+            # Outro arquivo: o checksum antigo (ETag do download) deixa de valer
+            values.update(
+                checksum_sha256=blob.sha256 if blob else None,
+                tamanho_bytes=blob.tamanho_bytes if blob else None,
+            )
+            # Arquivos anteriores à deduplicação (sem blob) não são apagados aqui.
+            if caminho_anterior and await file_blobs_crud.release_blob(db, caminho_anterior):
+                arquivo_liberado = caminho_anterior
+    stmt = update(DocumentoPaciente).where(DocumentoPaciente.id == documento_id).values(**values)
     await db.execute(stmt)
     await db.commit()
-    return await get_documento_paciente(db, documento_id) # Fetch updated object
+    return await get_documento_paciente(db, documento_id), arquivo_liberado # Fetch updated object
 
 async def delete_documento_paciente(db: AsyncSession, documento_id: UUID) -> Optional[DocumentoPaciente]:
     db_documento = await get_documento_paciente(db, documento_id) # Fetch object before deleting
@@ -0,0 +1,136 @@
+import uuid
+from datetime import timedelta
+from typing import List, Optional, Tuple
+from sqlalchemy import update, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+
+from ..models.email_outbox import EmailOutbox, EmailOutboxStatus
+
+async def enqueue_email(
+    db: AsyncSession,
+    tenant_id: uuid.UUID,
+    to_email: str,
+    subject: str,
+    body: str,
+    is_html: bool = False,
+) -> EmailOutbox:
+    """
+    Registra o e-mail na outbox na sessão atual, sem commit: ele só é enviado se a
+    transação que o originou for confirmada.
+    """
+    db_email = EmailOutbox(
+        tenant_id=tenant_id,
+        to_email=to_email,
+        subject=subject,
+        body=body,
+        is_html=is_html,
+        status=EmailOutboxStatus.pendente,
+    )
+    db.add(db_email)
+    await db.flush()
+    return db_email
+
+async def enqueue_emails(db: AsyncSession, tenant_id: uuid.UUID, messages: List[Tuple[str, str, str]], is_html: bool = False) -> List[EmailOutbox]:
+    """Versão em lote de enqueue_email: `messages` com (to_email, subject, body), um único flush."""
+    db_emails = [
+        EmailOutbox(
+            tenant_id=tenant_id,
+            to_email=to_email,
+            subject=subject,
+            body=body,
+            is_html=is_html,
+            status=EmailOutboxStatus.pendente,
+        )
+        for to_email, subject, body in messages
+    ]
+    db.add_all(db_emails)
+    await db.flush()
+    return db_emails
+
+async def get_email(db: AsyncSession, email_id: uuid.UUID, tenant_id: uuid.UUID) -> Optional[EmailOutbox]:
+    result = await db.execute(select(EmailOutbox).filter_by(id=email_id, tenant_id=tenant_id))
+    return result.scalars().first()
+
+async def claim_email_batch(db: AsyncSession, limit: int, stale_after_seconds: float, max_attempts: int) -> List[EmailOutbox]:
+    """
+    Reserva até `limit` e-mails pendentes cuja próxima tentativa já venceu (ou
+    'enviando' abandonados há mais de `stale_after_seconds`), do mais antigo para o
+    mais novo. FOR UPDATE SKIP LOCKED permite um dispatcher por processo do uvicorn.
+
+    Um 'enviando' abandonado que já usou as `max_attempts` tentativas (ex.: derruba
+    o dispatcher toda vez) não é reservado de novo: vai para 'erro'.
+    """
+    abandonado = and_(
+        EmailOutbox.status == EmailOutboxStatus.enviando,
+        EmailOutbox.started_at < func.now() - timedelta(seconds=stale_after_seconds),
+    )
+    await db.execute(
+        update(EmailOutbox)
+        .where(abandonado, EmailOutbox.tentativas >= max_attempts)
+        .values(
+            status=EmailOutboxStatus.erro,
+            erro=f"Envio abandonado após {max_attempts} tentativa(s) sem confirmação.",
+        )
+        .execution_options(synchronize_session=False)
+    )
+    batch_ids = (
+        select(EmailOutbox.id)
+        .where(
+            or_(
+                and_(
+                    EmailOutbox.status == EmailOutboxStatus.pendente,
+                    EmailOutbox.proxima_tentativa_em <= func.now(),
+                ),
+                and_(abandonado, EmailOutbox.tentativas < max_attempts),
+            )
+        )
+        .order_by(EmailOutbox.proxima_tentativa_em)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    stmt = (
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(batch_ids.scalar_subquery()))
+        .values(
+            status=EmailOutboxStatus.enviando,
+            started_at=func.now(),
+            tentativas=EmailOutbox.tentativas + 1,
+        )
+        .returning(EmailOutbox)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    emails = list(result.scalars().all())
+    await db.commit()
+    return emails
+
+async def mark_emails_sent(db: AsyncSession, email_ids: List[uuid.UUID]):
+    if not email_ids:
+        return
+    await db.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(email_ids))
+        .values(status=EmailOutboxStatus.enviado, erro=None, sent_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+async def fail_email(db: AsyncSession, email_id: uuid.UUID, erro: str, retry_in_seconds: Optional[float]):
+    """
+    Registra a falha; com `retry_in_seconds` o e-mail volta para a fila e só é
+    tentado de novo depois desse intervalo, senão fica em 'erro'.
+    """
+    retry = retry_in_seconds is not None
+    await db.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id == email_id)
+        .values(
+            status=EmailOutboxStatus.pendente if retry else EmailOutboxStatus.erro,
+            erro=erro[:2000],
+            proxima_tentativa_em=func.now() + timedelta(seconds=retry_in_seconds) if retry else EmailOutbox.proxima_tentativa_em,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
@@ -1,22 +1,40 @@
+import hashlib
+import os
 import uuid
 from decimal import Decimal
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
+from fastapi import HTTPException
 from ..models import estoque as models, movimentacoes_estoque as mov_models
 from ..schemas import estoque as schemas, movimentacoes_estoque as mov_schemas
 from ..models.movimentacoes_estoque import TipoMovimentacao
 from ..services.notification_service import NotificationService
-from ..models.tenant_configs import ConfigKey
 from ..core.units import convert_units, get_unit_dimension, get_base_unit_for_dimension
+from ..core.pagination import paginate
+from ..models import tenants as tenant_models
+from ..models.pdf_jobs import PdfJobTipo
+from ..schemas.documento_paciente import DocumentoPacienteCreate
+from ..services.template_registry import RETIRADA_ESTOQUE_TEMPLATE
+from ..services.pdf_renderer import render as render_pdf
+from ..services.pdf_jobs import pdf_job_worker
+from ..services.email_dispatcher import email_dispatcher
+from . import pdf_jobs as pdf_jobs_crud
+from . import tenant_configs as tenant_configs_crud
+from .documentos_paciente import create_documento_paciente
+
+# Chave da paginação por cursor da listagem de itens de estoque.
+ESTOQUE_KEYSET = (models.Estoque.nome, models.Estoque.id)
 
 # CRUD for Estoque
 async def get_estoque_item(db: AsyncSession, item_id: uuid.UUID, tenant_id: uuid.UUID):
     result = await db.execute(select(models.Estoque).filter_by(id=item_id, tenant_id=tenant_id))
     return result.scalars().first()
 
-async def get_estoque_itens(db: AsyncSession, tenant_id: uuid.UUID, skip: int = 0, limit: int = 100):
-    result = await db.execute(select(models.Estoque).filter_by(tenant_id=tenant_id).offset(skip).limit(limit))
+async def get_estoque_itens(db: AsyncSession, tenant_id: uuid.UUID, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    stmt = select(models.Estoque).filter_by(tenant_id=tenant_id)
+    result = await db.execute(paginate(stmt, ESTOQUE_KEYSET, cursor, skip, limit))
     return result.scalars().all()
 
 async def create_estoque_item(db: AsyncSession, item: schemas.EstoqueCreate, tenant_id: uuid.UUID):
@@ -63,12 +81,6 @@ async def create_movimentacao(db: AsyncSession, movimentacao: mov_schemas.Movime
     if not db_item:
         raise HTTPException(status_code=404, detail="Item de estoque não encontrado.")
 
-    # Get tenant and paciente names for PDF path
-    tenant_result = await db.execute(select(tenant_models.Tenant).filter_by(id=tenant_id))
-    tenant = tenant_result.scalars().first()
-    paciente_result = await db.execute(select(paciente_models.Paciente).filter_by(id=movimentacao.paciente_id))
-    paciente = paciente_result.scalars().first()
-
     converted_quantidade = Decimal(str(movimentacao.quantidade))
 
     # Check for sufficient stock on 'saida'
@@ -88,67 +100,20 @@ async def create_movimentacao(db: AsyncSession, movimentacao: mov_schemas.Movime
     else: # saida
         db_item.quantidade -= converted_quantidade
     
-    await db.commit()
-    await db.refresh(db_movimentacao)
-
-    # Generate PDF
-    if tenant and paciente:
-        template_str = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Comprovante de Retirada de Material</title>
-            <style>
-                body { font-family: sans-serif; }
-                h1 { text-align: center; }
-                table { width: 100%; border-collapse: collapse; margin-top: 20px; }
-                th, td { border: 1px solid #dddddd; text-align: left; padding: 8px; }
-                th { background-color: #f2f2f2; }
-            </style>
-        </head>
-        <body>
-            <h1>Comprovante de Retirada de Material</h1>
-            <p><strong>Clínica:</strong> {{ tenant_name }}</p>
-            <p><strong>Paciente:</strong> {{ paciente_name }}</p>
-            <p><strong>Data:</strong> {{ data }}</p>
-            <table>
-                <tr>
-                    <th>Produto</th>
-                    <th>Quantidade</th>
-                    <th>Observação</th>
-                </tr>
-                <tr>
-                    <td>{{ produto_nome }}</td>
-                    <td>{{ quantidade }} {{ unidade }}</td>
-                    <td>{{ observacao }}</td>
-                </tr>
-            </table>
-        </body>
-        </html>
-        """
-        template = jinja2.Template(template_str)
-        html_content = template.render(
-            tenant_name=tenant.nome,
-            paciente_name=paciente.nome,
-            data=db_movimentacao.data.strftime("%d/%m/%Y %H:%M:%S"),
-            produto_nome=db_item.nome,
-            quantidade=db_movimentacao.quantidade,
-            unidade=db_item.unidade,
-            observacao=db_movimentacao.observacao or ''
-        )
-
-        pdf_path = os.path.join("storage", tenant.nome, "prontuario")
-        os.makedirs(pdf_path, exist_ok=True)
-        pdf_file = os.path.join(pdf_path, f"comprovante_{db_movimentacao.id}.pdf")
-        with open(pdf_file, "wb") as f:
-            pisa.CreatePDF(html_content, dest=f)
-
-    # Check for low stock and send alert
+    # O comprovante em PDF é gerado pelo worker de jobs (services/pdf_jobs), fora da requisição.
+    db_job = None
+    if movimentacao.paciente_id:
+        await db.flush()
+        db_job = await pdf_jobs_crud.enqueue_pdf_job(db, tenant_id, PdfJobTipo.retirada_estoque, db_movimentacao.id)
+
+    # Check for low stock and send alert (o e-mail entra na outbox, enviado pelo email_dispatcher)
+    db_email = None
     if db_item.quantidade <= db_item.min_quantidade:
         notification_service = NotificationService(db)
         # For now, assume a fixed recipient or fetch from tenant_configs if a specific key is defined for manager email
         # For simplicity, let's assume a config key for manager email exists or use a placeholder
-        manager_email = await notification_service._get_tenant_config(tenant_id, ConfigKey.smtp_user) # Using smtp_user as a placeholder for manager email
+        tenant_config = await tenant_configs_crud.get_tenant_config_snapshot(db, tenant_id)
+        manager_email = tenant_config.smtp_user # Using smtp_user as a placeholder for manager email
         if manager_email:
             subject = f"Alerta de Estoque Baixo: {db_item.nome}"
             body = f"""Prezado(a) Gestor(a),
@@ -161,11 +126,71 @@ Por favor, providencie a reposição.
 
 Atenciosamente,
 Sistema de Gestão de Clínicas"""
-            await notification_service.send_email(tenant_id, manager_email, subject, body)
+            db_email = await notification_service.send_email(tenant_id, manager_email, subject, body)
         else:
             print(f"WARNING: Estoque baixo para {db_item.nome}, mas e-mail do gestor não configurado para o tenant {tenant_id}.")
 
-    return db_movimentacao
+    await db.commit()
+    await db.refresh(db_movimentacao)
+    if db_job:
+        pdf_job_worker.notify()
+    if db_email:
+        email_dispatcher.notify()
+
+    return db_movimentacao, db_job
+
+async def gerar_comprovante_retirada(db: AsyncSession, movimentacao_id: uuid.UUID, tenant_id: uuid.UUID):
+    """
+    Gera o PDF do comprovante de uma movimentação com paciente e registra o
+    DocumentoPaciente. Executado pelo worker de jobs de PDF; erros são propagados.
+    """
+    result = await db.execute(
+        select(mov_models.MovimentacaoEstoque)
+        .options(selectinload(mov_models.MovimentacaoEstoque.produto), selectinload(mov_models.MovimentacaoEstoque.paciente))
+        .filter_by(id=movimentacao_id, tenant_id=tenant_id)
+    )
+    db_movimentacao = result.scalars().first()
+    if not db_movimentacao or not db_movimentacao.paciente:
+        raise LookupError(f"Movimentação {movimentacao_id} sem paciente não encontrada.")
+    db_item = db_movimentacao.produto
+    paciente = db_movimentacao.paciente
+    tenant_result = await db.execute(select(tenant_models.Tenant).filter_by(id=tenant_id))
+    tenant = tenant_result.scalars().first()
+
+    context = dict(
+        tenant_name=tenant.nome,
+        paciente_name=paciente.nome,
+        data=db_movimentacao.data.strftime("%d/%m/%Y %H:%M:%S"),
+        produto_nome=db_item.nome,
+        quantidade=db_movimentacao.quantidade,
+        unidade=db_item.unidade,
+        observacao=db_movimentacao.observacao or ''
+    )
+    pdf_bytes = await render_pdf(RETIRADA_ESTOQUE_TEMPLATE, context, tenant_id=tenant_id)
+
+    pdf_path = os.path.join("storage", tenant.nome, "prontuario")
+    os.makedirs(pdf_path, exist_ok=True)
+    pdf_file = os.path.join(pdf_path, f"comprovante_{db_movimentacao.id}.pdf")
+    arquivo_existia = os.path.exists(pdf_file)
+    with open(pdf_file, "wb") as f:
+        f.write(pdf_bytes)
+
+    documento_data = DocumentoPacienteCreate(
+        paciente_id=paciente.id,
+        nome_arquivo=os.path.basename(pdf_file),
+        caminho_arquivo=pdf_file,
+        tipo_documento="Comprovante de Retirada de Material",
+        checksum_sha256=hashlib.sha256(pdf_bytes).hexdigest(),
+        tamanho_bytes=len(pdf_bytes),
+    )
+    try:
+        return await create_documento_paciente(db, documento_data)
+    except Exception:
+        # Sem o registro, o PDF recém-gravado ficaria órfão no disco (um arquivo que já
+        # existia pode ter registro de uma geração anterior e fica).
+        if not arquivo_existia:
+            os.remove(pdf_file)
+        raise
 
 async def get_movimentacoes_for_item(db: AsyncSession, produto_id: uuid.UUID, tenant_id: uuid.UUID, skip: int = 0, limit: int = 100):
     result = await db.execute(
@@ -0,0 +1,83 @@
+from typing import Optional, Tuple
+from sqlalchemy import update, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+
+from ..models.file_blobs import FileBlob
+
+async def acquire_blob(
+    db: AsyncSession, escopo: str, sha256: str, caminho_candidato: str, tamanho_bytes: int
+) -> Tuple[str, bool]:
+    """
+    Registra mais uma referência ao conteúdo `sha256` da clínica `escopo`, sem commit.
+
+    Se o conteúdo é novo, o blob passa a usar `caminho_candidato` e retorna (caminho, True);
+    se já existe, incrementa o refcount e retorna (caminho existente, False).
+    O ON CONFLICT serializa uploads simultâneos do mesmo conteúdo.
+    """
+    stmt = (
+        insert(FileBlob)
+        .values(escopo=escopo, sha256=sha256, caminho_arquivo=caminho_candidato, tamanho_bytes=tamanho_bytes, refcount=1)
+        .on_conflict_do_update(
+            constraint="uq_file_blobs_escopo_sha256",
+            set_={"refcount": FileBlob.refcount + 1},
+        )
+        .returning(FileBlob.caminho_arquivo, FileBlob.refcount)
+    )
+    result = await db.execute(stmt)
+    caminho_arquivo, refcount = result.one()
+    return caminho_arquivo, refcount == 1
+
+async def retain_blob(db: AsyncSession, caminho_arquivo: str) -> Optional[FileBlob]:
+    """
+    Registra mais uma referência ao blob em `caminho_arquivo` (registro que passa a
+    apontar para um arquivo já armazenado), sem commit. Retorna o blob, ou None se o
+    caminho não é um blob (arquivo anterior à deduplicação).
+    """
+    result = await db.execute(
+        update(FileBlob)
+        .where(FileBlob.caminho_arquivo == caminho_arquivo)
+        .values(refcount=FileBlob.refcount + 1)
+        .returning(FileBlob)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalars().first()
+
+async def lock_blob_path(db: AsyncSession, caminho_arquivo: str):
+    """
+    Lock transacional (advisory) sobre o caminho de um blob, liberado no commit ou
+    rollback. Serializa a gravação do arquivo de um blob (upload) com a remoção
+    do arquivo de um blob liberado, que usam o mesmo caminho.
+    """
+    await db.execute(select(func.pg_advisory_xact_lock(func.hashtextextended(caminho_arquivo, 0))))
+
+async def release_blob(db: AsyncSession, caminho_arquivo: str) -> Optional[bool]:
+    """
+    Remove uma referência ao blob em `caminho_arquivo`, sem commit.
+    Retorna True se era a última (o arquivo pode ser apagado), False se ainda há
+    referências e None se o caminho não é um blob (arquivo anterior à deduplicação).
+    """
+    result = await db.execute(
+        update(FileBlob)
+        .where(FileBlob.caminho_arquivo == caminho_arquivo)
+        .values(refcount=FileBlob.refcount - 1)
+        .returning(FileBlob.refcount)
+        .execution_options(synchronize_session=False)
+    )
+    refcount = result.scalar_one_or_none()
+    if refcount is None:
+        return None
+    if refcount <= 0:
+        await db.execute(delete(FileBlob).where(FileBlob.caminho_arquivo == caminho_arquivo))
+        return True
+    return False
+
+async def get_blob_by_path(db: AsyncSession, caminho_arquivo: str) -> Optional[FileBlob]:
+    result = await db.execute(select(FileBlob).filter(FileBlob.caminho_arquivo == caminho_arquivo))
+    return result.scalars().first()
+
+async def get_blob_by_escopo_sha256(db: AsyncSession, escopo: str, sha256: str) -> Optional[FileBlob]:
+    result = await db.execute(select(FileBlob).filter(FileBlob.escopo == escopo, FileBlob.sha256 == sha256))
+    return result.scalars().first()
@@ -5,6 +5,10 @@ from sqlalchemy import func
 from typing import Optional # Import Optional
 from ..models import pacientes as models
 from ..schemas import pacientes as schemas
+from ..core.pagination import paginate
+
+# Chave da paginação por cursor da listagem de pacientes.
+PACIENTE_KEYSET = (models.Paciente.nome, models.Paciente.id)
 
 async def get_paciente(db: AsyncSession, paciente_id: uuid.UUID, tenant_id: Optional[uuid.UUID]):
     stmt = select(models.Paciente).filter(models.Paciente.id == paciente_id)
@@ -13,12 +17,12 @@ async def get_paciente(db: AsyncSession, paciente_id: uuid.UUID, tenant_id: Opti
     result = await db.execute(stmt)
     return result.scalars().first()
 
-async def get_pacientes(db: AsyncSession, tenant_id: Optional[uuid.UUID], skip: int = 0, limit: int = 100):
+async def get_pacientes(db: AsyncSession, tenant_id: Optional[uuid.UUID], skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
     stmt = select(models.Paciente)
     if tenant_id is not None:
         stmt = stmt.filter(models.Paciente.tenant_id == tenant_id)
     
-    result = await db.execute(stmt.offset(skip).limit(limit))
+    result = await db.execute(paginate(stmt, PACIENTE_KEYSET, cursor, skip, limit))
     return result.scalars().all()
 
 async def create_paciente(db: AsyncSession, paciente: schemas.PacienteCreate, tenant_id: uuid.UUID):
@@ -0,0 +1,110 @@
+import uuid
+from datetime import timedelta
+from typing import Optional
+from sqlalchemy import update, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+
+from ..models.pdf_jobs import PdfJob, PdfJobStatus, PdfJobTipo
+
+async def enqueue_pdf_job(db: AsyncSession, tenant_id: uuid.UUID, tipo: PdfJobTipo, referencia_id: uuid.UUID) -> PdfJob:
+    """
+    Registra um job de geração de PDF na sessão atual, sem commit: o job entra na
+    fila na mesma transação que a alteração que o originou.
+    """
+    db_job = PdfJob(tenant_id=tenant_id, tipo=tipo, referencia_id=referencia_id, status=PdfJobStatus.pendente)
+    db.add(db_job)
+    await db.flush()
+    return db_job
+
+async def get_pdf_job(db: AsyncSession, job_id: uuid.UUID, tenant_id: uuid.UUID) -> Optional[PdfJob]:
+    result = await db.execute(select(PdfJob).filter_by(id=job_id, tenant_id=tenant_id))
+    return result.scalars().first()
+
+async def claim_next_pdf_job(db: AsyncSession, stale_after_seconds: float, max_attempts: int) -> Optional[PdfJob]:
+    """
+    Reserva o job pendente mais antigo (ou um 'processando' abandonado há mais de
+    `stale_after_seconds`, ex.: worker reiniciado no meio do job).
+    FOR UPDATE SKIP LOCKED permite vários workers (um por processo do uvicorn) sem
+    que dois peguem o mesmo job.
+
+    Um job abandonado que já usou as `max_attempts` tentativas (ex.: derruba o
+    worker toda vez) não é reservado de novo: vai para 'erro'.
+    """
+    abandonado = and_(
+        PdfJob.status == PdfJobStatus.processando,
+        PdfJob.started_at < func.now() - timedelta(seconds=stale_after_seconds),
+    )
+    await db.execute(
+        update(PdfJob)
+        .where(abandonado, PdfJob.tentativas >= max_attempts)
+        .values(
+            status=PdfJobStatus.erro,
+            erro=f"Job abandonado após {max_attempts} tentativa(s) sem concluir.",
+            finished_at=func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    next_job_id = (
+        select(PdfJob.id)
+        .where(
+            or_(
+                PdfJob.status == PdfJobStatus.pendente,
+                and_(abandonado, PdfJob.tentativas < max_attempts),
+            )
+        )
+        .order_by(PdfJob.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(PdfJob)
+        .where(PdfJob.id == next_job_id)
+        .values(
+            status=PdfJobStatus.processando,
+            started_at=func.now(),
+            tentativas=PdfJob.tentativas + 1,
+        )
+        .returning(PdfJob)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    db_job = result.scalars().first()
+    await db.commit()
+    return db_job
+
+async def finish_pdf_job(
+    db: AsyncSession,
+    job_id: uuid.UUID,
+    documento_id: Optional[uuid.UUID],
+    arquivo_path: Optional[str],
+):
+    await db.execute(
+        update(PdfJob)
+        .where(PdfJob.id == job_id)
+        .values(
+            status=PdfJobStatus.concluido,
+            documento_id=documento_id,
+            arquivo_path=arquivo_path,
+            erro=None,
+            finished_at=func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+async def fail_pdf_job(db: AsyncSession, job_id: uuid.UUID, erro: str, retry: bool):
+    """Registra a falha; com `retry` o job volta para a fila, senão fica em 'erro'."""
+    await db.execute(
+        update(PdfJob)
+        .where(PdfJob.id == job_id)
+        .values(
+            status=PdfJobStatus.pendente if retry else PdfJobStatus.erro,
+            erro=erro[:2000],
+            finished_at=None if retry else func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
@@ -1,8 +1,9 @@
 from sqlalchemy.ext.asyncio import AsyncSession # Changed from Session
 from sqlalchemy import select, update, delete # Added imports
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 
+from app.crud import file_blobs as file_blobs_crud
 from app.models.prontuarios import Prontuario
 from app.schemas.prontuario import ProntuarioCreate, ProntuarioUpdate
 
@@ -26,11 +27,37 @@ async def create_prontuario(db: AsyncSession, prontuario: ProntuarioCreate) -> P
     await db.refresh(db_prontuario)
     return db_prontuario
 
-async def update_prontuario(db: AsyncSession, prontuario_id: UUID, prontuario: ProntuarioUpdate) -> Optional[Prontuario]:
-    stmt = update(Prontuario).where(Prontuario.id == prontuario_id).values(**prontuario.dict(exclude_unset=True))
+async def update_prontuario(db: AsyncSession, prontuario_id: UUID, prontuario: ProntuarioUpdate) -> Tuple[Optional[Prontuario], Optional[str]]:
+    """
+    Atualiza o registro e faz commit. Se o caminho do arquivo mudar, a referência passa
+    do blob antigo para o novo (file_blobs) na mesma transação.
+    Retorna (db_prontuario, caminho liberado): o caminho antigo quando ficou sem referências,
+    para ser apagado com file_storage_service.delete_released_file após o commit.
+    """
+    values = prontuario.dict(exclude_unset=True)
+    arquivo_liberado = None
+    if "caminho_arquivo" in values:
+        result = await db.execute(
+            select(Prontuario.caminho_arquivo).where(Prontuario.id == prontuario_id).with_for_update()
+        )
+        row = result.first()
+        if row is None:
+            return None, None
+        caminho_anterior, caminho_novo = row.caminho_arquivo, values["caminho_arquivo"]
+        if caminho_novo != caminho_anterior:
+            blob = await file_blobs_crud.retain_blob(db, caminho_novo) if caminho_novo else None
+            # Outro arquivo: o checksum antigo (ETag do download) deixa de valer
+            values.update(
+                checksum_sha256=blob.sha256 if blob else None,
+                tamanho_bytes=blob.tamanho_bytes if blob else None,
+            )
+            # Arquivos anteriores à deduplicação (sem blob) não são apagados aqui.
+            if caminho_anterior and await file_blobs_crud.release_blob(db, caminho_anterior):
+                arquivo_liberado = caminho_anterior
+    stmt = update(Prontuario).where(Prontuario.id == prontuario_id).values(**values)
     await db.execute(stmt)
     await db.commit()
-    return await get_prontuario(db, prontuario_id) # Fetch updated object
+    return await get_prontuario(db, prontuario_id), arquivo_liberado # Fetch updated object
 
 async def delete_prontuario(db: AsyncSession, prontuario_id: UUID) -> Optional[Prontuario]:
     db_prontuario = await get_prontuario(db, prontuario_id) # Fetch object before deleting
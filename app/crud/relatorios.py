@@ -1,31 +1,86 @@
 import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func, cast, Date
-from datetime import datetime
+from sqlalchemy import func, cast, Date, Float, literal, or_, tuple_, union_all
+from datetime import date, datetime, time, timedelta
+from typing import Optional, Tuple
 
-from ..models import agendamentos as agendamento_models, users as user_models, servicos as servico_models, prontuarios as prontuario_models, tratamentos as tratamento_models, planos_custo as plano_custo_models, pacientes as paciente_models
+from ..models import agendamentos as agendamento_models, users as user_models, servicos as servico_models, prontuarios as prontuario_models, tratamentos as tratamento_models, tratamento_servicos as tratamento_servico_models, planos_custo as plano_custo_models, pacientes as paciente_models
+from ..models.atendimentos_diarios import AtendimentoDiario, SEM_SERVICO
 from ..schemas import relatorios as schemas
 
+def _dias_fechados(start_date: datetime, end_date: datetime) -> Optional[Tuple[date, date]]:
+    """
+    Intervalo [primeiro, ultimo) dos dias inteiros dentro do período e anteriores a
+    hoje, que os relatórios leem dos agregados diários. None se não houver nenhum.
+
+    O agregado conta o agendamento no dia do `inicio`, sem olhar o `fim`; por isso o
+    dia imediatamente anterior ao de `end_date` fica de fora e é lido dos agendamentos,
+    onde vale `fim <= end_date` (um atendimento que começa nesse dia pode terminar
+    depois de `end_date`, p.ex. com `end_date` à meia-noite). Dias anteriores só
+    divergiriam com atendimentos de mais de 24 horas.
+    """
+    primeiro = start_date.date() if start_date.time() == time.min else start_date.date() + timedelta(days=1)
+    ultimo = min(end_date.date() - timedelta(days=1), date.today())
+    if ultimo <= primeiro:
+        return None
+    return primeiro, ultimo
+
+def _atendimentos_concluidos(tenant_id: uuid.UUID, start_date: datetime, end_date: datetime):
+    """
+    Agendamentos concluídos do período por acadêmico e serviço (academico_id,
+    servico_id, quantidade, segundos): os dias fechados vêm de atendimentos_diarios
+    e só as bordas do período e o dia de hoje são lidos de agendamentos.
+    """
+    Agendamento = agendamento_models.Agendamento
+    brutos = select(
+        Agendamento.academico_id,
+        func.coalesce(Agendamento.servico_id, SEM_SERVICO).label('servico_id'),
+        literal(1).label('quantidade'),
+        cast(func.extract('epoch', Agendamento.fim - Agendamento.inicio), Float).label('segundos'),
+    ).filter(
+        Agendamento.tenant_id == tenant_id,
+        Agendamento.status == agendamento_models.AppointmentStatus.concluido, # Only count concluded appointments
+        Agendamento.inicio >= start_date,
+        Agendamento.fim <= end_date
+    )
+
+    dias = _dias_fechados(start_date, end_date)
+    if dias is None:
+        return brutos.subquery()
+
+    primeiro, ultimo = dias
+    brutos = brutos.filter(or_(
+        Agendamento.inicio < datetime.combine(primeiro, time.min),
+        Agendamento.inicio >= datetime.combine(ultimo, time.min),
+    ))
+    agregados = select(
+        AtendimentoDiario.academico_id,
+        AtendimentoDiario.servico_id,
+        AtendimentoDiario.quantidade,
+        AtendimentoDiario.segundos_atendimento.label('segundos'),
+    ).filter(
+        AtendimentoDiario.tenant_id == tenant_id,
+        AtendimentoDiario.dia >= primeiro,
+        AtendimentoDiario.dia < ultimo
+    )
+    return union_all(agregados, brutos).subquery()
+
 async def get_horas_atendimento_academico(db: AsyncSession, tenant_id: uuid.UUID, start_date: datetime, end_date: datetime) -> schemas.RelatorioHorasAtendimento:
     # Ensure dates are naive for comparison with TIMESTAMP columns
     start_date = start_date.replace(tzinfo=None)
     end_date = end_date.replace(tzinfo=None)
 
+    atendimentos = _atendimentos_concluidos(tenant_id, start_date, end_date)
     result = await db.execute(
         select(
             user_models.SystemUser.id,
             user_models.SystemUser.nome,
-            func.sum(func.extract('epoch', agendamento_models.Agendamento.fim - agendamento_models.Agendamento.inicio) / 3600).label('total_horas')
-        )
-        .join(user_models.SystemUser, agendamento_models.Agendamento.profissional_id == user_models.SystemUser.id)
-        .filter(
-            agendamento_models.Agendamento.tenant_id == tenant_id,
-            agendamento_models.Agendamento.status == agendamento_models.AppointmentStatus.concluido, # Only count concluded appointments
-            agendamento_models.Agendamento.inicio >= start_date,
-            agendamento_models.Agendamento.fim <= end_date
+            (func.sum(atendimentos.c.segundos) / 3600).label('total_horas')
         )
+        .join(user_models.SystemUser, atendimentos.c.academico_id == user_models.SystemUser.id)
         .group_by(user_models.SystemUser.id, user_models.SystemUser.nome)
+        .having(func.sum(atendimentos.c.quantidade) > 0)
         .order_by(user_models.SystemUser.nome)
     )
     
@@ -47,22 +102,18 @@ async def get_procedimentos_por_estudante(db: AsyncSession, tenant_id: uuid.UUID
     start_date = start_date.replace(tzinfo=None)
     end_date = end_date.replace(tzinfo=None)
 
+    atendimentos = _atendimentos_concluidos(tenant_id, start_date, end_date)
     result = await db.execute(
         select(
             user_models.SystemUser.id,
             user_models.SystemUser.nome,
             servico_models.Servico.nome.label('servico_nome'),
-            func.count(agendamento_models.Agendamento.id).label('quantidade')
-        )
-        .join(user_models.SystemUser, agendamento_models.Agendamento.profissional_id == user_models.SystemUser.id)
-        .join(servico_models.Servico, agendamento_models.Agendamento.servico_id == servico_models.Servico.id)
-        .filter(
-            agendamento_models.Agendamento.tenant_id == tenant_id,
-            agendamento_models.Agendamento.status == agendamento_models.AppointmentStatus.concluido, # Only count concluded appointments
-            agendamento_models.Agendamento.inicio >= start_date,
-            agendamento_models.Agendamento.fim <= end_date
+            func.sum(atendimentos.c.quantidade).label('quantidade')
         )
+        .join(user_models.SystemUser, atendimentos.c.academico_id == user_models.SystemUser.id)
+        .join(servico_models.Servico, atendimentos.c.servico_id == servico_models.Servico.id)
         .group_by(user_models.SystemUser.id, user_models.SystemUser.nome, servico_models.Servico.nome)
+        .having(func.sum(atendimentos.c.quantidade) > 0)
         .order_by(user_models.SystemUser.nome, servico_models.Servico.nome)
     )
 
@@ -129,76 +180,62 @@ async def get_visao_geral_agendamentos(db: AsyncSession, tenant_id: uuid.UUID, s
     start_date = start_date.replace(tzinfo=None)
     end_date = end_date.replace(tzinfo=None)
 
-    # Total appointments
-    total_agendamentos_result = await db.execute(
-        select(func.count(agendamento_models.Agendamento.id))
-        .filter(
-            agendamento_models.Agendamento.tenant_id == tenant_id,
-            agendamento_models.Agendamento.inicio >= start_date,
-            agendamento_models.Agendamento.fim <= end_date
-        )
-    )
-    total_agendamentos = total_agendamentos_result.scalar_one()
+    Agendamento = agendamento_models.Agendamento
+    SystemUser = user_models.SystemUser
+    Servico = servico_models.Servico
 
-    # Appointments by status
-    agendamentos_por_status_result = await db.execute(
+    # Uma única leitura do período: GROUPING SETS produz as contagens por status, por
+    # profissional e por serviço; GROUPING() = 0 indica a qual conjunto a linha pertence.
+    result = await db.execute(
         select(
-            agendamento_models.Agendamento.status,
-            func.count(agendamento_models.Agendamento.id)
+            Agendamento.status,
+            Agendamento.academico_id,
+            SystemUser.nome.label('nome_profissional'),
+            Agendamento.servico_id,
+            Servico.nome.label('nome_servico'),
+            func.count(Agendamento.id).label('quantidade'),
+            func.grouping(Agendamento.status).label('sem_status'),
+            func.grouping(Agendamento.academico_id).label('sem_profissional'),
+            func.grouping(Agendamento.servico_id).label('sem_servico'),
         )
+        .select_from(Agendamento)
+        .outerjoin(SystemUser, Agendamento.academico_id == SystemUser.id)
+        .outerjoin(Servico, Agendamento.servico_id == Servico.id)
         .filter(
-            agendamento_models.Agendamento.tenant_id == tenant_id,
-            agendamento_models.Agendamento.inicio >= start_date,
-            agendamento_models.Agendamento.fim <= end_date
+            Agendamento.tenant_id == tenant_id,
+            Agendamento.inicio >= start_date,
+            Agendamento.fim <= end_date
         )
-        .group_by(agendamento_models.Agendamento.status)
-    )
-    agendamentos_por_status = [
-        schemas.AgendamentosPorStatus(status=row.status.value, quantidade=row.count)
-        for row in agendamentos_por_status_result.all()
-    ]
-
-    # Appointments by professional
-    agendamentos_por_profissional_result = await db.execute(
-        select(
-            user_models.SystemUser.id,
-            user_models.SystemUser.nome,
-            func.count(agendamento_models.Agendamento.id)
-        )
-        .join(user_models.SystemUser, agendamento_models.Agendamento.profissional_id == user_models.SystemUser.id)
-        .filter(
-            agendamento_models.Agendamento.tenant_id == tenant_id,
-            agendamento_models.Agendamento.inicio >= start_date,
-            agendamento_models.Agendamento.fim <= end_date
+        .group_by(
+            func.grouping_sets(
+                tuple_(Agendamento.status),
+                tuple_(Agendamento.academico_id, SystemUser.nome),
+                tuple_(Agendamento.servico_id, Servico.nome),
+            )
         )
-        .group_by(user_models.SystemUser.id, user_models.SystemUser.nome)
-        .order_by(user_models.SystemUser.nome)
+        .order_by(SystemUser.nome, Servico.nome)
     )
-    agendamentos_por_profissional = [
-        schemas.AgendamentosPorProfissional(profissional_id=row.id, nome_profissional=row.nome, quantidade=row.count)
-        for row in agendamentos_por_profissional_result.all()
-    ]
 
-    # Appointments by service
-    agendamentos_por_servico_result = await db.execute(
-        select(
-            servico_models.Servico.id,
-            servico_models.Servico.nome,
-            func.count(agendamento_models.Agendamento.id)
-        )
-        .join(servico_models.Servico, agendamento_models.Agendamento.servico_id == servico_models.Servico.id)
-        .filter(
-            agendamento_models.Agendamento.tenant_id == tenant_id,
-            agendamento_models.Agendamento.inicio >= start_date,
-            agendamento_models.Agendamento.fim <= end_date
-        )
-        .group_by(servico_models.Servico.id, servico_models.Servico.nome)
-        .order_by(servico_models.Servico.nome)
-    )
-    agendamentos_por_servico = [
-        schemas.AgendamentosPorServico(servico_id=row.id, nome_servico=row.nome, quantidade=row.count)
-        for row in agendamentos_por_servico_result.all()
-    ]
+    agendamentos_por_status = []
+    agendamentos_por_profissional = []
+    agendamentos_por_servico = []
+    for row in result.all():
+        if row.sem_status == 0:
+            agendamentos_por_status.append(schemas.AgendamentosPorStatus(status=row.status.value, quantidade=row.quantidade))
+        elif row.sem_profissional == 0:
+            # Como no join anterior, agendamentos sem profissional/serviço cadastrado ficam de fora da lista
+            if row.nome_profissional is not None:
+                agendamentos_por_profissional.append(schemas.AgendamentosPorProfissional(
+                    profissional_id=row.academico_id, nome_profissional=row.nome_profissional, quantidade=row.quantidade
+                ))
+        elif row.sem_servico == 0:
+            if row.servico_id is not None and row.nome_servico is not None:
+                agendamentos_por_servico.append(schemas.AgendamentosPorServico(
+                    servico_id=row.servico_id, nome_servico=row.nome_servico, quantidade=row.quantidade
+                ))
+
+    # status é obrigatório, então a soma por status é o total do período
+    total_agendamentos = sum(item.quantidade for item in agendamentos_por_status)
 
     return schemas.VisaoGeralAgendamentos(
         data_inicio=start_date.isoformat(),
@@ -241,111 +278,85 @@ async def get_resumo_financeiro(db: AsyncSession, tenant_id: uuid.UUID, start_da
     start_date = start_date.replace(tzinfo=None)
     end_date = end_date.replace(tzinfo=None)
 
-    # Total planos_custo
-    total_planos_custo_result = await db.execute(
-        select(func.count(plano_custo_models.PlanoCusto.id))
-        .filter(
-            plano_custo_models.PlanoCusto.tenant_id == tenant_id,
-            plano_custo_models.PlanoCusto.created_at >= start_date,
-            plano_custo_models.PlanoCusto.created_at <= end_date
-        )
-    )
-    total_planos_custo = total_planos_custo_result.scalar_one()
+    PlanoCusto = plano_custo_models.PlanoCusto
+    PlanoCustoStatus = plano_custo_models.PlanoCustoStatus
 
-    # Total valor by status
-    total_valor_aprovado_result = await db.execute(
-        select(func.sum(plano_custo_models.PlanoCusto.valor_total))
-        .filter(
-            plano_custo_models.PlanoCusto.tenant_id == tenant_id,
-            plano_custo_models.PlanoCusto.status == plano_custo_models.PlanoCustoStatus.aprovado,
-            plano_custo_models.PlanoCusto.created_at >= start_date,
-            plano_custo_models.PlanoCusto.created_at <= end_date
+    # Total e valores por status numa única leitura (agregados com FILTER)
+    result = await db.execute(
+        select(
+            func.count(PlanoCusto.id).label('total_planos_custo'),
+            func.sum(PlanoCusto.valor_total).filter(PlanoCusto.status == PlanoCustoStatus.aprovado).label('total_valor_aprovado'),
+            func.sum(PlanoCusto.valor_total).filter(PlanoCusto.status == PlanoCustoStatus.pendente).label('total_valor_pendente'),
+            func.sum(PlanoCusto.valor_total).filter(PlanoCusto.status == PlanoCustoStatus.cancelado).label('total_valor_cancelado'),
         )
-    )
-    total_valor_aprovado = total_valor_aprovado_result.scalar_one() or 0.0
-
-    total_valor_pendente_result = await db.execute(
-        select(func.sum(plano_custo_models.PlanoCusto.valor_total))
         .filter(
-            plano_custo_models.PlanoCusto.tenant_id == tenant_id,
-            plano_custo_models.PlanoCusto.status == plano_custo_models.PlanoCustoStatus.pendente,
-            plano_custo_models.PlanoCusto.created_at >= start_date,
-            plano_custo_models.PlanoCusto.created_at <= end_date
+            PlanoCusto.tenant_id == tenant_id,
+            PlanoCusto.created_at >= start_date,
+            PlanoCusto.created_at <= end_date
         )
     )
-    total_valor_pendente = total_valor_pendente_result.scalar_one() or 0.0
-
-    total_valor_cancelado_result = await db.execute(
-        select(func.sum(plano_custo_models.PlanoCusto.valor_total))
-        .filter(
-            plano_custo_models.PlanoCusto.tenant_id == tenant_id,
-            plano_custo_models.PlanoCusto.status == plano_custo_models.PlanoCustoStatus.cancelado,
-            plano_custo_models.PlanoCusto.created_at >= start_date,
-            plano_custo_models.PlanoCusto.created_at <= end_date
-        )
-    )
-    total_valor_cancelado = total_valor_cancelado_result.scalar_one() or 0.0
+    row = result.one()
 
     return schemas.ResumoFinanceiro(
         data_inicio=start_date.isoformat(),
         data_fim=end_date.isoformat(),
-        total_planos_custo=total_planos_custo,
-        total_valor_aprovado=float(total_valor_aprovado),
-        total_valor_pendente=float(total_valor_pendente),
-        total_valor_cancelado=float(total_valor_cancelado)
+        total_planos_custo=row.total_planos_custo,
+        total_valor_aprovado=float(row.total_valor_aprovado or 0.0),
+        total_valor_pendente=float(row.total_valor_pendente or 0.0),
+        total_valor_cancelado=float(row.total_valor_cancelado or 0.0)
     )
 
 async def get_custos_tratamento_por_periodo(db: AsyncSession, tenant_id: uuid.UUID, start_date: datetime, end_date: datetime) -> schemas.RelatorioCustosTratamento:
     start_date = start_date.replace(tzinfo=None)
     end_date = end_date.replace(tzinfo=None)
 
-    # Fetch treatments within the period
-    treatments_query = select(
-        tratamento_models.Tratamento,
-        paciente_models.Paciente.nome.label('nome_paciente')
-    ).join(
-        paciente_models.Paciente, tratamento_models.Tratamento.paciente_id == paciente_models.Paciente.id
-    ).filter(
-        tratamento_models.Tratamento.tenant_id == tenant_id,
-        tratamento_models.Tratamento.created_at >= start_date,
-        tratamento_models.Tratamento.created_at <= end_date
+    Tratamento = tratamento_models.Tratamento
+    TratamentoServico = tratamento_servico_models.TratamentoServico
+    Servico = servico_models.Servico
+
+    # Tratamentos do período com seus serviços numa única consulta (LEFT JOIN: tratamentos sem
+    # serviços aparecem com custo zero), lida em streaming e agrupada por tratamento.
+    result = await db.stream(
+        select(
+            Tratamento.id,
+            Tratamento.nome.label('nome_tratamento'),
+            paciente_models.Paciente.nome.label('nome_paciente'),
+            Servico.nome.label('servico_nome'),
+            (Servico.valor * func.coalesce(TratamentoServico.quantidade, 1)).label('custo')
+        )
+        .join(paciente_models.Paciente, Tratamento.paciente_id == paciente_models.Paciente.id)
+        .outerjoin(TratamentoServico, TratamentoServico.tratamento_id == Tratamento.id)
+        .outerjoin(Servico, TratamentoServico.servico_id == Servico.id)
+        .filter(
+            Tratamento.tenant_id == tenant_id,
+            Tratamento.created_at >= start_date,
+            Tratamento.created_at <= end_date
+        )
+        .order_by(Tratamento.created_at, Tratamento.id, Servico.nome)
     )
-    treatments_result = await db.execute(treatments_query)
-    treatments = treatments_result.scalars().all()
 
     report_data = []
     total_geral_custos = 0.0
-
-    for tratamento in treatments:
-        # Fetch services associated with each treatment
-        servicos_tratamento_query = select(
-            servico_models.Servico.nome.label('servico_nome'),
-            servico_models.Servico.custo.label('custo')
-        ).join(
-            tratamento_models.TratamentoServico, tratamento_models.TratamentoServico.servico_id == servico_models.Servico.id
-        ).filter(
-            tratamento_models.TratamentoServico.tratamento_id == tratamento.id
-        )
-        servicos_tratamento_result = await db.execute(servicos_tratamento_query)
-        servicos_incluidos = [
-            schemas.CustoServicoTratamento(servico_nome=row.servico_nome, custo=float(row.custo))
-            for row in servicos_tratamento_result.all()
-        ]
-
-        custo_total_tratamento = sum(s.custo for s in servicos_incluidos)
-        total_geral_custos += custo_total_tratamento
-
-        report_data.append(schemas.CustoTratamento(
-            tratamento_id=tratamento.id,
-            nome_tratamento=tratamento.descricao, # Assuming descricao is the treatment name
-            nome_paciente=tratamento.nome_paciente,
-            custo_total_tratamento=float(custo_total_tratamento),
-            servicos_incluidos=servicos_incluidos
-        ))
+    current = None
+    async for row in result:
+        if current is None or current.tratamento_id != row.id:
+            current = schemas.CustoTratamento(
+                tratamento_id=row.id,
+                nome_tratamento=row.nome_tratamento,
+                nome_paciente=row.nome_paciente,
+                custo_total_tratamento=0.0,
+                servicos_incluidos=[]
+            )
+            report_data.append(current)
+        if row.servico_nome is not None:
+            custo = float(row.custo or 0.0)
+            current.servicos_incluidos.append(schemas.CustoServicoTratamento(servico_nome=row.servico_nome, custo=custo))
+            current.custo_total_tratamento += custo
+            total_geral_custos += custo
 
     return schemas.RelatorioCustosTratamento(
         data_inicio=start_date.isoformat(),
         data_fim=end_date.isoformat(),
         relatorio=report_data,
         total_geral_custos=float(total_geral_custos)
-    )
\ No newline at end of file
+    )
@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from ..models import tenant_configs as models
 from ..schemas import tenant_configs as schemas
+from ..core.tenant_config_cache import tenant_config_cache, TenantConfigSnapshot
 
 async def get_tenant_config(db: AsyncSession, config_id: uuid.UUID, tenant_id: uuid.UUID):
     result = await db.execute(select(models.TenantConfig).filter_by(id=config_id, tenant_id=tenant_id))
@@ -13,6 +14,22 @@ async def get_tenant_configs(db: AsyncSession, tenant_id: uuid.UUID, skip: int =
     result = await db.execute(select(models.TenantConfig).filter_by(tenant_id=tenant_id).offset(skip).limit(limit))
     return result.scalars().all()
 
+async def get_tenant_config_snapshot(db: AsyncSession, tenant_id: uuid.UUID) -> TenantConfigSnapshot:
+    """Todas as configurações do tenant, do cache ou (numa única consulta) do banco."""
+    snapshot = tenant_config_cache.get(tenant_id)
+    if snapshot is not None:
+        return snapshot
+    generation = tenant_config_cache.generation(tenant_id)
+    result = await db.execute(
+        select(models.TenantConfig.config_key, models.TenantConfig.config_value)
+        .filter_by(tenant_id=tenant_id)
+        .order_by(models.TenantConfig.created_at)
+    )
+    # Chave cadastrada mais de uma vez: vale a criada por último
+    snapshot = TenantConfigSnapshot(tenant_id=tenant_id, values={key: value for key, value in result.all()})
+    tenant_config_cache.set(snapshot, generation)
+    return snapshot
+
 async def create_tenant_config(db: AsyncSession, config: schemas.TenantConfigCreate, tenant_id: uuid.UUID):
     db_config = models.TenantConfig(
         **config.model_dump(),
@@ -20,6 +37,7 @@ async def create_tenant_config(db: AsyncSession, config: schemas.TenantConfigCre
     )
     db.add(db_config)
     await db.commit()
+    tenant_config_cache.invalidate(tenant_id)
     await db.refresh(db_config)
     return db_config
 
@@ -31,6 +49,7 @@ async def update_tenant_config(db: AsyncSession, config_id: uuid.UUID, config_da
         for key, value in update_data.items():
             setattr(db_config, key, value)
         await db.commit()
+        tenant_config_cache.invalidate(tenant_id)
         await db.refresh(db_config)
     return db_config
 
@@ -40,4 +59,5 @@ async def delete_tenant_config(db: AsyncSession, config_id: uuid.UUID, tenant_id
     if db_config:
         await db.delete(db_config)
         await db.commit()
+        tenant_config_cache.invalidate(tenant_id)
     return db_config
@@ -18,8 +18,8 @@ from ..crud import consentimentos_paciente as consent_crud
 # Dependências usadas em finalizar_tratamento
 from ..models import tenants as tenant_models, pacientes as paciente_models, users as user_models
 from ..crud import agendamentos as agendamentos_crud
-import jinja2
-from xhtml2pdf import pisa
+from ..services.template_registry import TRATAMENTO_TEMPLATE
+from ..services.pdf_renderer import render as render_pdf
 
 
 # Utilitário compatível com Pydantic v1/v2
@@ -312,50 +312,8 @@ async def finalizar_tratamento(
                 }
             )
 
-    # Template HTML do relatório
-    template_str = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset=\"utf-8\" />
-        <title>Relatório de Tratamento</title>
-        <style>
-            body { font-family: sans-serif; }
-            h1, h2 { text-align: center; }
-            table { width: 100%; border-collapse: collapse; margin-top: 20px; }
-            th, td { border: 1px solid #dddddd; text-align: left; padding: 8px; }
-            th { background-color: #f2f2f2; }
-        </style>
-    </head>
-    <body>
-        <h1>Relatório de Tratamento</h1>
-        <h2>{{ tratamento_nome }}</h2>
-        <p><strong>Clínica:</strong> {{ tenant_name }}</p>
-        <p><strong>Paciente:</strong> {{ paciente_name }}</p>
-        <p><strong>Data de Finalização:</strong> {{ data_finalizacao }}</p>
-        <h3>Serviços Realizados</h3>
-        <table>
-            <tr>
-                <th>Serviço</th>
-                <th>Data e Hora</th>
-                <th>Acadêmico</th>
-                <th>Monitor</th>
-            </tr>
-            {% for servico in servicos %}
-            <tr>
-                <td>{{ servico.nome }}</td>
-                <td>{{ servico.data }}</td>
-                <td>{{ servico.academico }}</td>
-                <td>{{ servico.monitor }}</td>
-            </tr>
-            {% endfor %}
-        </table>
-    </body>
-    </html>
-    """
-
-    template = jinja2.Template(template_str)
-    html_content = template.render(
+
+    context = dict(
         tratamento_nome=db_tratamento.nome,
         tenant_name=getattr(tenant, "nome", "N/A"),
         paciente_name=getattr(paciente, "nome", "N/A"),
@@ -380,10 +338,11 @@ async def finalizar_tratamento(
     pdf_file_name = f"tratamento_{db_tratamento.id}.pdf"
     pdf_file_path = os.path.join(dir_path, pdf_file_name)
 
-    # Geração de PDF (pode falhar se dependências de sistema do WeasyPrint não estiverem presentes)
+    # Geração de PDF no pool de processos (pode falhar por timeout ou fila cheia)
     try:
+        pdf_bytes = await render_pdf(TRATAMENTO_TEMPLATE, context, tenant_id=tenant_id)
         with open(pdf_file_path, "wb") as f:
-            pisa.CreatePDF(html_content, dest=f)
+            f.write(pdf_bytes)
     except Exception as e:
         # Em produção, troque por log apropriado
         # Não interrompe a finalização do tratamento
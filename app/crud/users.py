@@ -3,7 +3,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from ..models import users as models
 from ..schemas import users as schemas
-from ..core.security import get_password_hash
+from ..core.security import get_password_hash_async
+from ..core.user_cache import principal_cache
 from fastapi import HTTPException, status
 from typing import List
 from sqlalchemy.orm import relationship
@@ -38,7 +39,7 @@ async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100, tenant_id
     return result.scalars().unique().all()
 
 async def create_user(db: AsyncSession, user: schemas.UserCreate, ldap_dn: str = None):
-    hashed_password = get_password_hash(user.password) if user.password else None
+    hashed_password = await get_password_hash_async(user.password) if user.password else None
     
     # Ensure default_tenant_id is provided for new users
     if not user.default_tenant_id:
@@ -74,6 +75,7 @@ async def update_user(db: AsyncSession, user_id: uuid.UUID, user_data: schemas.U
     result = await db.execute(select(models.SystemUser).filter(models.SystemUser.id == user_id))
     db_user = result.scalars().first()
     if db_user:
+        previous_username = db_user.username
         update_data = user_data.model_dump(exclude_unset=True)
         
         if "academic_advisors" in update_data:
@@ -95,7 +97,7 @@ async def update_user(db: AsyncSession, user_id: uuid.UUID, user_data: schemas.U
 
         if "password" in update_data:
             if update_data["password"]:
-                hashed_password = get_password_hash(update_data["password"])
+                hashed_password = await get_password_hash_async(update_data["password"])
                 update_data["senha_hash"] = hashed_password
             del update_data["password"]
         
@@ -103,6 +105,9 @@ async def update_user(db: AsyncSession, user_id: uuid.UUID, user_data: schemas.U
             setattr(db_user, key, value)
         
         await db.commit()
+        # Remove o usuário do cache de autenticação (inclusive pelo username anterior)
+        principal_cache.invalidate(previous_username)
+        principal_cache.invalidate(db_user.username)
         await db.refresh(db_user)
         # Ensure my_advisors relationship is loaded before returning
         await db.refresh(db_user, attribute_names=["my_advisors"])
@@ -114,6 +119,7 @@ async def delete_user(db: AsyncSession, user_id: uuid.UUID):
     if db_user:
         await db.delete(db_user)
         await db.commit()
+        principal_cache.invalidate(db_user.username)
     return db_user
 
 async def get_users_by_role(db: AsyncSession, role: UserRole, tenant_id: uuid.UUID):
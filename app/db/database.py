@@ -4,11 +4,33 @@ from sqlalchemy.orm import sessionmaker, declarative_base
 # Importa o objeto de configurações centralizadas.
 from ..core.config import settings
 
+def _engine_options(database_url: str) -> dict:
+    """
+    Monta os parâmetros do pool de conexões a partir das configurações.
+    O cache de prepared statements só se aplica ao driver asyncpg.
+    """
+    if database_url.startswith("sqlite"):
+        # O SQLite (usado em ambientes locais) não usa pool com tamanho configurável.
+        return {}
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if "+asyncpg" in database_url:
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        }
+    return options
+
 # Cria o motor (engine) de conexão assíncrona com o banco de dados.
-# A URL de conexão é lida diretamente do nosso objeto de configurações.
+# A URL de conexão e o dimensionamento do pool são lidos do nosso objeto de configurações.
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=False,  # Mude para True para ver os comandos SQL gerados no console
+    **_engine_options(settings.DATABASE_URL),
 )
 
 # Cria uma fábrica de sessões assíncronas.
@@ -18,6 +40,22 @@ AsyncSessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=engine, class_=AsyncSession, expire_on_commit=False
 )
 
+# Motor opcional para a réplica somente leitura. Sem READ_DATABASE_URL,
+# as sessões de leitura usam o mesmo motor do banco principal.
+read_engine = (
+    create_async_engine(
+        settings.READ_DATABASE_URL,
+        echo=False,
+        **_engine_options(settings.READ_DATABASE_URL),
+    )
+    if settings.READ_DATABASE_URL
+    else None
+)
+
+ReadSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=read_engine or engine, class_=AsyncSession, expire_on_commit=False
+)
+
 # Cria uma classe base para os modelos declarativos do SQLAlchemy.
 Base = declarative_base()
 
@@ -25,3 +63,47 @@ Base = declarative_base()
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
+
+# Dependência para consultas somente leitura (relatórios e listagens).
+# A réplica pode estar alguns instantes atrasada em relação ao banco principal;
+# rotas que precisam ler o que acabaram de gravar devem continuar usando get_db.
+async def get_read_db():
+    async with ReadSessionLocal() as session:
+        yield session
+
+def _pool_settings(db_engine, database_url: str) -> dict:
+    options = _engine_options(database_url)
+    return {
+        "pool_class": type(db_engine.pool).__name__,
+        "pool_size": options.get("pool_size"),
+        "max_overflow": options.get("max_overflow"),
+        "pool_timeout": options.get("pool_timeout"),
+        "pool_recycle": options.get("pool_recycle"),
+        "pool_pre_ping": options.get("pool_pre_ping"),
+        "prepared_statement_cache_size": options.get("connect_args", {}).get("prepared_statement_cache_size"),
+    }
+
+def _pool_status(db_engine) -> dict:
+    pool = db_engine.pool
+    status = {"pool_class": type(pool).__name__}
+    # Pools sem fila (ex.: NullPool/StaticPool do SQLite) não expõem contadores.
+    if hasattr(pool, "checkedout"):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": pool.overflow(),
+        })
+    return status
+
+def pool_settings_report() -> dict:
+    """Valores efetivos de configuração do pool (exibidos na inicialização)."""
+    report = {"primary": _pool_settings(engine, settings.DATABASE_URL)}
+    report["replica"] = _pool_settings(read_engine, settings.READ_DATABASE_URL) if read_engine else None
+    return report
+
+def pool_status() -> dict:
+    """Estado atual do pool: conexões em uso (checked out) e ociosas (checked in)."""
+    status = {"primary": _pool_status(engine)}
+    status["replica"] = _pool_status(read_engine) if read_engine else None
+    return status
@@ -13,8 +13,15 @@ from .routes import (
     auth, users, tenants, pacientes, responsaveis, servicos, 
     agendamentos, prontuarios, tratamentos, tratamento_servicos, planos_custo, 
     estoque, consentimentos_paciente, tenant_configs, relatorios, menu_permissions,
-    documentos_paciente, pagamentos, despesas
+    documentos_paciente, pagamentos, despesas, health, jobs
 )
+from .db.database import pool_settings_report
+from .services.pdf_renderer import pdf_renderer
+from .services.pdf_jobs import pdf_job_worker
+from .services.email_dispatcher import email_dispatcher
+from .services.reminder_scheduler import reminder_scheduler
+from .services.template_registry import template_registry
+from .core.config import settings
 
 app = FastAPI()
 
@@ -25,6 +32,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # cursor da próxima página nas listagens
 )
 
 # Rotas
@@ -47,6 +55,49 @@ app.include_router(menu_permissions.router, prefix="/menu-permissions", tags=["M
 app.include_router(documentos_paciente.router, prefix="/documentos-paciente", tags=["Documentos Paciente"])
 app.include_router(pagamentos.router, prefix="/pagamentos", tags=["Pagamentos"])
 app.include_router(despesas.router, prefix="/despesas", tags=["Despesas"])
+app.include_router(health.router, prefix="/health", tags=["Health"])
+app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
+
+@app.on_event("startup")
+async def report_db_pool_settings():
+    # Mostra os valores efetivos do pool para facilitar o dimensionamento por worker.
+    print(f"INFO: Database pool settings: {pool_settings_report()}")
+
+@app.on_event("startup")
+async def load_templates():
+    # Compila os templates (e as sobrescritas por tenant) uma vez; falha cedo se algum for inválido.
+    template_registry.load()
+
+@app.on_event("startup")
+async def start_pdf_job_worker():
+    # Consome a fila de PDFs (tabela pdf_jobs) neste processo.
+    if settings.PDF_JOB_WORKER_ENABLED:
+        pdf_job_worker.start()
+
+@app.on_event("startup")
+async def start_email_dispatcher():
+    # Envia os e-mails da outbox (tabela email_outbox) neste processo.
+    if settings.EMAIL_DISPATCHER_ENABLED:
+        email_dispatcher.start()
+
+@app.on_event("startup")
+async def start_reminder_scheduler():
+    # Enfileira os lembretes dos próximos agendamentos periodicamente neste processo.
+    if settings.REMINDER_SCHEDULER_ENABLED:
+        reminder_scheduler.start()
+
+@app.on_event("shutdown")
+async def stop_reminder_scheduler():
+    await reminder_scheduler.stop()
+
+@app.on_event("shutdown")
+async def stop_email_dispatcher():
+    await email_dispatcher.stop()
+
+@app.on_event("shutdown")
+async def shutdown_pdf_renderer():
+    await pdf_job_worker.stop()
+    pdf_renderer.shutdown()
 
 @app.get("/")
 def read_root():
@@ -21,4 +21,8 @@ from .consentimentos_paciente import ConsentimentoPaciente
 from .feriados import Feriado
 from .menu_permissions import MenuPermission
 from .tenant_configs import TenantConfig
-from .orcamentos import Orcamento, OrcamentoItem, OrcamentoStatus
\ No newline at end of file
+from .orcamentos import Orcamento, OrcamentoItem, OrcamentoStatus
+from .pdf_jobs import PdfJob, PdfJobStatus, PdfJobTipo
+from .file_blobs import FileBlob
+from .email_outbox import EmailOutbox, EmailOutboxStatus
+from .atendimentos_diarios import AtendimentoDiario
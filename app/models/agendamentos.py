@@ -1,7 +1,7 @@
 import uuid
 import enum
-from sqlalchemy import Column, String, TIMESTAMP, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID, ENUM
+from sqlalchemy import Column, String, TIMESTAMP, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, ENUM, ExcludeConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..db.base_class import Base
@@ -10,6 +10,9 @@ from ..models.servicos import Servico
 from ..models.users import SystemUser
 from ..models.tratamentos import Tratamento
 
+# Nome da restrição que impede dois agendamentos sobrepostos para o mesmo acadêmico.
+OVERLAP_CONSTRAINT_NAME = "ex_agendamentos_academico_sem_sobreposicao"
+
 class AppointmentStatus(str, enum.Enum):
     agendado = "agendado"
     iniciado = "iniciado"
@@ -35,6 +38,9 @@ class Agendamento(Base):
     observacoes = Column(String(500), nullable=True)
     hora_inicio_atendimento = Column(TIMESTAMP, nullable=True)
     hora_fim_atendimento = Column(TIMESTAMP, nullable=True)
+    # Marcador de idempotência do lembrete: o `inicio` para o qual o lembrete já foi enfileirado
+    # (se o horário mudar, o agendamento volta a receber lembrete).
+    lembrete_enviado_para = Column(TIMESTAMP, nullable=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
 
@@ -45,6 +51,21 @@ class Agendamento(Base):
     tratamento = relationship("Tratamento", back_populates="agendamentos")
     servico = relationship("Servico", back_populates="agendamentos")
 
+    __table_args__ = (
+        # Paginação por cursor (inicio, id) dentro do tenant
+        Index("ix_agendamentos_tenant_inicio_id", "tenant_id", "inicio", "id"),
+        # Busca dos próximos agendamentos de todos os tenants pelo agendador de lembretes
+        Index("ix_agendamentos_agendado_inicio", "inicio", postgresql_where=(status == AppointmentStatus.agendado)),
+        # Sobreposição de horários garantida pelo banco (índice GiST, requer a extensão btree_gist).
+        ExcludeConstraint(
+            (tenant_id, "="),
+            (academico_id, "="),
+            (func.tsrange(inicio, fim), "&&"),
+            name=OVERLAP_CONSTRAINT_NAME,
+            using="gist",
+        ),
+    )
+
 class AgendamentoDetalhesView(Base):
     __tablename__ = "v_agendamentos_detalhes"
     __table_args__ = {'extend_existing': True}
@@ -0,0 +1,25 @@
+import uuid
+from sqlalchemy import Column, Date, Integer, Float, TIMESTAMP, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.sql import func
+from ..db.base_class import Base
+
+# servico_id usado nas linhas de agendamentos sem serviço (a chave primária não aceita NULL).
+SEM_SERVICO = uuid.UUID(int=0)
+
+class AtendimentoDiario(Base):
+    """
+    Agregado diário dos agendamentos concluídos por tenant, acadêmico e serviço,
+    pelo dia do `inicio`. Mantido incrementalmente pelo crud de agendamentos e
+    reconstruído por app/scripts/backfill_atendimentos_diarios.py; os relatórios
+    acadêmicos leem daqui os dias já fechados.
+    """
+    __tablename__ = "atendimentos_diarios"
+
+    tenant_id = Column(PG_UUID(as_uuid=True), ForeignKey("tenants.id"), primary_key=True)
+    dia = Column(Date, primary_key=True)
+    academico_id = Column(PG_UUID(as_uuid=True), ForeignKey("system_users.id"), primary_key=True)
+    servico_id = Column(PG_UUID(as_uuid=True), primary_key=True, default=SEM_SERVICO)
+    quantidade = Column(Integer, nullable=False, default=0)
+    segundos_atendimento = Column(Float, nullable=False, default=0) # Soma de fim - inicio
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
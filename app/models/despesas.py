@@ -1,6 +1,6 @@
 
 import uuid
-from sqlalchemy import Column, String, TIMESTAMP, ForeignKey, Numeric
+from sqlalchemy import Column, String, TIMESTAMP, ForeignKey, Numeric, Index
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.sql import func
 from ..db.base_class import Base
@@ -18,3 +18,8 @@ class Despesa(Base):
 
     created_at = Column(TIMESTAMP, server_default=func.now())
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Paginação por cursor (data_despesa, id) dentro do tenant
+        Index("ix_despesas_tenant_data_id", "tenant_id", "data_despesa", "id"),
+    )
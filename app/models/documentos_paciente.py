@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, String, TIMESTAMP, ForeignKey, BigInteger
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -13,6 +13,8 @@ class DocumentoPaciente(Base):
     nome_arquivo = Column(String(255), nullable=False) # Original file name
     caminho_arquivo = Column(String(512), nullable=False) # Stored path on disk
     tipo_documento = Column(String(100), nullable=True) # e.g., "Consentimento", "Exame", "Receita"
+    checksum_sha256 = Column(String(64), nullable=True) # SHA-256 of the stored file, computed during upload
+    tamanho_bytes = Column(BigInteger, nullable=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
 
@@ -0,0 +1,35 @@
+import uuid
+import enum
+from sqlalchemy import Column, Integer, Text, TIMESTAMP, ForeignKey, String, Boolean, Index
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, ENUM
+from sqlalchemy.sql import func
+from ..db.base_class import Base
+
+class EmailOutboxStatus(str, enum.Enum):
+    pendente = "pendente"
+    enviando = "enviando"
+    enviado = "enviado"
+    erro = "erro"
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(PG_UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
+    to_email = Column(String(255), nullable=False)
+    subject = Column(String(998), nullable=False)
+    body = Column(Text, nullable=False)
+    is_html = Column(Boolean, default=False, nullable=False)
+    status = Column(ENUM(EmailOutboxStatus, name='email_outbox_status', create_type=False), default=EmailOutboxStatus.pendente, nullable=False)
+    tentativas = Column(Integer, default=0, nullable=False)
+    erro = Column(Text, nullable=True)
+    proxima_tentativa_em = Column(TIMESTAMP, server_default=func.now(), nullable=False)  # backoff entre tentativas
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    started_at = Column(TIMESTAMP, nullable=True)
+    sent_at = Column(TIMESTAMP, nullable=True)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Fila: o dispatcher busca os e-mails pendentes cuja próxima tentativa já venceu
+        Index("ix_email_outbox_status_proxima_tentativa", "status", "proxima_tentativa_em"),
+    )
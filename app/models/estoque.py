@@ -1,6 +1,6 @@
 
 import uuid
-from sqlalchemy import Column, String, Integer, TIMESTAMP, ForeignKey, Numeric
+from sqlalchemy import Column, String, Integer, TIMESTAMP, ForeignKey, Numeric, Index
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -20,3 +20,8 @@ class Estoque(Base):
 
     movimentacoes = relationship("MovimentacaoEstoque", back_populates="produto", cascade="all, delete-orphan")
     orcamento_itens = relationship("OrcamentoItem", back_populates="produto")
+
+    __table_args__ = (
+        # Paginação por cursor (nome, id) dentro do tenant
+        Index("ix_estoque_tenant_nome_id", "tenant_id", "nome", "id"),
+    )
@@ -0,0 +1,26 @@
+import uuid
+from sqlalchemy import Column, String, Integer, BigInteger, TIMESTAMP, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.sql import func
+from ..db.base_class import Base
+
+class FileBlob(Base):
+    """
+    Arquivo físico de upload, endereçado pelo SHA-256 do conteúdo dentro de uma clínica.
+    Prontuários e documentos com o mesmo conteúdo apontam para o mesmo caminho;
+    refcount conta quantos registros usam o arquivo.
+    """
+    __tablename__ = "file_blobs"
+
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    escopo = Column(String(255), nullable=False) # Clinic directory under BASE_UPLOAD_DIR
+    sha256 = Column(String(64), nullable=False)
+    caminho_arquivo = Column(String(512), nullable=False, unique=True) # Relative to BASE_UPLOAD_DIR
+    tamanho_bytes = Column(BigInteger, nullable=False)
+    refcount = Column(Integer, nullable=False, default=1)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("escopo", "sha256", name="uq_file_blobs_escopo_sha256"),
+    )
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, TIMESTAMP, ForeignKey, Date
+from sqlalchemy import Column, String, TIMESTAMP, ForeignKey, Date, Index
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -25,3 +25,8 @@ class Paciente(Base):
     agendamentos = relationship("Agendamento", back_populates="paciente")
     movimentacoes = relationship("MovimentacaoEstoque", back_populates="paciente")
     orcamentos = relationship("Orcamento", back_populates="paciente")
+
+    __table_args__ = (
+        # Paginação por cursor (nome, id) dentro do tenant
+        Index("ix_pacientes_tenant_nome_id", "tenant_id", "nome", "id"),
+    )
@@ -0,0 +1,38 @@
+import uuid
+import enum
+from sqlalchemy import Column, Integer, Text, TIMESTAMP, ForeignKey, String, Index
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, ENUM
+from sqlalchemy.sql import func
+from ..db.base_class import Base
+
+class PdfJobTipo(str, enum.Enum):
+    atendimento = "atendimento"          # relatório de atendimento (referencia_id = agendamento)
+    retirada_estoque = "retirada_estoque"  # comprovante de retirada (referencia_id = movimentação)
+
+class PdfJobStatus(str, enum.Enum):
+    pendente = "pendente"
+    processando = "processando"
+    concluido = "concluido"
+    erro = "erro"
+
+class PdfJob(Base):
+    __tablename__ = "pdf_jobs"
+
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(PG_UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
+    tipo = Column(ENUM(PdfJobTipo, name='pdf_job_tipo', create_type=False), nullable=False)
+    referencia_id = Column(PG_UUID(as_uuid=True), nullable=False)
+    status = Column(ENUM(PdfJobStatus, name='pdf_job_status', create_type=False), default=PdfJobStatus.pendente, nullable=False)
+    tentativas = Column(Integer, default=0, nullable=False)
+    erro = Column(Text, nullable=True)
+    documento_id = Column(PG_UUID(as_uuid=True), ForeignKey("documentos_paciente.id"), nullable=True)
+    arquivo_path = Column(String(512), nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    started_at = Column(TIMESTAMP, nullable=True)
+    finished_at = Column(TIMESTAMP, nullable=True)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Fila: o worker busca o job pendente mais antigo
+        Index("ix_pdf_jobs_status_created_at", "status", "created_at"),
+    )
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, TIMESTAMP, ForeignKey, Text
+from sqlalchemy import Column, String, TIMESTAMP, ForeignKey, BigInteger, Text
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -14,6 +14,8 @@ class Prontuario(Base):
     servico_id = Column(PG_UUID(as_uuid=True), ForeignKey("servicos.id"), nullable=True) # Link to service/procedure
     conteudo = Column(Text, nullable=False) # The actual record content (text)
     caminho_arquivo = Column(String(512), nullable=True) # Path to the associated file
+    checksum_sha256 = Column(String(64), nullable=True) # SHA-256 of the stored file, computed during upload
+    tamanho_bytes = Column(BigInteger, nullable=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
 
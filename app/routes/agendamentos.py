@@ -1,21 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import List, Literal, Optional, Union
 import uuid
-from datetime import date, datetime, time, timedelta
-from sqlalchemy.future import select
+from datetime import date, time
 
 from ..crud import agendamentos as agendamentos_crud
 from ..schemas import agendamentos as agendamentos_schemas
-from ..db.database import get_db
+from ..db.database import get_db, get_read_db
 from ..routes.auth import get_current_active_user
 from ..models.users import SystemUser, UserRole
 from ..core.permissions import can_create_appointment, can_read_appointment, can_update_appointment, can_delete_appointment
-from ..models.feriados import Feriado
-from ..models.agendamentos import Agendamento, AppointmentStatus
+from ..core.pagination import set_next_cursor
+from ..services import agenda_slots
 
 router = APIRouter()
 
+# Perfis de carregamento aceitos pelas rotas de leitura (ver crud.agendamentos.AGENDAMENTO_LOAD_PROFILES).
+AgendamentoProfile = Literal["summary", "calendar", "full"]
+AgendamentoPorPerfil = Union[
+    agendamentos_schemas.Agendamento,
+    agendamentos_schemas.AgendamentoResumo,
+    agendamentos_schemas.AgendamentoCalendario,
+]
+_PROFILE_SCHEMAS = {
+    "full": agendamentos_schemas.Agendamento,
+    "summary": agendamentos_schemas.AgendamentoResumo,
+    "calendar": agendamentos_schemas.AgendamentoCalendario,
+}
+PROFILE_QUERY_DESCRIPTION = "Formato da resposta: 'calendar' (apenas nomes e horários), 'summary' (sem o tratamento) ou 'full'."
+
+# Limite de dias por consulta em /disponibilidade
+MAX_AVAILABILITY_DAYS = 62
+
+def _serialize_profile(agendamento, profile: str):
+    return _PROFILE_SCHEMAS[profile].model_validate(agendamento)
+
 @router.post("/", response_model=agendamentos_schemas.Agendamento, status_code=status.HTTP_201_CREATED, tags=["Agendamentos"])
 async def create_agendamento(
     agendamento: agendamentos_schemas.AgendamentoCreate, 
@@ -25,28 +44,121 @@ async def create_agendamento(
     tenant_id = current_user.default_tenant_id
     return await agendamentos_crud.create_agendamento(db=db, agendamento=agendamento, tenant_id=tenant_id)
 
-@router.get("/{agendamento_id}", response_model=agendamentos_schemas.Agendamento, tags=["Agendamentos"])
+@router.get("/detalhes", response_model=List[agendamentos_schemas.AgendamentoDetalhes], tags=["Agendamentos"])
+async def list_agendamentos_detalhes(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: SystemUser = Depends(can_read_appointment),
+    skip: int = 0,
+    limit: int = 100
+):
+    tenant_id = current_user.default_tenant_id # Get tenant_id from current_user
+    if current_user.role == UserRole.admin_global:
+        agendamentos = await agendamentos_crud.get_agendamentos_detalhes(db, tenant_id=None, skip=skip, limit=limit)
+    else:
+        agendamentos = await agendamentos_crud.get_agendamentos_detalhes(db, tenant_id=tenant_id, skip=skip, limit=limit)
+    return agendamentos
+
+def _validate_duration(duration_minutes: int):
+    if duration_minutes % 30 != 0 or not (30 <= duration_minutes <= 150):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A duração deve ser um múltiplo de 30 minutos e estar entre 30 e 150 minutos."
+        )
+
+# As rotas com caminho fixo precisam ser registradas antes de "/{agendamento_id}",
+# senão o segmento é interpretado como um ID de agendamento.
+@router.get("/horarios-livres", response_model=List[time], tags=["Agendamentos"])
+async def get_free_time_slots(
+    target_date: date,
+    duration_minutes: int,
+    academico_id: Optional[uuid.UUID] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: SystemUser = Depends(get_current_active_user)
+):
+    _validate_duration(duration_minutes)
+    tenant_id = current_user.default_tenant_id # Get tenant_id from current_user
+
+    academico_ids = [academico_id] if academico_id else None
+    grid = await agenda_slots.compute_availability(
+        db, tenant_id, target_date, target_date, duration_minutes, academico_ids
+    )
+    mask = grid[target_date][academico_id]
+    if mask is None:
+        return [] # No slots on Sundays or holidays
+    return agenda_slots.mask_to_times(mask)
+
+@router.get("/disponibilidade", response_model=agendamentos_schemas.GradeDisponibilidade, tags=["Agendamentos"])
+async def get_availability_grid(
+    start_date: date,
+    end_date: date,
+    duration_minutes: int,
+    academico_ids: Optional[List[uuid.UUID]] = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: SystemUser = Depends(get_current_active_user)
+):
+    """
+    Grade de horários livres para um intervalo de datas e vários acadêmicos em uma
+    única chamada (uma consulta de feriados e uma de agendamentos).
+    """
+    _validate_duration(duration_minutes)
+    if end_date < start_date or (end_date - start_date).days > MAX_AVAILABILITY_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"O intervalo deve ter no máximo {MAX_AVAILABILITY_DAYS + 1} dias e a data final não pode ser anterior à inicial."
+        )
+    tenant_id = current_user.default_tenant_id
+
+    grid = await agenda_slots.compute_availability(
+        db, tenant_id, start_date, end_date, duration_minutes, academico_ids
+    )
+    dias = []
+    for dia, masks in grid.items():
+        bloqueado = all(mask is None for mask in masks.values())
+        dias.append(agendamentos_schemas.DisponibilidadeDia(
+            data=dia,
+            bloqueado=bloqueado,
+            academicos=[
+                agendamentos_schemas.DisponibilidadeAcademico(
+                    academico_id=academico,
+                    livres=agenda_slots.mask_to_string(mask or 0)
+                )
+                for academico, mask in masks.items()
+            ]
+        ))
+    return agendamentos_schemas.GradeDisponibilidade(
+        inicio_expediente=agenda_slots.DAY_START,
+        minutos_por_bloco=agenda_slots.BLOCK_MINUTES,
+        blocos_por_dia=agenda_slots.BLOCKS_PER_DAY,
+        duracao_minutos=duration_minutes,
+        dias=dias
+    )
+
+@router.get("/{agendamento_id}", response_model=AgendamentoPorPerfil, tags=["Agendamentos"])
 async def read_agendamento(
     agendamento_id: uuid.UUID, 
     db: AsyncSession = Depends(get_db), 
-    current_user: SystemUser = Depends(can_read_appointment)
+    current_user: SystemUser = Depends(can_read_appointment),
+    profile: AgendamentoProfile = Query("full", description=PROFILE_QUERY_DESCRIPTION)
 ):
     tenant_id = current_user.default_tenant_id
-    db_agendamento = await agendamentos_crud.get_agendamento(db, agendamento_id=agendamento_id, tenant_id=tenant_id)
+    db_agendamento = await agendamentos_crud.get_agendamento(db, agendamento_id=agendamento_id, tenant_id=tenant_id, profile=profile)
     if db_agendamento is None:
         raise HTTPException(status_code=404, detail="Agendamento not found")
-    return db_agendamento
+    return _serialize_profile(db_agendamento, profile)
 
-@router.get("/", response_model=List[agendamentos_schemas.Agendamento], tags=["Agendamentos"])
+@router.get("/", response_model=List[AgendamentoPorPerfil], tags=["Agendamentos"])
 async def read_agendamentos(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: SystemUser = Depends(can_read_appointment),
     academico_id: Optional[uuid.UUID] = None,
     orientador_id: Optional[uuid.UUID] = None,
     servico_id: Optional[uuid.UUID] = None,
-    date: Optional[date] = None
+    date: Optional[date] = None,
+    profile: AgendamentoProfile = Query("full", description=PROFILE_QUERY_DESCRIPTION)
 ):
     tenant_id = current_user.default_tenant_id # Get tenant_id from current_user
     if current_user.role == UserRole.admin_global:
@@ -58,7 +170,9 @@ async def read_agendamentos(
             servico_id=servico_id,
             date=date,
             skip=skip,
-            limit=limit
+            limit=limit,
+            profile=profile,
+            cursor=cursor
         )
     else:
         agendamentos = await agendamentos_crud.get_agendamentos(
@@ -69,9 +183,12 @@ async def read_agendamentos(
             servico_id=servico_id,
             date=date,
             skip=skip,
-            limit=limit
+            limit=limit,
+            profile=profile,
+            cursor=cursor
         )
-    return agendamentos
+    set_next_cursor(response, agendamentos, agendamentos_crud.AGENDAMENTO_KEYSET, limit)
+    return [_serialize_profile(a, profile) for a in agendamentos]
 
 @router.put("/{agendamento_id}", response_model=agendamentos_schemas.Agendamento, tags=["Agendamentos"])
 async def update_agendamento(
@@ -98,36 +215,23 @@ async def delete_agendamento(
         raise HTTPException(status_code=404, detail="Agendamento not found")
     return db_agendamento
 
-@router.get("/detalhes", response_model=List[agendamentos_schemas.AgendamentoDetalhes], tags=["Agendamentos"])
-async def list_agendamentos_detalhes(
-    db: AsyncSession = Depends(get_db),
-    current_user: SystemUser = Depends(can_read_appointment),
-    skip: int = 0,
-    limit: int = 100
-):
-    tenant_id = current_user.default_tenant_id # Get tenant_id from current_user
-    if current_user.role == UserRole.admin_global:
-        agendamentos = await agendamentos_crud.get_agendamentos_detalhes(db, tenant_id=None, skip=skip, limit=limit)
-    else:
-        agendamentos = await agendamentos_crud.get_agendamentos_detalhes(db, tenant_id=tenant_id, skip=skip, limit=limit)
-    return agendamentos
-
-@router.get("/paciente/{paciente_id}", response_model=List[agendamentos_schemas.Agendamento], tags=["Agendamentos"])
+@router.get("/paciente/{paciente_id}", response_model=List[AgendamentoPorPerfil], tags=["Agendamentos"])
 async def read_agendamentos_by_paciente(
     paciente_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: SystemUser = Depends(can_read_appointment)
+    current_user: SystemUser = Depends(can_read_appointment),
+    profile: AgendamentoProfile = Query("full", description=PROFILE_QUERY_DESCRIPTION)
 ):
     tenant_id = current_user.default_tenant_id # Get tenant_id from current_user
     if current_user.role == UserRole.admin_global:
         agendamentos = await agendamentos_crud.get_agendamentos_by_paciente(
-            db, paciente_id=paciente_id, tenant_id=None
+            db, paciente_id=paciente_id, tenant_id=None, profile=profile
         )
     else:
         agendamentos = await agendamentos_crud.get_agendamentos_by_paciente(
-            db, paciente_id=paciente_id, tenant_id=tenant_id
+            db, paciente_id=paciente_id, tenant_id=tenant_id, profile=profile
         )
-    return agendamentos
+    return [_serialize_profile(a, profile) for a in agendamentos]
 
 @router.post("/{agendamento_id}/iniciar", response_model=agendamentos_schemas.Agendamento, tags=["Agendamentos"])
 async def iniciar_atendimento(
@@ -165,7 +269,7 @@ async def em_atendimento(
         raise HTTPException(status_code=404, detail="Agendamento not found")
     return db_agendamento
 
-@router.post("/{agendamento_id}/concluir", response_model=agendamentos_schemas.Agendamento, tags=["Agendamentos"])
+@router.post("/{agendamento_id}/concluir", response_model=agendamentos_schemas.AgendamentoConcluido, tags=["Agendamentos"])
 async def concluir_atendimento(
     agendamento_id: uuid.UUID,
     observacoes: Optional[str] = None,
@@ -173,107 +277,15 @@ async def concluir_atendimento(
     current_user: SystemUser = Depends(can_update_appointment)
 ):
     tenant_id = current_user.default_tenant_id
-    db_agendamento = await agendamentos_crud.concluir_atendimento(
+    resultado = await agendamentos_crud.concluir_atendimento(
         db, 
         agendamento_id=agendamento_id, 
         tenant_id=tenant_id,
         observacoes=observacoes
     )
-    if db_agendamento is None:
+    if resultado is None:
         raise HTTPException(status_code=404, detail="Agendamento not found")
-    return db_agendamento
-
-@router.get("/horarios-livres", response_model=List[time], tags=["Agendamentos"])
-async def get_free_time_slots(
-    target_date: date,
-    duration_minutes: int,
-    academico_id: Optional[uuid.UUID] = None,
-    db: AsyncSession = Depends(get_db),
-    current_user: SystemUser = Depends(get_current_active_user)
-):
-    # Input validation for duration_minutes
-    if duration_minutes % 30 != 0 or not (30 <= duration_minutes <= 150):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="A duração deve ser um múltiplo de 30 minutos e estar entre 30 e 150 minutos."
-        )
-
-    tenant_id = current_user.default_tenant_id # Get tenant_id from current_user
-
-    # 1. Check for Sunday or Holiday
-    if target_date.weekday() == 6:  # Sunday is 6
-        return [] # No slots on Sunday
-
-    # Check for holiday
-    holiday_query = await db.execute(
-        select(Feriado).where(
-            Feriado.tenant_id == tenant_id,
-            Feriado.data == target_date
-        )
+    db_agendamento, db_job = resultado
+    return agendamentos_schemas.AgendamentoConcluido.model_validate(db_agendamento).model_copy(
+        update={"pdf_job_id": db_job.id}
     )
-    is_holiday = holiday_query.scalars().first() is not None
-
-    if is_holiday:
-        return [] # No slots on holidays
-
-    # 2. Generate all possible 30-min slots
-    start_time = datetime.combine(target_date, time(7, 0)) # 07:00
-    end_time = datetime.combine(target_date, time(22, 0))   # 22:00
-
-    all_possible_slots = []
-    current_slot_start = start_time
-    while current_slot_start < end_time:
-        all_possible_slots.append(current_slot_start)
-        current_slot_start += timedelta(minutes=30)
-
-    # 3. Fetch booked appointments
-    booked_slots_query = select(Agendamento).where(
-        Agendamento.tenant_id == tenant_id,
-        Agendamento.inicio >= datetime.combine(target_date, time(0, 0)),
-        Agendamento.fim <= datetime.combine(target_date, time(23, 59, 59)),
-        Agendamento.status.in_([
-            AppointmentStatus.agendado,
-            AppointmentStatus.iniciado,
-            AppointmentStatus.aguardando,
-            AppointmentStatus.em_atendimento
-        ])
-    )
-
-    if academico_id:
-        booked_slots_query = booked_slots_query.where(Agendamento.academico_id == academico_id)
-
-    booked_appointments_result = await db.execute(booked_slots_query)
-    booked_appointments = booked_appointments_result.scalars().all()
-
-    # Create a set of all booked 30-minute intervals
-    booked_intervals = set()
-    for appt in booked_appointments:
-        current_interval_start = datetime.combine(target_date, appt.inicio.time())
-        while current_interval_start < datetime.combine(target_date, appt.fim.time()):
-            booked_intervals.add(current_interval_start)
-            current_interval_start += timedelta(minutes=30)
-
-    free_slots_found = []
-    slot_duration_td = timedelta(minutes=duration_minutes)
-    num_30_min_blocks = duration_minutes // 30
-
-    for possible_slot_start in all_possible_slots:
-        # Check if this possible_slot_start is already booked
-        if possible_slot_start in booked_intervals:
-            continue
-
-        # Check if the entire requested duration is free
-        is_free_block = True
-        for i in range(num_30_min_blocks):
-            check_time = possible_slot_start + timedelta(minutes=i * 30)
-            if check_time >= end_time or check_time in booked_intervals:
-                is_free_block = False
-                break
-        
-        if is_free_block:
-            # Ensure the end of the proposed slot does not exceed working hours
-            proposed_slot_end = possible_slot_start + slot_duration_td
-            if proposed_slot_end <= end_time:
-                free_slots_found.append(possible_slot_start.time())
-
-    return free_slots_found
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
@@ -13,7 +13,8 @@ from ..schemas import users as user_schema
 from ..core import security
 from ..db.database import get_db
 from ..models.users import SystemUser, UserRole
-from ..core.ldap import authenticate_ldap_user
+from ..core.ldap import ldap_authenticator
+from ..core.user_cache import AuthenticatedUser, principal_cache
 
 router = APIRouter()
 
@@ -24,7 +25,8 @@ async def login_for_access_token(db: AsyncSession = Depends(get_db), form_data:
     print(f"DEBUG: form_data.username: {form_data.username}")
     print(f"DEBUG: form_data.password: {form_data.password}")
     # Try LDAP authentication first
-    ldap_user_info = authenticate_ldap_user(form_data.username, form_data.password)
+    # Usuários já conhecidos como locais são pulados pelo autenticador (cache negativo).
+    ldap_user_info = await ldap_authenticator.authenticate(form_data.username, form_data.password)
     
     if ldap_user_info:
         # LDAP authentication successful
@@ -43,12 +45,14 @@ async def login_for_access_token(db: AsyncSession = Depends(get_db), form_data:
         # Fallback to local authentication
         user = await users_crud.get_user_by_username(db, username=form_data.username) # Use get_user_by_username
         print(f"DEBUG: User retrieved from DB: {user}")
-        if not user or not security.verify_password(form_data.password, user.senha_hash):
+        if not user or not user.senha_hash or not await security.verify_password_async(form_data.password, user.senha_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        if not user.ldap_dn:
+            ldap_authenticator.mark_local_only(user.username)
 
     # default_tenant_id is now non-nullable, so it must be set during user creation.
     # No need for user_tenants_crud logic here.
@@ -61,7 +65,7 @@ async def login_for_access_token(db: AsyncSession = Depends(get_db), form_data:
     )
     return {"access_token": access_token, "token_type": "bearer", "default_tenant_id": user.default_tenant_id}
 
-async def get_current_user(db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme)) -> SystemUser:
+async def get_current_user(request: Request, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme)) -> AuthenticatedUser:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -72,9 +76,19 @@ async def get_current_user(db: AsyncSession = Depends(get_db), token: str = Depe
     print(f"DEBUG: Decoded token data: {token_data}")
     if token_data is None or token_data.username is None: # Use token_data.username
         raise credentials_exception
-    user = await users_crud.get_user_by_username(db, username=token_data.username) # Use get_user_by_username and token_data.username
-    if user is None:
+
+    # Escopo das métricas do cache: primeiro segmento da rota (ex.: "agendamentos", "pacientes").
+    scope = request.url.path.strip("/").split("/", 1)[0] or "root"
+    user = principal_cache.get(token_data.username, token_data.tenant_id, scope=scope)
+    if user is not None:
+        return user
+
+    db_user = await users_crud.get_user_by_username(db, username=token_data.username) # Use get_user_by_username and token_data.username
+    if db_user is None:
         raise credentials_exception
+    # Cópia desligada da sessão: um rollback na requisição não afeta o que fica no cache.
+    user = AuthenticatedUser.from_orm_user(db_user)
+    principal_cache.set(token_data.username, token_data.tenant_id, user)
     return user
 
 async def get_current_active_user(
@@ -82,4 +96,18 @@ async def get_current_active_user(
 ) -> user_schema.User:
     if not current_user.ativo:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
\ No newline at end of file
+    return current_user
+
+def _require_admin_global(current_user: SystemUser):
+    if current_user.role != UserRole.admin_global:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view authentication statistics")
+
+@router.get("/cache-stats", tags=["Authentication"])
+async def read_principal_cache_stats(current_user: SystemUser = Depends(get_current_active_user)):
+    _require_admin_global(current_user)
+    return principal_cache.stats()
+
+@router.get("/password-pool-stats", tags=["Authentication"])
+async def read_password_pool_stats(current_user: SystemUser = Depends(get_current_active_user)):
+    _require_admin_global(current_user)
+    return security.password_pool_stats()
\ No newline at end of file
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+import asyncio
 import uuid
 import os
 import shutil
@@ -35,7 +36,8 @@ async def create_consentimento(
 
     # Get the storage path
     file_extension = os.path.splitext(arquivo.filename)[1]
-    file_path = get_storage_path(str(tenant_id), "consentimentos", str(db_consentimento.id), file_extension)
+    # A alocação da pasta usa flock e E/S do índice: fora do event loop.
+    file_path = await asyncio.to_thread(get_storage_path, str(tenant_id), "consentimentos", str(db_consentimento.id), file_extension)
 
     # Save the file
     try:
@@ -82,7 +84,7 @@ async def update_consentimento(
     
     if arquivo:
         file_extension = os.path.splitext(arquivo.filename)[1]
-        file_path = get_storage_path(str(tenant_id), "consentimentos", str(consentimento_id), file_extension)
+        file_path = await asyncio.to_thread(get_storage_path, str(tenant_id), "consentimentos", str(consentimento_id), file_extension)
         
         # Save the new file
         try:
@@ -1,7 +1,7 @@
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 import uuid
 
 from ..crud import despesas as crud
@@ -10,6 +10,7 @@ from ..db.database import get_db
 from ..routes.auth import get_current_active_user # Import get_current_active_user
 from ..models.users import SystemUser, UserRole
 from ..core.permissions import has_permission
+from ..core.pagination import set_next_cursor
 
 # Define permission for this module
 can_manage_expenses = has_permission([UserRole.admin_global, UserRole.gestor_clinica])
@@ -27,13 +28,17 @@ async def create_despesa(
 
 @router.get("/despesas/", response_model=List[schemas.Despesa], tags=["Despesas"])
 async def read_despesas(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
     current_user: SystemUser = Depends(can_manage_expenses)
 ):
     tenant_id = current_user.default_tenant_id
-    return await crud.get_despesas(db, tenant_id=tenant_id, skip=skip, limit=limit)
+    despesas = await crud.get_despesas(db, tenant_id=tenant_id, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, despesas, crud.DESPESA_KEYSET, limit)
+    return despesas
 
 @router.get("/despesas/{despesa_id}", response_model=schemas.Despesa, tags=["Despesas"])
 async def read_despesa(
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import uuid
@@ -10,9 +10,9 @@ from app.schemas.documento_paciente import DocumentoPacienteCreate, DocumentoPac
 from app.crud import documentos_paciente as crud_documentos_paciente
 from app.db.database import get_db
 from app.routes.auth import get_current_active_user
-from app.services.file_storage_service import file_storage_service # Import the service
+from app.services.file_storage_service import file_storage_service, FileTooLargeError # Import the service
+from app.services.file_download import file_download_response
 # from app.core.storage import get_storage_path # Not needed anymore
-from fastapi.responses import FileResponse
 from app.models.users import SystemUser, UserRole
 from app.crud import tenants as crud_tenants # Import tenants_crud
 
@@ -32,19 +32,22 @@ async def create_documento_paciente(
         raise HTTPException(status_code=404, detail="Tenant not found")
     clinic_name = tenant.nome
 
-    file_content = await file.read()
     file_extension = os.path.splitext(file.filename)[1].lstrip('.') # Get extension without dot
 
     try:
-        caminho_arquivo = file_storage_service.save_documento_file(clinic_name, file_content, file_extension)
+        stored = await file_storage_service.save_documento_upload(db, clinic_name, file, file_extension)
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save file: {e}")
 
     documento_create = DocumentoPacienteCreate(
         paciente_id=paciente_id,
         nome_arquivo=file.filename,
-        caminho_arquivo=caminho_arquivo,
-        tipo_documento=tipo_documento
+        caminho_arquivo=stored.relative_path,
+        tipo_documento=tipo_documento,
+        checksum_sha256=stored.sha256,
+        tamanho_bytes=stored.size
     )
     return await crud_documentos_paciente.create_documento_paciente(db=db, documento=documento_create)
 
@@ -58,7 +61,7 @@ async def read_documentos_paciente(
     return await crud_documentos_paciente.get_documentos_paciente_by_paciente(db, paciente_id=paciente_id, skip=skip, limit=limit)
 
 @router.get("/{documento_id}/file", tags=["Documentos Paciente"])
-async def get_documento_paciente_file(documento_id: uuid.UUID, db: AsyncSession = Depends(get_db),
+async def get_documento_paciente_file(documento_id: uuid.UUID, request: Request, db: AsyncSession = Depends(get_db),
     current_user: SystemUser = Depends(get_current_active_user)
 ):
     db_documento = await crud_documentos_paciente.get_documento_paciente(db, documento_id=documento_id)
@@ -69,7 +72,7 @@ async def get_documento_paciente_file(documento_id: uuid.UUID, db: AsyncSession
     if not full_file_path.exists():
         raise HTTPException(status_code=404, detail="Arquivo não encontrado no sistema de arquivos")
         
-    return FileResponse(full_file_path)
+    return file_download_response(request, full_file_path, checksum=db_documento.checksum_sha256)
 
 @router.delete("/{documento_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["Documentos Paciente"])
 async def delete_documento_paciente(
@@ -84,14 +87,18 @@ async def delete_documento_paciente(
     if db_documento is None:
         raise HTTPException(status_code=404, detail="Documento não encontrado")
     
-    # Delete file from storage
-    try:
-        file_storage_service.delete_file(db_documento.caminho_arquivo)
-    except Exception as e:
-        print(f"WARNING: Failed to delete file {db_documento.caminho_arquivo} from storage: {e}")
-        # Optionally, raise HTTPException or log more severely
+    # Release the stored file (it may be shared with other records with the same content)
+    apagar_arquivo = await file_storage_service.release_file(db, db_documento.caminho_arquivo)
 
     # Delete record from database
     await crud_documentos_paciente.delete_documento_paciente(db, documento_id=documento_id)
+
+    # Delete file from storage once no record references it
+    if apagar_arquivo:
+        try:
+            await file_storage_service.delete_released_file(db, db_documento.caminho_arquivo)
+        except Exception as e:
+            print(f"WARNING: Failed to delete file {db_documento.caminho_arquivo} from storage: {e}")
+            # Optionally, raise HTTPException or log more severely
     
     return {"message": "Documento deleted successfully"}
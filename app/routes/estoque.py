@@ -1,7 +1,7 @@
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 import uuid
 
 from ..crud import estoque as crud
@@ -10,6 +10,7 @@ from ..db.database import get_db
 from ..routes.auth import get_current_active_user
 from ..models.users import SystemUser
 from ..core.permissions import can_create_update_stock, can_read_stock, can_manage_stock
+from ..core.pagination import set_next_cursor
 
 router = APIRouter()
 
@@ -25,13 +26,17 @@ async def create_estoque_item(
 
 @router.get("/", response_model=List[schemas.Estoque], tags=["Estoque"])
 async def read_estoque_itens(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db), 
     current_user: SystemUser = Depends(can_read_stock)
 ):
     tenant_id = current_user.default_tenant_id
-    return await crud.get_estoque_itens(db, tenant_id=tenant_id, skip=skip, limit=limit)
+    itens = await crud.get_estoque_itens(db, tenant_id=tenant_id, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, itens, crud.ESTOQUE_KEYSET, limit)
+    return itens
 
 @router.get("/{item_id}", response_model=schemas.Estoque, tags=["Estoque"])
 async def read_estoque_item(
@@ -71,14 +76,17 @@ async def delete_estoque_item(
     return db_item
 
 # Movimentacoes de Estoque endpoints
-@router.post("/movimentacoes/", response_model=mov_schemas.MovimentacaoEstoque, status_code=status.HTTP_201_CREATED, tags=["Estoque"])
+@router.post("/movimentacoes/", response_model=mov_schemas.MovimentacaoEstoqueCriada, status_code=status.HTTP_201_CREATED, tags=["Estoque"])
 async def create_movimentacao(
     movimentacao: mov_schemas.MovimentacaoEstoqueCreate,
     db: AsyncSession = Depends(get_db),
     current_user: SystemUser = Depends(can_create_update_stock)
 ):
     tenant_id = current_user.default_tenant_id
-    return await crud.create_movimentacao(db=db, movimentacao=movimentacao, tenant_id=tenant_id)
+    db_movimentacao, db_job = await crud.create_movimentacao(db=db, movimentacao=movimentacao, tenant_id=tenant_id)
+    return mov_schemas.MovimentacaoEstoqueCriada.model_validate(db_movimentacao).model_copy(
+        update={"pdf_job_id": db_job.id if db_job else None}
+    )
 
 @router.get("/{produto_id}/movimentacoes/", response_model=List[mov_schemas.MovimentacaoEstoque], tags=["Estoque"])
 async def read_movimentacoes_for_item(
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db.database import get_db, pool_status
+from ..services.pdf_renderer import pdf_renderer
+from ..services.template_registry import template_registry
+
+router = APIRouter()
+
+@router.get("/db", tags=["Health"])
+async def health_db(db: AsyncSession = Depends(get_db)):
+    """
+    Verifica a conexão com o banco e mostra o uso do pool de conexões deste worker.
+    """
+    try:
+        await db.execute(text("SELECT 1"))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Database unavailable: {e}")
+    return {"status": "ok", "pool": pool_status()}
+
+
+@router.get("/pdf", tags=["Health"])
+async def health_pdf():
+    """
+    Mostra a ocupação da fila e os contadores do pool de geração de PDFs deste worker,
+    e os templates carregados.
+    """
+    return {"status": "ok", "renderer": pdf_renderer.stats(), "templates": template_registry.stats()}
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+import uuid
+
+from ..crud import pdf_jobs as pdf_jobs_crud, documentos_paciente as documentos_crud
+from ..schemas import pdf_jobs as pdf_jobs_schemas
+from ..db.database import get_db
+from ..routes.auth import get_current_active_user
+from ..models.users import SystemUser
+
+router = APIRouter()
+
+@router.get("/{job_id}", response_model=pdf_jobs_schemas.PdfJobDetalhe, tags=["Jobs"])
+async def read_job(
+    job_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: SystemUser = Depends(get_current_active_user)
+):
+    """
+    Situação de um job de geração de PDF (pendente, processando, concluido ou erro)
+    e, quando concluído, o documento gerado.
+    """
+    db_job = await pdf_jobs_crud.get_pdf_job(db, job_id=job_id, tenant_id=current_user.default_tenant_id)
+    if db_job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    documento = None
+    if db_job.documento_id:
+        documento = await documentos_crud.get_documento_paciente(db, documento_id=db_job.documento_id)
+    return pdf_jobs_schemas.PdfJobDetalhe.model_validate(db_job).model_copy(update={"documento": documento})
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import uuid
@@ -6,10 +6,11 @@ from datetime import date
 
 from ..crud import pacientes as pacientes_crud
 from ..schemas import pacientes as pacientes_schemas
-from ..db.database import get_db
+from ..db.database import get_db, get_read_db
 from ..routes.auth import get_current_active_user
 from ..models.users import SystemUser, UserRole
 from ..core.permissions import can_create_patient, can_read_patient, can_update_patient, can_delete_patient
+from ..core.pagination import set_next_cursor
 
 router = APIRouter()
 
@@ -51,17 +52,20 @@ async def read_paciente(
 
 @router.get("/", response_model=List[pacientes_schemas.Paciente], tags=["Pacientes"])
 async def read_pacientes(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     current_user: SystemUser = Depends(can_read_patient)
 ):
     tenant_id = current_user.default_tenant_id
     if current_user.role == UserRole.admin_global:
-        pacientes = await pacientes_crud.get_pacientes(db, tenant_id=None, skip=skip, limit=limit)
+        pacientes = await pacientes_crud.get_pacientes(db, tenant_id=None, skip=skip, limit=limit, cursor=cursor)
     else:
-        pacientes = await pacientes_crud.get_pacientes(db, tenant_id=tenant_id, skip=skip, limit=limit)
+        pacientes = await pacientes_crud.get_pacientes(db, tenant_id=tenant_id, skip=skip, limit=limit, cursor=cursor)
     
+    set_next_cursor(response, pacientes, pacientes_crud.PACIENTE_KEYSET, limit)
     return pacientes
 
 @router.put("/{paciente_id}", response_model=pacientes_schemas.Paciente, tags=["Pacientes"])
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import uuid
@@ -8,8 +8,8 @@ from app.schemas.prontuario import ProntuarioCreate, ProntuarioUpdate, Prontuari
 from app.crud import prontuarios as crud_prontuarios
 from app.db.database import get_db
 from app.routes.auth import get_current_active_user
-from app.services.file_storage_service import file_storage_service
-from fastapi.responses import FileResponse
+from app.services.file_storage_service import file_storage_service, FileTooLargeError
+from app.services.file_download import file_download_response
 from app.models.users import SystemUser, UserRole
 from app.crud import tenants as crud_tenants
 
@@ -31,11 +31,12 @@ async def create_prontuario(
         raise HTTPException(status_code=404, detail="Tenant not found")
     clinic_name = tenant.nome
 
-    file_content = await file.read()
     file_extension = os.path.splitext(file.filename)[1].lstrip('.')
 
     try:
-        caminho_arquivo = file_storage_service.save_prontuario_file(clinic_name, file_content, file_extension)
+        stored = await file_storage_service.save_prontuario_upload(db, clinic_name, file, file_extension)
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save prontuario file: {e}")
 
@@ -44,7 +45,9 @@ async def create_prontuario(
         conteudo=conteudo,
         agendamento_id=agendamento_id,
         servico_id=servico_id,
-        caminho_arquivo=caminho_arquivo # Now storing the file path
+        caminho_arquivo=stored.relative_path, # Now storing the file path
+        checksum_sha256=stored.sha256,
+        tamanho_bytes=stored.size
     )
     return await crud_prontuarios.create_prontuario(db=db, prontuario=prontuario_create)
 
@@ -56,7 +59,7 @@ async def read_prontuarios_by_paciente(
     return await crud_prontuarios.get_prontuarios_by_paciente(db, paciente_id=paciente_id, skip=skip, limit=limit)
 
 @router.get("/{prontuario_id}/file", tags=["Prontuarios"])
-async def get_prontuario_file(prontuario_id: uuid.UUID, db: AsyncSession = Depends(get_db),
+async def get_prontuario_file(prontuario_id: uuid.UUID, request: Request, db: AsyncSession = Depends(get_db),
     current_user: SystemUser = Depends(get_current_active_user)
 ):
     db_prontuario = await crud_prontuarios.get_prontuario(db, prontuario_id=prontuario_id)
@@ -67,7 +70,7 @@ async def get_prontuario_file(prontuario_id: uuid.UUID, db: AsyncSession = Depen
     if not full_file_path.exists():
         raise HTTPException(status_code=404, detail="Arquivo de prontuário não encontrado no sistema de arquivos")
         
-    return FileResponse(full_file_path)
+    return file_download_response(request, full_file_path, checksum=db_prontuario.checksum_sha256)
 
 @router.put("/{prontuario_id}", response_model=ProntuarioInDB, tags=["Prontuarios"])
 async def update_prontuario(
@@ -79,9 +82,16 @@ async def update_prontuario(
     if current_user.role not in [UserRole.admin_global, UserRole.gestor_clinica, UserRole.medico]:
         raise HTTPException(status_code=403, detail="Not authorized to update prontuarios")
     
-    db_prontuario = await crud_prontuarios.update_prontuario(db=db, prontuario_id=prontuario_id, prontuario=prontuario)
+    db_prontuario, arquivo_liberado = await crud_prontuarios.update_prontuario(db=db, prontuario_id=prontuario_id, prontuario=prontuario)
     if db_prontuario is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prontuario not found")
+
+    # The previous file is no longer referenced by any record
+    if arquivo_liberado:
+        try:
+            await file_storage_service.delete_released_file(db, arquivo_liberado)
+        except Exception as e:
+            print(f"WARNING: Failed to delete prontuario file {arquivo_liberado} from storage: {e}")
     return db_prontuario
 
 @router.delete("/{prontuario_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["Prontuarios"])
@@ -97,14 +107,19 @@ async def delete_prontuario(
     if db_prontuario is None:
         raise HTTPException(status_code=404, detail="Prontuario not found")
     
-    # Delete file from storage
+    # Release the stored file (it may be shared with other records with the same content)
+    apagar_arquivo = False
     if db_prontuario.caminho_arquivo:
-        try:
-            file_storage_service.delete_file(db_prontuario.caminho_arquivo)
-        except Exception as e:
-            print(f"WARNING: Failed to delete prontuario file {db_prontuario.caminho_arquivo} from storage: {e}")
+        apagar_arquivo = await file_storage_service.release_file(db, db_prontuario.caminho_arquivo)
 
     # Delete record from database
     await crud_prontuarios.delete_prontuario(db, prontuario_id=prontuario_id)
+
+    # Delete file from storage once no record references it
+    if apagar_arquivo:
+        try:
+            await file_storage_service.delete_released_file(db, db_prontuario.caminho_arquivo)
+        except Exception as e:
+            print(f"WARNING: Failed to delete prontuario file {db_prontuario.caminho_arquivo} from storage: {e}")
     
     return {"message": "Prontuario deleted successfully"}
\ No newline at end of file
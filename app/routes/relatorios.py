@@ -6,7 +6,7 @@ import uuid
 
 from ..crud import relatorios as crud
 from ..schemas import relatorios as schemas
-from ..db.database import get_db
+from ..db.database import get_read_db
 from ..routes.auth import get_current_active_user
 from ..models.users import SystemUser
 from ..core.permissions import can_view_reports
@@ -17,7 +17,7 @@ router = APIRouter()
 async def get_horas_atendimento_academico(
     start_date: datetime = Query(..., description="Data de início (YYYY-MM-DDTHH:MM:SS)"),
     end_date: datetime = Query(..., description="Data de fim (YYYY-MM-DDTHH:MM:SS)"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: SystemUser = Depends(can_view_reports)
 ):
     tenant_id = current_user.default_tenant_id
@@ -27,7 +27,7 @@ async def get_horas_atendimento_academico(
 async def get_procedimentos_por_estudante(
     start_date: datetime = Query(..., description="Data de início (YYYY-MM-DDTHH:MM:SS)"),
     end_date: datetime = Query(..., description="Data de fim (YYYY-MM-DDTHH:MM:SS)"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: SystemUser = Depends(can_view_reports)
 ):
     tenant_id = current_user.default_tenant_id
@@ -37,7 +37,7 @@ async def get_procedimentos_por_estudante(
 async def get_tempo_medio_aprovacao_prontuarios(
     start_date: datetime = Query(..., description="Data de início (YYYY-MM-DDTHH:MM:SS)"),
     end_date: datetime = Query(..., description="Data de fim (YYYY-MM-DDTHH:MM:SS)"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: SystemUser = Depends(can_view_reports)
 ):
     tenant_id = current_user.default_tenant_id
@@ -47,7 +47,7 @@ async def get_tempo_medio_aprovacao_prontuarios(
 async def get_visao_geral_agendamentos(
     start_date: datetime = Query(..., description="Data de início (YYYY-MM-DDTHH:MM:SS)"),
     end_date: datetime = Query(..., description="Data de fim (YYYY-MM-DDTHH:MM:SS)"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: SystemUser = Depends(can_view_reports)
 ):
     tenant_id = current_user.default_tenant_id
@@ -57,7 +57,7 @@ async def get_visao_geral_agendamentos(
 async def get_tratamentos_por_status(
     start_date: datetime = Query(..., description="Data de início (YYYY-MM-DDTHH:MM:SS)"),
     end_date: datetime = Query(..., description="Data de fim (YYYY-MM-DDTHH:MM:SS)"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: SystemUser = Depends(can_view_reports)
 ):
     tenant_id = current_user.default_tenant_id
@@ -67,7 +67,7 @@ async def get_tratamentos_por_status(
 async def get_resumo_financeiro(
     start_date: datetime = Query(..., description="Data de início (YYYY-MM-DDTHH:MM:SS)"),
     end_date: datetime = Query(..., description="Data de fim (YYYY-MM-DDTHH:MM:SS)"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: SystemUser = Depends(can_view_reports)
 ):
     tenant_id = current_user.default_tenant_id
@@ -77,7 +77,7 @@ async def get_resumo_financeiro(
 async def get_custos_tratamento_por_periodo(
     start_date: datetime = Query(..., description="Data de início (YYYY-MM-DDTHH:MM:SS)"),
     end_date: datetime = Query(..., description="Data de fim (YYYY-MM-DDTHH:MM:SS)"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: SystemUser = Depends(can_view_reports)
 ):
     tenant_id = current_user.default_tenant_id
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, UUID4, validator
 import datetime
-from typing import Optional
+from typing import List, Optional
 from ..models.agendamentos import AppointmentStatus
 from .pacientes import Paciente
 from .servicos import Servico
@@ -57,6 +57,61 @@ class Agendamento(AgendamentoBase):
     class Config:
         from_attributes = True
 
+class AgendamentoConcluido(Agendamento):
+    """Resposta de /concluir: o PDF do atendimento é gerado pelo job `pdf_job_id` (ver /jobs/{id})."""
+    pdf_job_id: Optional[UUID4] = None
+
+class AgendamentoResumo(AgendamentoBase):
+    """Perfil "summary": sem a árvore do tratamento."""
+    id: UUID4
+    tenant_id: UUID4
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+
+    paciente: Paciente
+    academico: UserSimple
+    orientador: Optional[UserSimple] = None
+    servico: Optional[Servico] = None
+
+    class Config:
+        from_attributes = True
+
+class PacienteNome(BaseModel):
+    id: UUID4
+    nome: str
+
+    class Config:
+        from_attributes = True
+
+class AcademicoNome(BaseModel):
+    id: UUID4
+    nome: str
+    color: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class ServicoNome(BaseModel):
+    id: UUID4
+    nome: str
+
+    class Config:
+        from_attributes = True
+
+class AgendamentoCalendario(BaseModel):
+    """Perfil "calendar": apenas horários, status e nomes para a agenda."""
+    id: UUID4
+    inicio: datetime.datetime
+    fim: datetime.datetime
+    status: AppointmentStatus
+    tipo_atendimento: Optional[str] = None
+    paciente: PacienteNome
+    academico: AcademicoNome
+    servico: Optional[ServicoNome] = None
+
+    class Config:
+        from_attributes = True
+
 class AgendamentoDetalhes(BaseModel):
     id: UUID4
     tenant_id: UUID4
@@ -74,4 +129,21 @@ class AgendamentoDetalhes(BaseModel):
     hora_fim_atendimento: Optional[datetime.datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class DisponibilidadeAcademico(BaseModel):
+    academico_id: Optional[UUID4] = None # None = agenda de todo o tenant
+    # Um caractere por bloco do expediente; '1' = um atendimento da duração pedida pode começar ali
+    livres: str
+
+class DisponibilidadeDia(BaseModel):
+    data: datetime.date
+    bloqueado: bool # Domingo ou feriado
+    academicos: List[DisponibilidadeAcademico]
+
+class GradeDisponibilidade(BaseModel):
+    inicio_expediente: datetime.time
+    minutos_por_bloco: int
+    blocos_por_dia: int
+    duracao_minutos: int
+    dias: List[DisponibilidadeDia]
@@ -10,13 +10,16 @@ class DocumentoPacienteBase(BaseModel):
     tipo_documento: Optional[str] = Field(None, max_length=100)
 
 class DocumentoPacienteCreate(DocumentoPacienteBase):
-    pass
+    checksum_sha256: Optional[str] = Field(None, max_length=64)
+    tamanho_bytes: Optional[int] = None
 
 class DocumentoPacienteUpdate(DocumentoPacienteBase):
     pass
 
 class DocumentoPacienteInDB(DocumentoPacienteBase):
     id: uuid.UUID
+    checksum_sha256: Optional[str] = None
+    tamanho_bytes: Optional[int] = None
     created_at: datetime
     updated_at: datetime
 
@@ -25,3 +25,7 @@ class MovimentacaoEstoque(MovimentacaoEstoqueBase):
 
     class Config:
         from_attributes = True
+
+class MovimentacaoEstoqueCriada(MovimentacaoEstoque):
+    """Resposta da criação: o comprovante em PDF é gerado pelo job `pdf_job_id`, se houver paciente."""
+    pdf_job_id: Optional[UUID4] = None
@@ -0,0 +1,23 @@
+from pydantic import BaseModel, UUID4
+import datetime
+from typing import Optional
+from ..models.pdf_jobs import PdfJobStatus, PdfJobTipo
+from .documento_paciente import DocumentoPacienteInDB
+
+class PdfJob(BaseModel):
+    id: UUID4
+    tipo: PdfJobTipo
+    referencia_id: UUID4
+    status: PdfJobStatus
+    tentativas: int
+    erro: Optional[str] = None
+    documento_id: Optional[UUID4] = None
+    created_at: datetime.datetime
+    started_at: Optional[datetime.datetime] = None
+    finished_at: Optional[datetime.datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class PdfJobDetalhe(PdfJob):
+    documento: Optional[DocumentoPacienteInDB] = None
@@ -11,13 +11,16 @@ class ProntuarioBase(BaseModel):
     caminho_arquivo: Optional[str] = Field(None, max_length=512)
 
 class ProntuarioCreate(ProntuarioBase):
-    pass
+    checksum_sha256: Optional[str] = Field(None, max_length=64)
+    tamanho_bytes: Optional[int] = None
 
 class ProntuarioUpdate(ProntuarioBase):
     pass
 
 class ProntuarioInDB(ProntuarioBase):
     id: uuid.UUID
+    checksum_sha256: Optional[str] = None
+    tamanho_bytes: Optional[int] = None
     created_at: datetime
     updated_at: datetime
 
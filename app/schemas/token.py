@@ -9,3 +9,4 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     username: str | None = None # Change email to username
+    tenant_id: str | None = None
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+"""
+Reconstrói a tabela atendimentos_diarios (agregado diário dos agendamentos
+concluídos, lido pelos relatórios de horas de atendimento e de procedimentos por
+estudante) a partir de agendamentos.
+
+Use na criação da tabela, para carregar o histórico, ou para corrigir os agregados
+depois de alterações feitas direto no banco. Os dias do intervalo são apagados e
+recalculados numa única transação; a aplicação pode continuar no ar.
+
+Uso: python app/scripts/backfill_atendimentos_diarios.py [--desde AAAA-MM-DD] [--ate AAAA-MM-DD] [--tenant UUID]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import uuid
+from datetime import date
+
+# Adjust the path to import from the parent directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.db.database import AsyncSessionLocal
+from app.crud import atendimentos_diarios as atendimentos_diarios_crud
+
+
+async def backfill(desde, ate, tenant_id):
+    async with AsyncSessionLocal() as session:
+        linhas = await atendimentos_diarios_crud.reconstruir(session, desde=desde, ate=ate, tenant_id=tenant_id)
+        await session.commit()
+    periodo = f"{desde or 'início'} a {ate or 'fim'}"
+    print(f"{linhas} linha(s) de atendimentos_diarios recalculadas ({periodo}).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--desde", type=date.fromisoformat, help="primeiro dia a recalcular (padrão: todo o histórico)")
+    parser.add_argument("--ate", type=date.fromisoformat, help="último dia a recalcular, inclusive (padrão: sem limite)")
+    parser.add_argument("--tenant", type=uuid.UUID, help="recalcula apenas esta clínica")
+    args = parser.parse_args()
+    asyncio.run(backfill(args.desde, args.ate, args.tenant))
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+Mede o custo de escolher a pasta de um novo upload com N documentos já salvos:
+a sondagem antiga de FileStorageService._get_next_folder_path (prontuario_0001,
+prontuario_0002, ... listando cada pasta cheia) contra o índice de alocação
+de app.core.storage_allocator.
+
+Uso: python app/scripts/benchmark_file_storage.py [documentos] [uploads]
+"""
+
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# storage_allocator não depende das configurações da aplicação; carrega o módulo direto
+# para o benchmark rodar sem .env.
+_spec = importlib.util.spec_from_file_location(
+    "storage_allocator",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "core", "storage_allocator.py")),
+)
+storage_allocator = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(storage_allocator)
+
+PREFIX = "prontuario_"
+
+
+def legacy_next_folder_path(base_path: Path, prefix: str) -> Path:
+    """Algoritmo original de FileStorageService._get_next_folder_path."""
+    current_folder_index = 1
+    while True:
+        folder_name = f"{prefix}{current_folder_index:04d}"
+        folder_path = base_path / folder_name
+        if not folder_path.exists():
+            folder_path.mkdir(parents=True, exist_ok=True)
+            return folder_path
+        file_count = len(list(folder_path.iterdir()))
+        if file_count < 400:
+            return folder_path
+        current_folder_index += 1
+
+
+def prefill(base_path: Path, documents: int):
+    per_folder = storage_allocator.FILES_PER_FOLDER
+    for i in range(documents):
+        folder = base_path / f"{PREFIX}{i // per_folder + 1:04d}"
+        if i % per_folder == 0:
+            folder.mkdir(parents=True)
+        (folder / f"{i}.pdf").touch()
+
+
+def measure(base_path: Path, uploads: int, choose_folder) -> float:
+    started = time.perf_counter()
+    for i in range(uploads):
+        folder = choose_folder(base_path)
+        (folder / f"bench_{choose_folder.__name__}_{i}.pdf").touch()
+    return (time.perf_counter() - started) / uploads
+
+
+def main():
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    uploads = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    allocator = storage_allocator.FolderAllocator(prefix=PREFIX)
+
+    def legacy(base_path):
+        return legacy_next_folder_path(base_path, PREFIX)
+
+    def indexed(base_path):
+        return allocator.allocate(base_path)
+
+    print(f"{'documentos':>10}  {'sondagem (ms/upload)':>21}  {'índice (ms/upload)':>19}")
+    for n in sorted({1_000, 10_000, documents}):
+        tmp = Path(tempfile.mkdtemp(prefix="bench_storage_"))
+        try:
+            legacy_dir, indexed_dir = tmp / "legacy", tmp / "indexed"
+            prefill(legacy_dir, n)
+            prefill(indexed_dir, n)
+            # Primeira alocação constrói o índice a partir do disco (uma única vez).
+            allocator.allocate(indexed_dir)
+            legacy_ms = measure(legacy_dir, uploads, legacy) * 1000
+            indexed_ms = measure(indexed_dir, uploads, indexed) * 1000
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        print(f"{n:>10}  {legacy_ms:>21.3f}  {indexed_ms:>19.3f}")
+
+
+if __name__ == "__main__":
+    main()
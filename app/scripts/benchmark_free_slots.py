@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""
+Compara o cálculo de horários livres antigo (laço por slot com conjuntos de datetime,
+um dia e um acadêmico por chamada) com o motor de bitmaps de app.services.agenda_slots.
+
+Uso: python app/scripts/benchmark_free_slots.py [dias] [academicos]
+"""
+
+import os
+import random
+import sys
+import time as timer
+from datetime import date, datetime, time, timedelta
+
+# Adjust the path to import from the parent directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.services import agenda_slots
+
+
+def legacy_free_slots(target_date, duration_minutes, appointments):
+    """Algoritmo original de /agendamentos/horarios-livres para um dia."""
+    start_time = datetime.combine(target_date, time(7, 0))
+    end_time = datetime.combine(target_date, time(22, 0))
+
+    all_possible_slots = []
+    current_slot_start = start_time
+    while current_slot_start < end_time:
+        all_possible_slots.append(current_slot_start)
+        current_slot_start += timedelta(minutes=30)
+
+    booked_intervals = set()
+    for inicio, fim in appointments:
+        current_interval_start = datetime.combine(target_date, inicio.time())
+        while current_interval_start < datetime.combine(target_date, fim.time()):
+            booked_intervals.add(current_interval_start)
+            current_interval_start += timedelta(minutes=30)
+
+    free_slots_found = []
+    num_30_min_blocks = duration_minutes // 30
+    for possible_slot_start in all_possible_slots:
+        if possible_slot_start in booked_intervals:
+            continue
+        is_free_block = True
+        for i in range(num_30_min_blocks):
+            check_time = possible_slot_start + timedelta(minutes=i * 30)
+            if check_time >= end_time or check_time in booked_intervals:
+                is_free_block = False
+                break
+        if is_free_block and possible_slot_start + timedelta(minutes=duration_minutes) <= end_time:
+            free_slots_found.append(possible_slot_start.time())
+    return free_slots_found
+
+
+def synthetic_agenda(days, academics, per_day=6):
+    rng = random.Random(42)
+    agenda = {}
+    for academic in range(academics):
+        for day in days:
+            blocks = sorted(rng.sample(range(agenda_slots.BLOCKS_PER_DAY - 1), per_day))
+            agenda[(academic, day)] = [
+                (
+                    datetime.combine(day, time(7, 0)) + timedelta(minutes=30 * b),
+                    datetime.combine(day, time(7, 0)) + timedelta(minutes=30 * (b + 1)),
+                )
+                for b in blocks
+            ]
+    return agenda
+
+
+def main():
+    n_days = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    n_academics = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    duration = 60
+    days = [date(2025, 3, 3) + timedelta(days=i) for i in range(n_days)]
+    agenda = synthetic_agenda(days, n_academics)
+
+    started = timer.perf_counter()
+    legacy = {key: legacy_free_slots(key[1], duration, appts) for key, appts in agenda.items()}
+    legacy_elapsed = timer.perf_counter() - started
+
+    started = timer.perf_counter()
+    blocks = duration // agenda_slots.BLOCK_MINUTES
+    engine = {
+        key: agenda_slots.free_start_mask(agenda_slots.occupancy_mask(key[1], appts), blocks)
+        for key, appts in agenda.items()
+    }
+    engine_elapsed = timer.perf_counter() - started
+
+    mismatches = sum(1 for key in agenda if legacy[key] != agenda_slots.mask_to_times(engine[key]))
+    print(f"{n_days} dias x {n_academics} acadêmicos ({len(agenda)} agendas diárias)")
+    print(f"  laço antigo:   {legacy_elapsed * 1000:8.1f} ms ({len(agenda)} chamadas HTTP no cliente)")
+    print(f"  bitmaps:       {engine_elapsed * 1000:8.1f} ms (1 chamada, 2 consultas)")
+    print(f"  speedup:       {legacy_elapsed / engine_elapsed:8.1f}x")
+    print(f"  divergências:  {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+"""
+Compara a visão geral de agendamentos, o resumo financeiro e os custos de
+tratamento antigos (uma consulta por contagem/status/tratamento) com as versões
+de app.crud.relatorios (GROUPING SETS, agregados com FILTER e join único), sobre
+uma massa sintética.
+
+A massa é criada em tabelas temporárias com os mesmos nomes das reais
+(agendamentos, system_users, servicos, planos_custo, pacientes, tratamentos,
+tratamento_servicos): na conexão do benchmark elas escondem as tabelas reais,
+que não são alteradas.
+
+Termina com erro se o relatório de custos voltar a emitir mais de uma consulta.
+
+Uso: python app/scripts/benchmark_relatorios.py [agendamentos] [planos_custo] [tratamentos] [repeticoes]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+
+# Adjust the path to import from the parent directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from sqlalchemy import event, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.crud import relatorios as crud_relatorios
+from app.db.database import engine
+from app.models import agendamentos as agendamento_models, users as user_models, servicos as servico_models, planos_custo as plano_custo_models
+from app.models import pacientes as paciente_models, tratamentos as tratamento_models, tratamento_servicos as tratamento_servico_models
+
+START = datetime(2024, 1, 1)
+END = datetime(2025, 12, 31)
+
+SEED_SQL = [
+    "CREATE TEMP TABLE system_users (id uuid PRIMARY KEY, nome varchar(255))",
+    "CREATE TEMP TABLE servicos (id uuid PRIMARY KEY, nome varchar(255), valor numeric(12, 2))",
+    "CREATE TEMP TABLE pacientes (id uuid PRIMARY KEY, nome varchar(255))",
+    """CREATE TEMP TABLE tratamentos (
+        id uuid PRIMARY KEY, tenant_id uuid NOT NULL, paciente_id uuid, nome varchar(255) NOT NULL, created_at timestamp)""",
+    """CREATE TEMP TABLE tratamento_servicos (
+        id uuid PRIMARY KEY, tratamento_id uuid NOT NULL, servico_id uuid NOT NULL, quantidade integer)""",
+    """CREATE TEMP TABLE agendamentos (
+        id uuid PRIMARY KEY, tenant_id uuid NOT NULL, academico_id uuid NOT NULL, servico_id uuid,
+        inicio timestamp NOT NULL, fim timestamp NOT NULL, status appointment_status NOT NULL)""",
+    """CREATE TEMP TABLE planos_custo (
+        id uuid PRIMARY KEY, tenant_id uuid NOT NULL, status plano_custo_status NOT NULL,
+        valor_total numeric(12, 2), created_at timestamp)""",
+    "INSERT INTO system_users SELECT gen_random_uuid(), 'Acadêmico ' || g FROM generate_series(1, 300) g",
+    "INSERT INTO servicos SELECT gen_random_uuid(), 'Serviço ' || g, 50 + g FROM generate_series(1, 60) g",
+    "INSERT INTO pacientes SELECT gen_random_uuid(), 'Paciente ' || g FROM generate_series(1, 5000) g",
+    """INSERT INTO tratamentos
+        SELECT gen_random_uuid(), :tenant_id, p.ids[1 + g % array_length(p.ids, 1)], 'Tratamento ' || g,
+               timestamp '2024-01-01' + (g % 700) * interval '1 day'
+        FROM generate_series(1, :tratamentos) g
+        CROSS JOIN (SELECT array_agg(id) AS ids FROM pacientes) p""",
+    """INSERT INTO tratamento_servicos
+        SELECT gen_random_uuid(), t.id, s.ids[1 + (abs(hashtext(t.id::text)) + k) % array_length(s.ids, 1)], 1 + k % 2
+        FROM tratamentos t
+        CROSS JOIN generate_series(1, 3) k
+        CROSS JOIN (SELECT array_agg(id) AS ids FROM servicos) s""",
+    """INSERT INTO agendamentos
+        SELECT gen_random_uuid(), :tenant_id,
+               u.ids[1 + g % array_length(u.ids, 1)],
+               s.ids[1 + (g / 7) % array_length(s.ids, 1)],
+               t.inicio, t.inicio + interval '1 hour',
+               (enum_range(NULL::appointment_status))[1 + g % 6]
+        FROM generate_series(1, :agendamentos) g
+        CROSS JOIN (SELECT array_agg(id) AS ids FROM system_users) u
+        CROSS JOIN (SELECT array_agg(id) AS ids FROM servicos) s
+        CROSS JOIN LATERAL (SELECT timestamp '2024-01-01' + (g % 1000000) * interval '1 minute' AS inicio) t""",
+    """INSERT INTO planos_custo
+        SELECT gen_random_uuid(), :tenant_id, (enum_range(NULL::plano_custo_status))[1 + g % 3],
+               (g % 5000) / 10.0, timestamp '2024-01-01' + (g % 700) * interval '1 day'
+        FROM generate_series(1, :planos) g""",
+    "CREATE INDEX ON agendamentos (tenant_id, inicio, id)",
+    "CREATE INDEX ON planos_custo (tenant_id, created_at)",
+    "CREATE INDEX ON tratamento_servicos (tratamento_id)",
+    "ANALYZE system_users, servicos, agendamentos, planos_custo, pacientes, tratamentos, tratamento_servicos",
+]
+
+
+async def legacy_visao_geral(db: AsyncSession, tenant_id: uuid.UUID, start_date: datetime, end_date: datetime):
+    """Versão anterior: total, por status, por profissional e por serviço em quatro consultas."""
+    Agendamento = agendamento_models.Agendamento
+    filtros = (Agendamento.tenant_id == tenant_id, Agendamento.inicio >= start_date, Agendamento.fim <= end_date)
+    total = (await db.execute(select(func.count(Agendamento.id)).filter(*filtros))).scalar_one()
+    por_status = (await db.execute(
+        select(Agendamento.status, func.count(Agendamento.id)).filter(*filtros).group_by(Agendamento.status)
+    )).all()
+    por_profissional = (await db.execute(
+        select(user_models.SystemUser.id, user_models.SystemUser.nome, func.count(Agendamento.id))
+        .join(user_models.SystemUser, Agendamento.academico_id == user_models.SystemUser.id)
+        .filter(*filtros)
+        .group_by(user_models.SystemUser.id, user_models.SystemUser.nome)
+        .order_by(user_models.SystemUser.nome)
+    )).all()
+    por_servico = (await db.execute(
+        select(servico_models.Servico.id, servico_models.Servico.nome, func.count(Agendamento.id))
+        .join(servico_models.Servico, Agendamento.servico_id == servico_models.Servico.id)
+        .filter(*filtros)
+        .group_by(servico_models.Servico.id, servico_models.Servico.nome)
+        .order_by(servico_models.Servico.nome)
+    )).all()
+    return total, len(por_status), len(por_profissional), len(por_servico)
+
+
+async def legacy_resumo_financeiro(db: AsyncSession, tenant_id: uuid.UUID, start_date: datetime, end_date: datetime):
+    """Versão anterior: total e uma soma por status, em quatro consultas."""
+    PlanoCusto = plano_custo_models.PlanoCusto
+    filtros = (PlanoCusto.tenant_id == tenant_id, PlanoCusto.created_at >= start_date, PlanoCusto.created_at <= end_date)
+    total = (await db.execute(select(func.count(PlanoCusto.id)).filter(*filtros))).scalar_one()
+    valores = []
+    for status in (plano_custo_models.PlanoCustoStatus.aprovado, plano_custo_models.PlanoCustoStatus.pendente, plano_custo_models.PlanoCustoStatus.cancelado):
+        valores.append((await db.execute(
+            select(func.sum(PlanoCusto.valor_total)).filter(*filtros, PlanoCusto.status == status)
+        )).scalar_one() or 0.0)
+    return total, *valores
+
+
+async def legacy_custos_tratamento(db: AsyncSession, tenant_id: uuid.UUID, start_date: datetime, end_date: datetime):
+    """Versão anterior: os tratamentos e depois uma consulta de serviços por tratamento (N+1)."""
+    Tratamento = tratamento_models.Tratamento
+    TratamentoServico = tratamento_servico_models.TratamentoServico
+    tratamentos = (await db.execute(
+        select(Tratamento.id)
+        .join(paciente_models.Paciente, Tratamento.paciente_id == paciente_models.Paciente.id)
+        .filter(Tratamento.tenant_id == tenant_id, Tratamento.created_at >= start_date, Tratamento.created_at <= end_date)
+    )).scalars().all()
+    total = 0.0
+    for tratamento_id in tratamentos:
+        for row in (await db.execute(
+            select(servico_models.Servico.nome, servico_models.Servico.valor * TratamentoServico.quantidade)
+            .join(TratamentoServico, TratamentoServico.servico_id == servico_models.Servico.id)
+            .filter(TratamentoServico.tratamento_id == tratamento_id)
+        )).all():
+            total += float(row[1])
+    return len(tratamentos), total
+
+
+def count_relation_scans(plan: dict, relations: set) -> int:
+    scans = 1 if plan.get("Relation Name") in relations else 0
+    return scans + sum(count_relation_scans(child, relations) for child in plan.get("Plans", []))
+
+
+async def measure(conn, db, label, report, tenant_id, repeticoes, relations):
+    statements = []
+
+    def capture(_conn, _cursor, statement, parameters, _context, _executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        await report(db, tenant_id, START, END)  # aquecimento / captura das consultas
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    scans = 0
+    # Só o plano das primeiras consultas (a versão N+1 repete a mesma consulta por tratamento)
+    for statement, parameters in statements[:10]:
+        result = await conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        plan = result.scalar_one()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        scans += count_relation_scans(plan[0]["Plan"], relations)
+
+    started = time.perf_counter()
+    for _ in range(repeticoes):
+        await report(db, tenant_id, START, END)
+    elapsed_ms = (time.perf_counter() - started) / repeticoes * 1000
+    print(f"{label:<34} {len(statements):>10} {scans:>16} {elapsed_ms:>12.1f}")
+    return len(statements)
+
+
+async def main():
+    agendamentos = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    planos = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    tratamentos = int(sys.argv[3]) if len(sys.argv) > 3 else 20_000
+    repeticoes = int(sys.argv[4]) if len(sys.argv) > 4 else 5
+    tenant_id = uuid.uuid4()
+
+    async with engine.connect() as conn:
+        print(f"Gerando {agendamentos} agendamentos, {planos} planos de custo e {tratamentos} tratamentos em tabelas temporárias...")
+        params = {"tenant_id": tenant_id, "agendamentos": agendamentos, "planos": planos, "tratamentos": tratamentos}
+        for sql in SEED_SQL:
+            await conn.execute(text(sql), params)
+
+        db = AsyncSession(bind=conn)
+        print(f"{'relatório':<34} {'consultas':>10} {'leituras tabela':>16} {'ms/chamada':>12}")
+        await measure(conn, db, "visão geral (antiga)", legacy_visao_geral, tenant_id, repeticoes, {"agendamentos"})
+        await measure(conn, db, "visão geral (GROUPING SETS)", crud_relatorios.get_visao_geral_agendamentos, tenant_id, repeticoes, {"agendamentos"})
+        await measure(conn, db, "resumo financeiro (antigo)", legacy_resumo_financeiro, tenant_id, repeticoes, {"planos_custo"})
+        await measure(conn, db, "resumo financeiro (FILTER)", crud_relatorios.get_resumo_financeiro, tenant_id, repeticoes, {"planos_custo"})
+        await measure(conn, db, "custos de tratamento (N+1)", legacy_custos_tratamento, tenant_id, 1, {"tratamento_servicos"})
+        consultas_custos = await measure(conn, db, "custos de tratamento (join)", crud_relatorios.get_custos_tratamento_por_periodo, tenant_id, repeticoes, {"tratamento_servicos"})
+        await db.close()
+        await conn.rollback()
+
+    if consultas_custos > 1:
+        sys.exit(f"ERRO: get_custos_tratamento_por_periodo emitiu {consultas_custos} consultas (esperado: 1).")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,6 +4,7 @@ import asyncio
 import sys
 import os
 
+from sqlalchemy import text
 from sqlalchemy.dialects.postgresql import ENUM as PG_ENUM, CreateEnumType
 
 
@@ -16,15 +17,19 @@ from app.db.database import engine
 # Import all models to ensure they are registered with Base.metadata
 # This is crucial for create_all() to find all tables.
 import app.models.agendamentos
+import app.models.atendimentos_diarios
 import app.models.consentimentos_paciente
 import app.models.despesas
 import app.models.documentos_paciente
+import app.models.email_outbox
 import app.models.estoque
 import app.models.feriados
+import app.models.file_blobs
 import app.models.menu_permissions
 import app.models.movimentacoes_estoque
 import app.models.pacientes
 import app.models.pagamentos
+import app.models.pdf_jobs
 import app.models.planos_custo_itens
 import app.models.planos_custo
 import app.models.prontuarios
@@ -48,11 +53,16 @@ from app.models.pagamentos import MetodoPagamento
 from app.models.movimentacoes_estoque import TipoMovimentacao
 from app.models.menu_permissions import MenuKey
 from app.models.agendamentos import AppointmentStatus
+from app.models.pdf_jobs import PdfJobStatus, PdfJobTipo
+from app.models.email_outbox import EmailOutboxStatus
 
 async def create_db_tables():
     """Creates all database tables defined in the models."""
     print("Criando tabelas do banco de dados...")
     async with engine.begin() as conn:
+        # btree_gist permite usar igualdade de UUID na restrição de exclusão dos agendamentos
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+
         # Create ENUM types explicitly
         await conn.run_sync(lambda sync_conn: PG_ENUM(UserRole, name='user_role', create_type=True).create(sync_conn))
         await conn.run_sync(lambda sync_conn: PG_ENUM(TreatmentStatus, name='treatment_status', create_type=True).create(sync_conn))
@@ -64,6 +74,9 @@ async def create_db_tables():
         await conn.run_sync(lambda sync_conn: PG_ENUM(TipoMovimentacao, name='tipo_movimentacao_enum', create_type=True).create(sync_conn))
         await conn.run_sync(lambda sync_conn: PG_ENUM(MenuKey, name='menu_key', create_type=True).create(sync_conn))
         await conn.run_sync(lambda sync_conn: PG_ENUM(AppointmentStatus, name='appointment_status', create_type=True).create(sync_conn))
+        await conn.run_sync(lambda sync_conn: PG_ENUM(PdfJobTipo, name='pdf_job_tipo', create_type=True).create(sync_conn))
+        await conn.run_sync(lambda sync_conn: PG_ENUM(PdfJobStatus, name='pdf_job_status', create_type=True).create(sync_conn))
+        await conn.run_sync(lambda sync_conn: PG_ENUM(EmailOutboxStatus, name='email_outbox_status', create_type=True).create(sync_conn))
 
         # Then create tables
         await conn.run_sync(Base.metadata.create_all)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+"""
+Migra os uploads existentes (BASE_UPLOAD_DIR) para o armazenamento deduplicado.
+
+Para cada clínica, calcula o SHA-256 de todos os arquivos, escolhe uma cópia
+canônica para cada conteúdo, aponta os prontuários e documentos das cópias
+repetidas para ela, apaga as repetidas e registra o blob em file_blobs com o
+refcount correto. Também preenche checksum_sha256/tamanho_bytes nos registros.
+
+Sem --apply apenas mostra o relatório do que seria feito (espaço a recuperar).
+
+Uso: python app/scripts/dedup_uploads.py [--apply]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+# Adjust the path to import from the parent directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.storage_allocator import INDEX_FILE_NAME, LOCK_FILE_NAME
+from app.db.database import AsyncSessionLocal
+from app.models.documentos_paciente import DocumentoPaciente
+from app.models.file_blobs import FileBlob
+from app.models.prontuarios import Prontuario
+
+REFERENCING_MODELS = (Prontuario, DocumentoPaciente)
+_IGNORED_FILES = {INDEX_FILE_NAME, LOCK_FILE_NAME, INDEX_FILE_NAME + ".tmp"}
+
+
+def sha256_of(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def scan_uploads(base_dir: Path):
+    """{(clínica, sha256): [caminhos relativos]} e {caminho relativo: tamanho}."""
+    groups = defaultdict(list)
+    sizes = {}
+    for clinic_dir in sorted(p for p in base_dir.iterdir() if p.is_dir() and not p.name.startswith(".")):
+        for dirpath, _, filenames in os.walk(clinic_dir):
+            for filename in sorted(filenames):
+                if filename in _IGNORED_FILES:
+                    continue
+                path = Path(dirpath) / filename
+                relative = str(path.relative_to(base_dir))
+                sizes[relative] = path.stat().st_size
+                groups[(clinic_dir.name, sha256_of(path))].append(relative)
+    return groups, sizes
+
+
+async def dedup_uploads(apply: bool):
+    base_dir = Path(settings.BASE_UPLOAD_DIR)
+    if not base_dir.is_dir():
+        print(f"Diretório de uploads {base_dir} não encontrado.")
+        return
+
+    print(f"Calculando SHA-256 dos arquivos em {base_dir}...")
+    groups, sizes = scan_uploads(base_dir)
+
+    async with AsyncSessionLocal() as session:
+        # Registros que apontam para cada caminho
+        references = defaultdict(list)
+        for model in REFERENCING_MODELS:
+            result = await session.execute(select(model.id, model.caminho_arquivo).where(model.caminho_arquivo.isnot(None)))
+            for record_id, caminho in result.all():
+                references[caminho].append((model, record_id))
+
+        result = await session.execute(select(FileBlob.escopo, FileBlob.sha256, FileBlob.caminho_arquivo))
+        existing_blobs = {(escopo, sha256): caminho for escopo, sha256, caminho in result.all()}
+
+        files_total = sum(len(paths) for paths in groups.values())
+        duplicates_removed = 0
+        bytes_reclaimed = 0
+        orphan_files = 0
+        orphan_bytes = 0
+        to_delete = []
+
+        for (escopo, sha256), paths in groups.items():
+            referenced = [p for p in paths if references.get(p)]
+            for path in paths:
+                if not references.get(path):
+                    orphan_files += 1
+                    orphan_bytes += sizes[path]
+            if not referenced:
+                continue
+
+            canonical = existing_blobs.get((escopo, sha256))
+            if canonical not in paths:
+                canonical = referenced[0]
+            size = sizes[canonical]
+            refs = [ref for p in referenced for ref in references[p]]
+
+            for path in referenced:
+                if path == canonical:
+                    continue
+                duplicates_removed += 1
+                bytes_reclaimed += sizes[path]
+                to_delete.append(path)
+                if apply:
+                    for model, record_id in references[path]:
+                        await session.execute(
+                            update(model).where(model.id == record_id).values(caminho_arquivo=canonical)
+                        )
+
+            if apply:
+                for model in REFERENCING_MODELS:
+                    ids = [record_id for ref_model, record_id in refs if ref_model is model]
+                    if ids:
+                        await session.execute(
+                            update(model).where(model.id.in_(ids)).values(checksum_sha256=sha256, tamanho_bytes=size)
+                        )
+                await session.execute(
+                    insert(FileBlob)
+                    .values(escopo=escopo, sha256=sha256, caminho_arquivo=canonical, tamanho_bytes=size, refcount=len(refs))
+                    .on_conflict_do_update(
+                        constraint="uq_file_blobs_escopo_sha256",
+                        set_={"caminho_arquivo": canonical, "refcount": len(refs)},
+                    )
+                )
+
+        if apply:
+            await session.commit()
+            # Só apaga as cópias depois que os registros já apontam para a canônica.
+            for path in to_delete:
+                (base_dir / path).unlink(missing_ok=True)
+
+    print("Relatório de deduplicação" + ("" if apply else " (simulação, use --apply para executar)"))
+    print(f"  arquivos analisados:          {files_total}")
+    print(f"  conteúdos distintos:          {len(groups)}")
+    print(f"  cópias repetidas removidas:   {duplicates_removed}")
+    print(f"  espaço recuperado:            {bytes_reclaimed / (1024 * 1024):.1f} MiB ({bytes_reclaimed} bytes)")
+    print(f"  arquivos sem registro (mantidos): {orphan_files} ({orphan_bytes} bytes)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apply", action="store_true", help="executa a migração (sem isso, só o relatório)")
+    args = parser.parse_args()
+    asyncio.run(dedup_uploads(args.apply))
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+"""
+Enfileira os lembretes dos agendamentos das próximas horas (o mesmo trabalho do
+agendador em processo, app/services/reminder_scheduler.py), para uso via cron
+quando REMINDER_SCHEDULER_ENABLED=false. Os e-mails vão para a outbox e são
+enviados pelo dispatcher da aplicação.
+
+Uso: python app/scripts/send_reminders.py [--horizon-hours H] [--loop]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+# Adjust the path to import from the parent directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.core.config import settings
+from app.services.reminder_scheduler import ReminderScheduler
+
+
+async def send_reminders(horizon_hours: float, loop: bool):
+    scheduler = ReminderScheduler(
+        interval=settings.REMINDER_INTERVAL_SECONDS,
+        horizon_hours=horizon_hours,
+        batch_size=settings.REMINDER_BATCH_SIZE,
+    )
+    if loop:
+        print(f"Enfileirando lembretes a cada {scheduler.interval:.0f}s (Ctrl+C para sair)...")
+        await scheduler._run()
+    total = await scheduler.run_once()
+    print(f"{total} lembrete(s) enfileirados.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--horizon-hours", type=float, default=settings.REMINDER_HORIZON_HOURS,
+                        help="janela, em horas a partir de agora, dos agendamentos que recebem lembrete")
+    parser.add_argument("--loop", action="store_true", help="continua rodando, como o agendador em processo")
+    args = parser.parse_args()
+    try:
+        asyncio.run(send_reminders(args.horizon_hours, args.loop))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,131 @@
+import uuid
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from ..models.agendamentos import Agendamento, AppointmentStatus
+from ..models.feriados import Feriado
+
+# Expediente da clínica dividido em blocos de 30 minutos (07:00 - 22:00 = 30 blocos).
+# A ocupação de um dia é representada por um inteiro usado como bitmap: o bit i
+# indica que o bloco que começa em DAY_START + i * 30min está ocupado.
+DAY_START = time(7, 0)
+DAY_END = time(22, 0)
+BLOCK_MINUTES = 30
+BLOCKS_PER_DAY = (
+    (DAY_END.hour * 60 + DAY_END.minute) - (DAY_START.hour * 60 + DAY_START.minute)
+) // BLOCK_MINUTES
+FULL_DAY_MASK = (1 << BLOCKS_PER_DAY) - 1
+
+# Status que ocupam a agenda do acadêmico.
+BLOCKING_STATUSES = (
+    AppointmentStatus.agendado,
+    AppointmentStatus.iniciado,
+    AppointmentStatus.aguardando,
+    AppointmentStatus.em_atendimento,
+)
+
+_BLOCK = timedelta(minutes=BLOCK_MINUTES)
+
+
+def occupancy_mask(day: date, intervals: Iterable[Tuple[datetime, datetime]]) -> int:
+    """Bitmap dos blocos do dia que intersectam algum dos intervalos [inicio, fim)."""
+    day_start = datetime.combine(day, DAY_START)
+    mask = 0
+    for inicio, fim in intervals:
+        first = max(0, int((inicio - day_start) // _BLOCK))
+        # Arredonda o fim para cima: um agendamento até 08:15 ocupa o bloco 08:00-08:30.
+        last = min(BLOCKS_PER_DAY, -int((day_start - fim) // _BLOCK))
+        if last > first:
+            mask |= ((1 << (last - first)) - 1) << first
+    return mask
+
+
+def free_start_mask(occupied: int, blocks: int) -> int:
+    """
+    Bitmap dos blocos em que é possível iniciar um atendimento de `blocks` blocos
+    consecutivos livres sem ultrapassar o fim do expediente.
+    """
+    free = ~occupied & FULL_DAY_MASK
+    starts = free
+    for offset in range(1, blocks):
+        starts &= free >> offset
+    return starts
+
+
+def mask_to_times(mask: int) -> List[time]:
+    day_start = datetime.combine(date.min, DAY_START)
+    return [(day_start + i * _BLOCK).time() for i in range(BLOCKS_PER_DAY) if mask >> i & 1]
+
+
+def mask_to_string(mask: int) -> str:
+    """Representação compacta: um caractere por bloco, '1' = pode iniciar aqui."""
+    return "".join("1" if mask >> i & 1 else "0" for i in range(BLOCKS_PER_DAY))
+
+
+def _days(start_date: date, end_date: date) -> List[date]:
+    return [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+
+
+async def compute_availability(
+    db: AsyncSession,
+    tenant_id: uuid.UUID,
+    start_date: date,
+    end_date: date,
+    duration_minutes: int,
+    academico_ids: Optional[List[uuid.UUID]] = None,
+) -> Dict[date, Dict[Optional[uuid.UUID], Optional[int]]]:
+    """
+    Calcula, com uma consulta de feriados e uma de agendamentos, os horários livres
+    de um intervalo de datas para um conjunto de acadêmicos.
+
+    Retorna {data: {academico_id: bitmap de inícios livres}}; o valor é None para
+    domingos e feriados. Sem `academico_ids`, considera a agenda de todo o tenant
+    sob a chave None (mesmo comportamento de /horarios-livres sem academico_id).
+    """
+    blocks = duration_minutes // BLOCK_MINUTES
+    range_start = datetime.combine(start_date, time.min)
+    range_end = datetime.combine(end_date + timedelta(days=1), time.min)
+
+    holidays_result = await db.execute(
+        select(Feriado.data).where(
+            Feriado.tenant_id == tenant_id,
+            Feriado.data >= start_date,
+            Feriado.data <= end_date,
+        )
+    )
+    holidays = set(holidays_result.scalars().all())
+
+    appointments_query = select(Agendamento.academico_id, Agendamento.inicio, Agendamento.fim).where(
+        Agendamento.tenant_id == tenant_id,
+        Agendamento.inicio < range_end,
+        Agendamento.fim > range_start,
+        Agendamento.status.in_(BLOCKING_STATUSES),
+    )
+    if academico_ids:
+        appointments_query = appointments_query.where(Agendamento.academico_id.in_(academico_ids))
+    appointments_result = await db.execute(appointments_query)
+
+    # Agrupa os intervalos por (acadêmico, dia); agendamentos que atravessam a
+    # meia-noite entram em cada dia que tocam.
+    intervals: Dict[Tuple[Optional[uuid.UUID], date], List[Tuple[datetime, datetime]]] = {}
+    for academico_id, inicio, fim in appointments_result.all():
+        key_academico = academico_id if academico_ids else None
+        day = max(inicio.date(), start_date)
+        while day <= min(fim.date(), end_date):
+            intervals.setdefault((key_academico, day), []).append((inicio, fim))
+            day += timedelta(days=1)
+
+    keys = list(academico_ids) if academico_ids else [None]
+    grid: Dict[date, Dict[Optional[uuid.UUID], Optional[int]]] = {}
+    for day in _days(start_date, end_date):
+        if day.weekday() == 6 or day in holidays:  # Domingo ou feriado
+            grid[day] = {key: None for key in keys}
+            continue
+        grid[day] = {
+            key: free_start_mask(occupancy_mask(day, intervals.get((key, day), ())), blocks)
+            for key in keys
+        }
+    return grid
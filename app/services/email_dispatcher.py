@@ -0,0 +1,305 @@
+import asyncio
+import logging
+import smtplib
+import threading
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..crud import tenant_configs as tenant_configs_crud
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SMTPSettings:
+    host: str
+    port: int
+    user: str
+    password: str
+    starttls: bool
+
+
+@dataclass(frozen=True)
+class OutboxMessage:
+    id: uuid.UUID
+    to_email: str
+    subject: str
+    body: str
+    is_html: bool
+
+
+# Resultado do envio de uma mensagem: (id, erro ou None, erro permanente?)
+DeliveryResult = Tuple[uuid.UUID, Optional[str], bool]
+
+
+async def load_smtp_settings(db: AsyncSession, tenant_id: uuid.UUID) -> Optional[SMTPSettings]:
+    """Configurações SMTP do tenant (do cache de configurações); None se estiverem incompletas."""
+    config = await tenant_configs_crud.get_tenant_config_snapshot(db, tenant_id)
+    if not config.smtp_configured:
+        return None
+    return SMTPSettings(
+        host=config.smtp_host,
+        port=config.smtp_port,
+        user=config.smtp_user,
+        password=config.smtp_password,
+        # Mesmo comportamento do envio antigo: as duas opções usam STARTTLS.
+        starttls=config.smtp_use_ssl or config.smtp_use_tls,
+    )
+
+
+def build_message(smtp: SMTPSettings, message: OutboxMessage) -> MIMEMultipart:
+    msg = MIMEMultipart("alternative")
+    msg['From'] = smtp.user
+    msg['To'] = message.to_email
+    msg['Subject'] = message.subject
+    msg.attach(MIMEText(message.body, 'html' if message.is_html else 'plain'))
+    return msg
+
+
+def _is_permanent(error: Exception) -> bool:
+    """Respostas 5xx do servidor (destinatário inválido, mensagem recusada) não adiantam repetir."""
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False  # configuração do tenant pode ser corrigida
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+class SMTPSessionPool:
+    """
+    Mantém uma sessão SMTP autenticada por tenant entre os lotes, em vez de
+    conectar, fazer STARTTLS e login a cada e-mail. Sessões ociosas por mais de
+    `idle_timeout` são fechadas (os servidores derrubam conexões paradas).
+    Os métodos são bloqueantes e rodam em threads (asyncio.to_thread); cada
+    tenant é atendido por uma thread por vez.
+    """
+
+    def __init__(self, idle_timeout: float = 60.0, timeout: float = 30.0):
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._sessions: Dict[uuid.UUID, Tuple[smtplib.SMTP, SMTPSettings, float]] = {}
+        self._lock = threading.Lock()
+
+    def _connect(self, smtp: SMTPSettings) -> smtplib.SMTP:
+        server = smtplib.SMTP(smtp.host, smtp.port, timeout=self.timeout)
+        try:
+            if smtp.starttls:
+                server.ehlo()
+                server.starttls()
+                server.ehlo()
+            server.login(smtp.user, smtp.password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def _session(self, tenant_id: uuid.UUID, smtp: SMTPSettings) -> smtplib.SMTP:
+        with self._lock:
+            entry = self._sessions.get(tenant_id)
+        if entry is not None:
+            server, session_settings, last_used = entry
+            if session_settings == smtp and time.monotonic() - last_used < self.idle_timeout:
+                return server
+            self.close(tenant_id)
+        server = self._connect(smtp)
+        with self._lock:
+            self._sessions[tenant_id] = (server, smtp, time.monotonic())
+        return server
+
+    def _touch(self, tenant_id: uuid.UUID):
+        with self._lock:
+            entry = self._sessions.get(tenant_id)
+            if entry is not None:
+                self._sessions[tenant_id] = (entry[0], entry[1], time.monotonic())
+
+    def close(self, tenant_id: uuid.UUID):
+        with self._lock:
+            entry = self._sessions.pop(tenant_id, None)
+        if entry is not None:
+            try:
+                entry[0].quit()
+            except Exception:
+                entry[0].close()
+
+    def close_idle(self):
+        now = time.monotonic()
+        with self._lock:
+            idle = [tenant_id for tenant_id, (_, _, last_used) in self._sessions.items() if now - last_used >= self.idle_timeout]
+        for tenant_id in idle:
+            self.close(tenant_id)
+
+    def close_all(self):
+        with self._lock:
+            tenant_ids = list(self._sessions)
+        for tenant_id in tenant_ids:
+            self.close(tenant_id)
+
+    def send_batch(self, tenant_id: uuid.UUID, smtp: SMTPSettings, messages: List[OutboxMessage]) -> List[DeliveryResult]:
+        """Envia o lote pela sessão do tenant, reconectando uma vez se o servidor tiver fechado a conexão."""
+        results: List[DeliveryResult] = []
+        for index, message in enumerate(messages):
+            msg = build_message(smtp, message)
+            for attempt in (1, 2):
+                try:
+                    server = self._session(tenant_id, smtp)
+                except Exception as e:
+                    # Sem conexão/login: o resto do lote falha com o mesmo erro, sem novas tentativas agora.
+                    error = f"{e.__class__.__name__}: {e}"
+                    results.extend((pending.id, error, False) for pending in messages[index:])
+                    return results
+                try:
+                    server.send_message(msg)
+                except smtplib.SMTPServerDisconnected as e:
+                    self.close(tenant_id)
+                    if attempt == 2:
+                        results.append((message.id, f"{e.__class__.__name__}: {e}", False))
+                    continue
+                except Exception as e:
+                    if not isinstance(e, smtplib.SMTPResponseException) and not isinstance(e, smtplib.SMTPRecipientsRefused):
+                        self.close(tenant_id)  # estado da sessão desconhecido
+                    results.append((message.id, f"{e.__class__.__name__}: {e}", _is_permanent(e)))
+                else:
+                    self._touch(tenant_id)
+                    results.append((message.id, None, False))
+                break
+        return results
+
+
+class EmailDispatcher:
+    """
+    Envia os e-mails da tabela email_outbox em segundo plano.
+
+    As requisições só gravam na outbox (NotificationService.send_email); o
+    dispatcher reserva lotes com FOR UPDATE SKIP LOCKED (um por processo do
+    uvicorn), agrupa por tenant e envia cada grupo pela sessão SMTP persistente
+    do tenant. Falhas temporárias voltam para a fila com backoff exponencial.
+    """
+
+    def __init__(
+        self,
+        poll_interval: float = 5.0,
+        batch_size: int = 50,
+        max_attempts: int = 5,
+        retry_base: float = 30.0,
+        retry_max: float = 3600.0,
+        stale_after: float = 600.0,
+        idle_timeout: float = 60.0,
+        smtp_timeout: float = 30.0,
+    ):
+        self.poll_interval = poll_interval
+        self.batch_size = max(1, batch_size)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.stale_after = stale_after
+        self.pool = SMTPSessionPool(idle_timeout=idle_timeout, timeout=smtp_timeout)
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="email-dispatcher")
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await asyncio.to_thread(self.pool.close_all)
+
+    def retry_delay(self, tentativas: int) -> float:
+        return min(self.retry_base * 2 ** max(tentativas - 1, 0), self.retry_max)
+
+    async def _run(self):
+        while True:
+            try:
+                processed = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Erro no dispatcher de e-mails")
+                processed = False
+            if processed:
+                continue
+            await asyncio.to_thread(self.pool.close_idle)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _deliver(self, tenant_id: uuid.UUID, smtp: Optional[SMTPSettings], messages: List[OutboxMessage]) -> List[DeliveryResult]:
+        if smtp is None:
+            return [(message.id, f"Configurações de e-mail incompletas para o tenant {tenant_id}", True) for message in messages]
+        return await asyncio.to_thread(self.pool.send_batch, tenant_id, smtp, messages)
+
+    async def run_once(self) -> bool:
+        """Envia um lote, se houver. Retorna True se algum e-mail foi reservado."""
+        from ..db.database import AsyncSessionLocal
+        from ..crud import email_outbox as email_outbox_crud
+
+        async with AsyncSessionLocal() as db:
+            emails = await email_outbox_crud.claim_email_batch(db, self.batch_size, self.stale_after, self.max_attempts)
+            if not emails:
+                return False
+
+            tentativas = {email.id: email.tentativas for email in emails}
+            by_tenant: Dict[uuid.UUID, List[OutboxMessage]] = defaultdict(list)
+            for email in emails:
+                by_tenant[email.tenant_id].append(
+                    OutboxMessage(email.id, email.to_email, email.subject, email.body, email.is_html)
+                )
+            smtp_settings = {tenant_id: await load_smtp_settings(db, tenant_id) for tenant_id in by_tenant}
+            await db.commit()
+
+            # Tenants em paralelo: um servidor SMTP lento não atrasa os outros.
+            batches = await asyncio.gather(
+                *(self._deliver(tenant_id, smtp_settings[tenant_id], messages) for tenant_id, messages in by_tenant.items())
+            )
+
+            sent = []
+            for email_id, error, permanent in (result for batch in batches for result in batch):
+                if error is None:
+                    sent.append(email_id)
+                    continue
+                retry = not permanent and tentativas[email_id] < self.max_attempts
+                retry_in = self.retry_delay(tentativas[email_id]) if retry else None
+                logger.warning(
+                    "Falha ao enviar e-mail %s (tentativa %s/%s): %s",
+                    email_id, tentativas[email_id], self.max_attempts, error,
+                )
+                await email_outbox_crud.fail_email(db, email_id, error, retry_in)
+            await email_outbox_crud.mark_emails_sent(db, sent)
+            if sent:
+                logger.info("%s e-mail(s) enviados", len(sent))
+            return True
+
+
+email_dispatcher = EmailDispatcher(
+    poll_interval=settings.EMAIL_POLL_INTERVAL_SECONDS,
+    batch_size=settings.EMAIL_BATCH_SIZE,
+    max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+    retry_base=settings.EMAIL_RETRY_BASE_SECONDS,
+    retry_max=settings.EMAIL_RETRY_MAX_SECONDS,
+    stale_after=settings.EMAIL_STALE_SECONDS,
+    idle_timeout=settings.SMTP_IDLE_TIMEOUT_SECONDS,
+    smtp_timeout=settings.SMTP_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,141 @@
+import mimetypes
+import os
+from datetime import timezone
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Optional, Tuple
+
+from fastapi import Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
+
+CHUNK_SIZE = 64 * 1024
+
+# Arquivos deduplicados (<sha256>.<ext>) nunca mudam de conteúdo: o cliente pode guardar por 1 ano.
+# "private" porque são dados de pacientes e não devem ficar em caches compartilhados.
+CACHE_CONTROL_IMMUTABLE = "private, max-age=31536000, immutable"
+# Demais arquivos: o cliente guarda, mas revalida sempre (resposta 304 sem corpo se não mudou).
+CACHE_CONTROL_REVALIDATE = "private, no-cache"
+
+
+def _etag(checksum: Optional[str], stat_result: os.stat_result) -> str:
+    """ETag forte a partir do SHA-256 gravado; sem checksum (arquivos antigos), fraco por mtime/tamanho."""
+    if checksum:
+        return f'"{checksum}"'
+    return f'W/"{int(stat_result.st_mtime):x}-{stat_result.st_size:x}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Comparação fraca do If-None-Match (RFC 9110 13.1.2)."""
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def _not_modified_since(header: str, stat_result: os.stat_result) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return int(stat_result.st_mtime) <= since.timestamp()
+
+
+def _if_range_matches(header: str, etag: str, last_modified: str) -> bool:
+    """If-Range só vale com ETag forte idêntico ou a data exata do Last-Modified."""
+    header = header.strip()
+    if header.startswith('"'):
+        return not etag.startswith("W/") and header == etag
+    return header == last_modified
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Interpreta um Range "bytes=início-fim", "bytes=início-" ou "bytes=-sufixo".
+    Retorna (início, fim) inclusivos, None se o header deve ser ignorado (sintaxe
+    inválida ou múltiplos intervalos: responde o arquivo inteiro) e levanta
+    ValueError se o intervalo estiver fora do arquivo (416).
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep or not (first or last) or (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+    if not first:
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size:
+        raise ValueError(header)
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+async def _iter_file_range(path: Path, start: int, length: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = await run_in_threadpool(f.read, min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def file_download_response(request: Request, file_path: Path, checksum: Optional[str] = None) -> Response:
+    """
+    Resposta de download com cache HTTP para os arquivos de prontuários e documentos:
+    ETag (forte, do checksum_sha256), Last-Modified, If-None-Match/If-Modified-Since (304)
+    e Range/If-Range (206/416), para o cliente não baixar de novo PDFs e imagens que já tem.
+    """
+    file_path = Path(file_path)
+    stat_result = os.stat(file_path)
+    etag = _etag(checksum, stat_result)
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+    content_addressed = bool(checksum) and file_path.stem == checksum
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": CACHE_CONTROL_IMMUTABLE if content_addressed else CACHE_CONTROL_REVALIDATE,
+        "Accept-Ranges": "bytes",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    elif "if-modified-since" in request.headers:
+        if _not_modified_since(request.headers["if-modified-since"], stat_result):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or _if_range_matches(if_range, etag, last_modified)):
+        size = stat_result.st_size
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers=headers)
+        if byte_range is not None:
+            start, end = byte_range
+            length = end - start + 1
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            headers["Content-Length"] = str(length)
+            media_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+            return StreamingResponse(
+                _iter_file_range(file_path, start, length),
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                headers=headers,
+                media_type=media_type,
+            )
+
+    return FileResponse(file_path, headers=headers, stat_result=stat_result)
@@ -1,14 +1,35 @@
+import asyncio
+import hashlib
 import os
+from dataclasses import dataclass
 from pathlib import Path
 import shutil
+import tempfile
 from typing import Optional
 import uuid
 
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from app.core.config import settings
+from app.core.storage_allocator import FolderAllocator
+from app.crud import file_blobs as file_blobs_crud
+
+class FileTooLargeError(Exception):
+    """Upload maior que settings.MAX_UPLOAD_SIZE_BYTES."""
+
+@dataclass
+class StoredFile:
+    relative_path: str  # relativo a base_upload_dir, como nos save_*_file
+    sha256: str
+    size: int
+    deduplicated: bool = False  # True se o conteúdo já existia e nada foi gravado
 
 class FileStorageService:
     def __init__(self):
         self.base_upload_dir = Path(settings.BASE_UPLOAD_DIR)
+        self._allocators = {}
         self._ensure_base_upload_dir_exists()
 
     def _ensure_base_upload_dir_exists(self):
@@ -24,23 +45,16 @@ class FileStorageService:
     def _get_next_folder_path(self, base_path: Path, prefix: str) -> Path:
         """
         Determines the next folder path based on the 400-document limit.
-        e.g., prontuarios/0001, prontuarios/0002
+        e.g., prontuarios/prontuario_0001, prontuarios/prontuario_0002
+
+        Uses the allocation index in base_path (see core/storage_allocator) instead of
+        probing every folder from 0001, so the cost does not grow with the number of documents.
+        Blocking (file lock): async code must call it via asyncio.to_thread.
         """
-        current_folder_index = 1
-        while True:
-            folder_name = f"{prefix}{current_folder_index:04d}"
-            folder_path = base_path / folder_name
-            
-            if not folder_path.exists():
-                folder_path.mkdir(parents=True, exist_ok=True)
-                return folder_path
-            
-            # Count files in the current folder
-            file_count = len(list(folder_path.iterdir()))
-            if file_count < 400:
-                return folder_path
-            
-            current_folder_index += 1
+        allocator = self._allocators.get(prefix)
+        if allocator is None:
+            allocator = self._allocators[prefix] = FolderAllocator(prefix=prefix)
+        return allocator.allocate(base_path)
 
     def save_prontuario_file(self, clinic_name: str, file_content: bytes, file_extension: str) -> str:
         """
@@ -80,6 +94,102 @@ class FileStorageService:
         
         return str(file_path.relative_to(self.base_upload_dir))
 
+    async def _save_upload(
+        self, db: AsyncSession, clinic_dir: Path, kind: str, prefix: str, upload: UploadFile, file_extension: str
+    ) -> StoredFile:
+        """
+        Grava o upload em blocos num arquivo temporário (calculando o SHA-256 e o tamanho
+        durante a cópia) e então o registra no armazenamento deduplicado (file_blobs):
+        se a clínica já tem um arquivo com o mesmo conteúdo, o temporário é descartado e
+        o registro passa a apontar para o arquivo existente; senão, reserva a vaga na
+        pasta e faz o rename atômico. Não faz commit: a referência ao blob entra na mesma
+        transação que o registro criado pela rota.
+        Uploads acima de MAX_UPLOAD_SIZE_BYTES são interrompidos sem consumir vaga.
+        """
+        tmp_dir = self.base_upload_dir / ".tmp"
+        tmp_dir.mkdir(exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=tmp_dir, suffix=".upload")
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                while True:
+                    chunk = await upload.read(settings.UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > settings.MAX_UPLOAD_SIZE_BYTES:
+                        raise FileTooLargeError(
+                            f"Arquivo excede o tamanho máximo de {settings.MAX_UPLOAD_SIZE_BYTES} bytes."
+                        )
+                    digest.update(chunk)
+                    await run_in_threadpool(tmp_file.write, chunk)
+            sha256 = digest.hexdigest()
+            escopo = clinic_dir.name
+
+            existing = await file_blobs_crud.get_blob_by_escopo_sha256(db, escopo, sha256)
+            if existing is not None:
+                candidate = existing.caminho_arquivo
+            else:
+                base_path = clinic_dir / kind
+                base_path.mkdir(parents=True, exist_ok=True)
+                # A alocação espera um lock de arquivo (flock): fora do event loop.
+                target_folder = await asyncio.to_thread(self._get_next_folder_path, base_path, prefix)
+                file_name = f"{sha256}.{file_extension}" if file_extension else sha256
+                candidate = str((target_folder / file_name).relative_to(self.base_upload_dir))
+
+            relative_path, created = await file_blobs_crud.acquire_blob(db, escopo, sha256, candidate, size)
+            # Até o commit da rota, nenhuma remoção de blob liberado (delete_released_file)
+            # apaga o arquivo deste caminho.
+            await file_blobs_crud.lock_blob_path(db, relative_path)
+            file_path = self.base_upload_dir / relative_path
+            if created or not file_path.exists():
+                # Conteúdo novo (ou blob cujo arquivo sumiu do disco): o temporário vira o blob.
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_name, file_path)
+        finally:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+
+        return StoredFile(relative_path=relative_path, sha256=sha256, size=size, deduplicated=not created)
+
+    async def save_prontuario_upload(self, db: AsyncSession, clinic_name: str, upload: UploadFile, file_extension: str) -> StoredFile:
+        """Versão em streaming e deduplicada de save_prontuario_file para uploads."""
+        clinic_dir = self._get_clinic_dir(clinic_name)
+        return await self._save_upload(db, clinic_dir, "prontuarios", "prontuario_", upload, file_extension)
+
+    async def save_documento_upload(self, db: AsyncSession, clinic_name: str, upload: UploadFile, file_extension: str) -> StoredFile:
+        """Versão em streaming e deduplicada de save_documento_file para uploads."""
+        clinic_dir = self._get_clinic_dir(clinic_name)
+        return await self._save_upload(db, clinic_dir, "documentos", "documento_", upload, file_extension)
+
+    async def release_file(self, db: AsyncSession, relative_file_path: str) -> bool:
+        """
+        Remove a referência de um registro ao arquivo, sem commit.
+        Retorna True se o arquivo não é mais usado e deve ser apagado com
+        delete_released_file depois do commit (arquivos anteriores à deduplicação
+        sempre retornam True).
+        """
+        ultimo = await file_blobs_crud.release_blob(db, relative_file_path)
+        return ultimo is None or ultimo
+
+    async def delete_released_file(self, db: AsyncSession, relative_file_path: str) -> bool:
+        """
+        Apaga o arquivo cuja última referência foi liberada (release_file retornou True
+        e a transação já foi confirmada). Roda sob o lock do caminho que _save_upload
+        também toma: se um upload do mesmo conteúdo recriou o blob nesse meio-tempo,
+        o arquivo voltou a ser usado e fica. Faz commit (libera o lock).
+        Retorna True se o arquivo foi apagado.
+        """
+        try:
+            await file_blobs_crud.lock_blob_path(db, relative_file_path)
+            if await file_blobs_crud.get_blob_by_path(db, relative_file_path) is not None:
+                return False
+            await asyncio.to_thread(self.delete_file, relative_file_path)
+            return True
+        finally:
+            await db.commit()
+
     def delete_file(self, relative_file_path: str):
         """Deletes a file given its relative path from the base upload directory."""
         file_path = self.base_upload_dir / relative_file_path
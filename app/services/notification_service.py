@@ -1,13 +1,13 @@
 
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import logging
 import uuid
+from typing import List, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 
-from ..models.tenant_configs import TenantConfig, ConfigKey, ConfigType
+from ..models.tenant_configs import ConfigKey
+from ..models.email_outbox import EmailOutbox
+from ..crud import email_outbox as email_outbox_crud
+from ..crud import tenant_configs as tenant_configs_crud
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -17,11 +17,8 @@ class NotificationService:
         self.db = db
 
     async def _get_tenant_config(self, tenant_id: uuid.UUID, config_key: ConfigKey) -> str | None:
-        result = await self.db.execute(
-            select(TenantConfig.config_value)
-            .filter_by(tenant_id=tenant_id, config_key=config_key)
-        )
-        return result.scalars().first()
+        snapshot = await tenant_configs_crud.get_tenant_config_snapshot(self.db, tenant_id)
+        return snapshot.get(config_key)
 
     async def send_email(
         self,
@@ -30,54 +27,35 @@ class NotificationService:
         subject: str,
         body: str,
         is_html: bool = False
-    ):
-        try:
-            smtp_host = await self._get_tenant_config(tenant_id, ConfigKey.smtp_host)
-            smtp_port_str = await self._get_tenant_config(tenant_id, ConfigKey.smtp_port)
-            smtp_user = await self._get_tenant_config(tenant_id, ConfigKey.smtp_user)
-            smtp_password = await self._get_tenant_config(tenant_id, ConfigKey.smtp_password)
-            smtp_use_ssl_str = await self._get_tenant_config(tenant_id, ConfigKey.smtp_use_ssl)
-            smtp_use_tls_str = await self._get_tenant_config(tenant_id, ConfigKey.smtp_use_tls)
-
-            if not all([smtp_host, smtp_port_str, smtp_user, smtp_password]):
-                logger.warning(f"Configurações de e-mail incompletas para o tenant {tenant_id}")
-                return False
-
-            smtp_port = int(smtp_port_str)
-            smtp_use_ssl = smtp_use_ssl_str.lower() == 'true' if smtp_use_ssl_str else False
-            smtp_use_tls = smtp_use_tls_str.lower() == 'true' if smtp_use_tls_str else False
-
-            msg = MIMEMultipart("alternative")
-            msg['From'] = smtp_user
-            msg['To'] = to_email
-            msg['Subject'] = subject
-
-            if is_html:
-                msg.attach(MIMEText(body, 'html'))
-            else:
-                msg.attach(MIMEText(body, 'plain'))
+    ) -> EmailOutbox:
+        """
+        Coloca o e-mail na outbox (tabela email_outbox), sem commit e sem falar com o
+        servidor SMTP: o envio é feito pelo dispatcher (services/email_dispatcher) depois
+        que a transação do chamador for confirmada. Após o commit, chame
+        email_dispatcher.notify() para o envio começar sem esperar o polling.
+        """
+        db_email = await email_outbox_crud.enqueue_email(self.db, tenant_id, to_email, subject, body, is_html)
+        logger.info(f"E-mail para {to_email} do tenant {tenant_id} colocado na fila de envio")
+        return db_email
 
-            with smtplib.SMTP(smtp_host, smtp_port) as server:
-                if smtp_use_tls:
-                    server.starttls()
-                if smtp_use_ssl:
-                    server.ehlo()
-                    server.starttls()
-                    server.ehlo()
-                server.login(smtp_user, smtp_password)
-                server.send_message(msg)
-            logger.info(f"E-mail enviado com sucesso para {to_email} do tenant {tenant_id}")
-            return True
-        except Exception as e:
-            logger.error(f"Erro ao enviar e-mail para {to_email} do tenant {tenant_id}: {e}")
-            return False
+    async def send_email_batch(
+        self,
+        tenant_id: uuid.UUID,
+        messages: List[Tuple[str, str, str]],
+        is_html: bool = False
+    ) -> List[EmailOutbox]:
+        """Como send_email, para vários e-mails (to_email, subject, body) do tenant de uma vez."""
+        db_emails = await email_outbox_crud.enqueue_emails(self.db, tenant_id, messages, is_html)
+        logger.info(f"{len(db_emails)} e-mail(s) do tenant {tenant_id} colocados na fila de envio")
+        return db_emails
 
     async def send_sms(self, tenant_id: uuid.UUID, to_phone: str, message: str):
         # This is a placeholder for SMS integration
         # In a real application, you would integrate with an SMS API like Twilio, Nexmo, etc.
         try:
-            sms_api_key = await self._get_tenant_config(tenant_id, ConfigKey.sms_api_key)
-            sms_sender_id = await self._get_tenant_config(tenant_id, ConfigKey.sms_sender_id)
+            config = await tenant_configs_crud.get_tenant_config_snapshot(self.db, tenant_id)
+            sms_api_key = config.sms_api_key
+            sms_sender_id = config.sms_sender_id
 
             if not all([sms_api_key, sms_sender_id]):
                 logger.warning(f"Configurações de SMS incompletas para o tenant {tenant_id}")
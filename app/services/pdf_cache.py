@@ -0,0 +1,140 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from ..core.config import settings
+
+
+def html_key(html_content: str) -> str:
+    """Chave do cache: SHA-256 do HTML renderizado."""
+    return hashlib.sha256(html_content.encode("utf-8")).hexdigest()
+
+
+class PDFCache:
+    """
+    Cache em disco de PDFs endereçado pelo hash do HTML de origem.
+
+    Os arquivos ficam em `directory/<2 primeiros hex>/<hash>.pdf`. O índice LRU
+    (hash -> tamanho) é mantido em memória e reconstruído no início a partir do
+    mtime dos arquivos; cada acerto atualiza o mtime, então a ordem sobrevive a
+    reinícios. Quando o total passa de `max_bytes`, os menos usados são removidos.
+    Vários processos podem compartilhar o diretório: a gravação é atômica
+    (arquivo temporário + rename) e um arquivo removido por outro processo
+    conta apenas como miss.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._loaded = False
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory) and self.max_bytes > 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.pdf")
+
+    def _load_index(self):
+        entries = []
+        if os.path.isdir(self.directory):
+            for dirpath, _, filenames in os.walk(self.directory):
+                for filename in filenames:
+                    if not filename.endswith(".pdf"):
+                        continue
+                    try:
+                        stat = os.stat(os.path.join(dirpath, filename))
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, filename[:-4], stat.st_size))
+        entries.sort()
+        self._index = OrderedDict((key, size) for _, key, size in entries)
+        self._total_bytes = sum(self._index.values())
+        self._loaded = True
+
+    def get(self, key: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            if not self._loaded:
+                self._load_index()
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.utime(path)
+            except FileNotFoundError:
+                size = self._index.pop(key, None)
+                if size is not None:
+                    self._total_bytes -= size
+                self.misses += 1
+                return None
+            if key not in self._index:
+                # Gravado por outro processo.
+                self._index[key] = len(data)
+                self._total_bytes += len(data)
+            self._index.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: str, data: bytes):
+        if not self.enabled or len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if not self._loaded:
+                self._load_index()
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            previous = self._index.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous
+            self._index[key] = len(data)
+            self._total_bytes += len(data)
+            self.stores += 1
+            self._evict()
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._index),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+
+pdf_cache = PDFCache(settings.PDF_CACHE_DIR, settings.PDF_CACHE_MAX_BYTES)
@@ -1,8 +1,9 @@
-from xhtml2pdf import pisa
 from io import BytesIO
 
-def generate_prontuario_pdf(html_content: str) -> BytesIO:
-    pdf_file = BytesIO()
-    pisa.CreatePDF(html_content, dest=pdf_file)
+from .pdf_renderer import pdf_renderer
+
+async def generate_prontuario_pdf(html_content: str) -> BytesIO:
+    # A conversão roda no pool de processos do pdf_renderer, fora do event loop.
+    pdf_file = BytesIO(await pdf_renderer.render_html(html_content))
     pdf_file.seek(0)
-    return pdf_file
\ No newline at end of file
+    return pdf_file
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import uuid
+from typing import Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..models.pdf_jobs import PdfJob, PdfJobTipo
+
+logger = logging.getLogger(__name__)
+
+
+async def _gerar_atendimento(db: AsyncSession, job: PdfJob) -> Tuple[Optional[uuid.UUID], Optional[str]]:
+    from ..crud import agendamentos as agendamentos_crud
+
+    agendamento = await agendamentos_crud.get_agendamento(db, agendamento_id=job.referencia_id, tenant_id=job.tenant_id)
+    if agendamento is None:
+        raise LookupError(f"Agendamento {job.referencia_id} não encontrado.")
+    documento = await agendamentos_crud.gerar_pdf_atendimento(db, agendamento, job.tenant_id)
+    return documento.id, documento.caminho_arquivo
+
+
+async def _gerar_retirada_estoque(db: AsyncSession, job: PdfJob) -> Tuple[Optional[uuid.UUID], Optional[str]]:
+    from ..crud import estoque as estoque_crud
+
+    documento = await estoque_crud.gerar_comprovante_retirada(db, job.referencia_id, job.tenant_id)
+    return documento.id, documento.caminho_arquivo
+
+
+# Geradores por tipo de job: recebem a sessão e o job, devolvem (documento_id, caminho do arquivo).
+JOB_HANDLERS = {
+    PdfJobTipo.atendimento: _gerar_atendimento,
+    PdfJobTipo.retirada_estoque: _gerar_retirada_estoque,
+}
+
+
+class PdfJobWorker:
+    """
+    Worker em processo que consome a tabela pdf_jobs.
+
+    Cada processo do uvicorn roda um worker; a reserva dos jobs usa
+    FOR UPDATE SKIP LOCKED, então vários workers podem consumir a mesma fila.
+    Quando um job é enfileirado neste processo, notify() acorda o worker na hora;
+    jobs criados por outros processos são vistos no próximo ciclo de polling.
+    """
+
+    def __init__(self, poll_interval: float = 2.0, max_attempts: int = 3, stale_after: float = 600.0):
+        self.poll_interval = poll_interval
+        self.max_attempts = max(1, max_attempts)
+        self.stale_after = stale_after
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="pdf-job-worker")
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        while True:
+            try:
+                processed = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Erro no worker de jobs de PDF")
+                processed = False
+            if processed:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_once(self) -> bool:
+        """Processa um job, se houver. Retorna True se algum job foi reservado."""
+        from ..db.database import AsyncSessionLocal
+        from ..crud import pdf_jobs as pdf_jobs_crud
+
+        async with AsyncSessionLocal() as db:
+            job = await pdf_jobs_crud.claim_next_pdf_job(db, self.stale_after, self.max_attempts)
+            if job is None:
+                return False
+
+            # O rollback em caso de erro expira o objeto; guarda o que será usado depois.
+            job_id, tentativas = job.id, job.tentativas
+            try:
+                documento_id, arquivo_path = await JOB_HANDLERS[job.tipo](db, job)
+            except Exception as e:
+                await db.rollback()
+                retry = tentativas < self.max_attempts
+                logger.warning(
+                    "Falha no job de PDF %s (tentativa %s/%s): %s",
+                    job_id, tentativas, self.max_attempts, e,
+                )
+                await pdf_jobs_crud.fail_pdf_job(db, job_id, str(e) or e.__class__.__name__, retry=retry)
+                return True
+
+            await pdf_jobs_crud.finish_pdf_job(db, job_id, documento_id, arquivo_path)
+            return True
+
+
+pdf_job_worker = PdfJobWorker(
+    poll_interval=settings.PDF_JOB_POLL_INTERVAL_SECONDS,
+    max_attempts=settings.PDF_JOB_MAX_ATTEMPTS,
+    stale_after=settings.PDF_JOB_STALE_SECONDS,
+)
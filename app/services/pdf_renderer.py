@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import multiprocessing
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Optional
+
+from ..core.config import settings
+from .pdf_cache import html_key, pdf_cache
+from .template_registry import template_registry
+
+logger = logging.getLogger(__name__)
+
+
+class PDFRenderError(Exception):
+    """Falha ao gerar um PDF (erro do xhtml2pdf, timeout ou pool indisponível)."""
+
+
+class PDFRenderQueueFull(PDFRenderError):
+    """Há mais renderizações pendentes do que PDF_RENDER_MAX_PENDING."""
+
+
+def _html_to_pdf(html_content: str) -> bytes:
+    # Executado no processo do pool: importa o xhtml2pdf apenas nos workers.
+    from xhtml2pdf import pisa
+
+    output = BytesIO()
+    result = pisa.CreatePDF(html_content, dest=output)
+    if result.err:
+        raise RuntimeError(f"xhtml2pdf retornou {result.err} erro(s)")
+    return output.getvalue()
+
+
+class PDFRenderer:
+    """
+    Renderização de PDFs (templates do template_registry + xhtml2pdf) em um pool de processos.
+
+    O xhtml2pdf é CPU-bound e não libera o GIL, então roda fora do processo do
+    uvicorn. O número de jobs pendentes (em execução + aguardando) é limitado:
+    acima do limite a chamada falha imediatamente com PDFRenderQueueFull em vez
+    de acumular trabalho. Um job que excede o timeout derruba o pool (não há
+    como interromper um worker travado de outra forma); jobs em andamento nesse
+    momento também falham e o próximo render cria um pool novo.
+    Antes de converter, o HTML é procurado no pdf_cache pelo seu hash.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 16, timeout: float = 60.0):
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._timeouts = 0
+        self._rejected = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: os workers não herdam o event loop nem as conexões do processo pai.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def _reset_pool(self):
+        pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        # ProcessPoolExecutor não expõe como cancelar um job em execução; encerra os processos.
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _submit(self, func, *args) -> bytes:
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise PDFRenderQueueFull("Fila de geração de PDF cheia, tente novamente mais tarde.")
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._get_pool(), func, *args)
+            pdf = await asyncio.wait_for(future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            self._reset_pool()
+            raise PDFRenderError(f"Geração de PDF excedeu {self.timeout:g}s.")
+        except BrokenProcessPool as e:
+            self._failed += 1
+            self._reset_pool()
+            raise PDFRenderError(f"Pool de geração de PDF indisponível: {e}")
+        except Exception as e:
+            self._failed += 1
+            raise PDFRenderError(str(e)) from e
+        finally:
+            self._pending -= 1
+        self._completed += 1
+        return pdf
+
+    async def render(self, template: str, context: dict, tenant_id: Optional[uuid.UUID] = None) -> bytes:
+        """
+        Renderiza o template `template` do template_registry (com a sobrescrita do
+        tenant, se houver) e devolve os bytes do PDF.
+        O HTML é gerado neste processo (templates já compilados); só a conversão vai para o pool.
+        """
+        try:
+            html_content = template_registry.render(template, context, tenant_id=tenant_id)
+        except Exception as e:
+            raise PDFRenderError(f"Erro ao renderizar o template {template}: {e}") from e
+        return await self.render_html(html_content)
+
+    async def render_html(self, html_content: str) -> bytes:
+        """
+        Converte HTML já renderizado em PDF. HTML idêntico a um já convertido
+        devolve os bytes do pdf_cache sem passar pelo xhtml2pdf.
+        """
+        key = html_key(html_content)
+        # Leitura/gravação em disco (e a carga inicial do índice) fora do event loop.
+        cached = await asyncio.to_thread(pdf_cache.get, key)
+        if cached is not None:
+            return cached
+        pdf = await self._submit(_html_to_pdf, html_content)
+        try:
+            await asyncio.to_thread(pdf_cache.put, key, pdf)
+        except OSError as e:
+            logger.warning("Falha ao gravar PDF no cache: %s", e)
+        return pdf
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "timeout_seconds": self.timeout,
+            "completed": self._completed,
+            "failed": self._failed,
+            "timeouts": self._timeouts,
+            "rejected": self._rejected,
+            "cache": pdf_cache.stats(),
+        }
+
+    def shutdown(self):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+pdf_renderer = PDFRenderer(
+    workers=settings.PDF_RENDER_WORKERS,
+    max_pending=settings.PDF_RENDER_MAX_PENDING,
+    timeout=settings.PDF_RENDER_TIMEOUT_SECONDS,
+)
+
+
+async def render(template: str, context: dict, tenant_id: Optional[uuid.UUID] = None) -> bytes:
+    return await pdf_renderer.render(template, context, tenant_id=tenant_id)
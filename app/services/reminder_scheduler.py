@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from .email_dispatcher import email_dispatcher
+
+logger = logging.getLogger(__name__)
+
+
+def render_lembrete(row) -> Tuple[str, str]:
+    """Assunto e corpo do lembrete de um agendamento (linha de reservar_lembretes)."""
+    servico = row.servico_nome or "atendimento"
+    quando = row.inicio.strftime('%d/%m/%Y %H:%M')
+    subject = f"Lembrete de Agendamento: {servico} em {quando}"
+    body = f"""Olá {row.paciente_nome},
+
+Este é um lembrete do seu agendamento para {servico} em {quando}.
+
+Atenciosamente,
+Sua Clínica"""
+    return subject, body
+
+
+class ReminderScheduler:
+    """
+    Agendador de lembretes de agendamentos.
+
+    A cada `interval` segundos reserva, numa consulta para todos os tenants, os
+    agendamentos 'agendado' das próximas `horizon_hours` horas ainda sem lembrete
+    (crud/agendamentos.reservar_lembretes), agrupa por tenant e enfileira os e-mails
+    em lote na outbox pelo NotificationService. Marcador e e-mails são gravados na
+    mesma transação, então ninguém é avisado duas vezes, mesmo com o agendador
+    rodando em vários processos ou pelo script app/scripts/send_reminders.py.
+    """
+
+    def __init__(self, interval: float = 300.0, horizon_hours: float = 24.0, batch_size: int = 200):
+        self.interval = interval
+        self.horizon_hours = horizon_hours
+        self.batch_size = max(1, batch_size)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="reminder-scheduler")
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Erro no agendador de lembretes")
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> int:
+        """Enfileira os lembretes pendentes, lote a lote. Retorna quantos e-mails foram enfileirados."""
+        total = 0
+        while True:
+            reservados, enfileirados = await self._run_batch()
+            total += enfileirados
+            if reservados < self.batch_size:
+                break
+        if total:
+            logger.info("%s lembrete(s) de agendamento enfileirados", total)
+        return total
+
+    async def _run_batch(self) -> Tuple[int, int]:
+        from ..db.database import AsyncSessionLocal
+        from ..crud import agendamentos as agendamentos_crud
+        from .notification_service import NotificationService
+
+        async with AsyncSessionLocal() as db:
+            inicio_ate = datetime.now() + timedelta(hours=self.horizon_hours)
+            rows = await agendamentos_crud.reservar_lembretes(db, inicio_ate, self.batch_size)
+            if not rows:
+                return 0, 0
+
+            # Pacientes sem e-mail também ficam marcados, para não serem selecionados de novo.
+            by_tenant: Dict[uuid.UUID, List[Tuple[str, str, str]]] = defaultdict(list)
+            for row in rows:
+                if row.paciente_email:
+                    by_tenant[row.tenant_id].append((row.paciente_email, *render_lembrete(row)))
+
+            notification_service = NotificationService(db)
+            for tenant_id, messages in by_tenant.items():
+                await notification_service.send_email_batch(tenant_id, messages)
+            await db.commit()
+
+        enfileirados = sum(len(messages) for messages in by_tenant.values())
+        if enfileirados:
+            email_dispatcher.notify()
+        return len(rows), enfileirados
+
+
+reminder_scheduler = ReminderScheduler(
+    interval=settings.REMINDER_INTERVAL_SECONDS,
+    horizon_hours=settings.REMINDER_HORIZON_HOURS,
+    batch_size=settings.REMINDER_BATCH_SIZE,
+)
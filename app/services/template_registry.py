@@ -0,0 +1,115 @@
+import os
+import uuid
+from typing import Dict, Optional, Tuple, Union
+
+import jinja2
+
+from ..core.config import settings
+
+# Templates padrão, versionados junto com o código (app/templates).
+DEFAULT_TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+
+# Nomes dos templates de PDF usados pelo sistema.
+ATENDIMENTO_TEMPLATE = "pdf/atendimento.html"
+RETIRADA_ESTOQUE_TEMPLATE = "pdf/retirada_estoque.html"
+TRATAMENTO_TEMPLATE = "pdf/tratamento.html"
+
+_DEFAULT_PREFIX = "default"
+_TENANT_PREFIX = "tenant"
+
+
+class TemplateRegistry:
+    """
+    Registro de templates Jinja2 compilados uma única vez.
+
+    Os templates padrão ficam em `templates_dir`; um tenant pode sobrescrever
+    qualquer um deles com um arquivo de mesmo nome em
+    `overrides_dir/<tenant_id>/<nome>`. load() compila todos os arquivos
+    (usando o cache de bytecode em disco, compartilhado entre processos) e a
+    renderização só faz buscas em dicionário, sem tocar no sistema de arquivos.
+    Templates adicionados depois do load() só são vistos após reload().
+    """
+
+    def __init__(self, templates_dir: str, overrides_dir: Optional[str] = None, bytecode_cache_dir: Optional[str] = None):
+        self.templates_dir = templates_dir
+        self.overrides_dir = overrides_dir
+        bytecode_cache = None
+        if bytecode_cache_dir:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+            bytecode_cache = jinja2.FileSystemBytecodeCache(bytecode_cache_dir)
+
+        loaders = {_DEFAULT_PREFIX: jinja2.FileSystemLoader(templates_dir)}
+        if overrides_dir:
+            loaders[_TENANT_PREFIX] = jinja2.FileSystemLoader(overrides_dir)
+        self.env = jinja2.Environment(
+            loader=jinja2.PrefixLoader(loaders),
+            bytecode_cache=bytecode_cache,
+            autoescape=jinja2.select_autoescape(["html"]),
+            auto_reload=False,
+            cache_size=-1,
+        )
+        self._templates: Dict[str, jinja2.Template] = {}
+        self._overrides: Dict[Tuple[str, str], jinja2.Template] = {}
+        self._loaded = False
+
+    def load(self):
+        templates: Dict[str, jinja2.Template] = {}
+        for name in self._list_files(self.templates_dir):
+            templates[name] = self.env.get_template(f"{_DEFAULT_PREFIX}/{name}")
+
+        overrides: Dict[Tuple[str, str], jinja2.Template] = {}
+        if self.overrides_dir and os.path.isdir(self.overrides_dir):
+            for tenant_dir in sorted(os.listdir(self.overrides_dir)):
+                tenant_path = os.path.join(self.overrides_dir, tenant_dir)
+                if not os.path.isdir(tenant_path):
+                    continue
+                for name in self._list_files(tenant_path):
+                    overrides[(tenant_dir, name)] = self.env.get_template(f"{_TENANT_PREFIX}/{tenant_dir}/{name}")
+
+        self._templates, self._overrides = templates, overrides
+        self._loaded = True
+
+    def reload(self):
+        if self.env.cache is not None:
+            self.env.cache.clear()
+        self.load()
+
+    @staticmethod
+    def _list_files(root: str):
+        if not os.path.isdir(root):
+            return []
+        names = []
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith((".html", ".txt")):
+                    names.append(os.path.relpath(os.path.join(dirpath, filename), root).replace(os.sep, "/"))
+        return sorted(names)
+
+    def get(self, name: str, tenant_id: Union[uuid.UUID, str, None] = None) -> jinja2.Template:
+        """Template `name`, com a versão do tenant quando houver."""
+        if not self._loaded:
+            self.load()
+        if tenant_id is not None:
+            override = self._overrides.get((str(tenant_id), name))
+            if override is not None:
+                return override
+        try:
+            return self._templates[name]
+        except KeyError:
+            raise jinja2.TemplateNotFound(name)
+
+    def render(self, name: str, context: dict, tenant_id: Union[uuid.UUID, str, None] = None) -> str:
+        return self.get(name, tenant_id).render(**context)
+
+    def stats(self) -> dict:
+        return {
+            "templates": sorted(self._templates),
+            "tenant_overrides": sorted(f"{tenant}/{name}" for tenant, name in self._overrides),
+        }
+
+
+template_registry = TemplateRegistry(
+    settings.TEMPLATES_DIR or DEFAULT_TEMPLATES_DIR,
+    overrides_dir=settings.TEMPLATE_OVERRIDES_DIR,
+    bytecode_cache_dir=settings.TEMPLATE_BYTECODE_CACHE_DIR,
+)
@@ -0,0 +1,126 @@
+"""
+Configuração dos testes automatizados (pytest).
+
+Os testes que usam banco precisam de um PostgreSQL descartável, com a extensão
+btree_gist disponível, indicado em TEST_DATABASE_URL:
+
+    TEST_DATABASE_URL=postgresql+asyncpg://postgres@localhost/clinica_test python -m pytest tests
+
+O schema public desse banco é apagado e recriado a cada execução. Sem a variável
+esses testes são ignorados; DATABASE_URL nunca é usada pelos testes. Os uploads
+vão para um diretório temporário.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import uuid
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+# Definidas antes de importar app.*: as variáveis de ambiente têm precedência sobre o .env.
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL or "postgresql+asyncpg://localhost/clinica_test_indisponivel"
+os.environ.setdefault("SECRET_KEY", "chave-de-teste")
+os.environ["BASE_UPLOAD_DIR"] = tempfile.mkdtemp(prefix="clinica-uploads-")
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.dialects.postgresql import ENUM  # noqa: E402
+
+from app.db.base_class import Base  # noqa: E402
+from app.db.database import AsyncSessionLocal, engine  # noqa: E402
+from app.core.user_cache import principal_cache  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+import app.models as models  # noqa: E402,F401  (registra todas as tabelas em Base.metadata)
+from app.models.roles import UserRole  # noqa: E402
+
+
+def run_async(coro):
+    """Executa a corrotina num loop novo e devolve as conexões do pool antes de fechá-lo."""
+    async def _main():
+        try:
+            return await coro
+        finally:
+            await engine.dispose()
+    return asyncio.run(_main())
+
+
+async def _recreate_schema():
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP SCHEMA IF EXISTS public CASCADE"))
+        await conn.execute(text("CREATE SCHEMA public"))
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+        enums = {
+            column.type.name: column.type
+            for table in Base.metadata.tables.values()
+            for column in table.columns
+            if isinstance(column.type, ENUM)
+        }
+        for enum_type in enums.values():
+            await conn.run_sync(lambda sync_conn, t=enum_type: ENUM(*t.enums, name=t.name).create(sync_conn, checkfirst=True))
+        await conn.run_sync(Base.metadata.create_all)
+
+
+@pytest.fixture(scope="session")
+def database():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL não definida")
+    run_async(_recreate_schema())
+    return AsyncSessionLocal
+
+
+@pytest.fixture(autouse=True)
+def _clear_principal_cache():
+    principal_cache.clear()
+    yield
+    principal_cache.clear()
+
+
+async def _seed_clinic():
+    suffix = uuid.uuid4().hex[:12]
+    async with AsyncSessionLocal() as db:
+        tenant = models.Tenant(nome=f"Clínica {suffix}", cnpj=suffix)
+        db.add(tenant)
+        await db.flush()
+        users = {}
+        for role in (UserRole.recepcao, UserRole.academico):
+            user = models.SystemUser(
+                nome=f"{role.value} {suffix}",
+                email=f"{role.value}.{suffix}@example.com",
+                username=f"{role.value}.{suffix}",
+                role=role,
+                default_tenant_id=tenant.id,
+            )
+            db.add(user)
+            users[role] = user
+        paciente = models.Paciente(
+            tenant_id=tenant.id,
+            client_code=suffix,
+            nome=f"Paciente {suffix}",
+            data_nascimento=date(1990, 1, 1),
+            genero="F",
+        )
+        db.add(paciente)
+        await db.commit()
+        return SimpleNamespace(
+            tenant_id=tenant.id,
+            recepcao=users[UserRole.recepcao],
+            academico=users[UserRole.academico],
+            paciente_id=paciente.id,
+        )
+
+
+@pytest.fixture
+def clinic(database):
+    """Um tenant novo com um usuário da recepção, um acadêmico e um paciente (sem e-mail)."""
+    return run_async(_seed_clinic())
+
+
+def auth_headers(user) -> dict:
+    token = create_access_token({"sub": user.username, "tenant_id": str(user.default_tenant_id)})
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,71 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+
+from app.crud import agendamentos as agendamentos_crud
+from app.db.database import AsyncSessionLocal
+from app.models.agendamentos import Agendamento
+from app.schemas.agendamentos import AgendamentoCreate, AgendamentoUpdate
+from conftest import run_async
+
+
+def test_parallel_overlapping_bookings_one_succeeds_one_conflicts(clinic):
+    inicio = datetime.now().replace(microsecond=0) + timedelta(days=5)
+    pedidos = [
+        AgendamentoCreate(
+            paciente_id=clinic.paciente_id,
+            academico_id=clinic.academico.id,
+            inicio=inicio + timedelta(minutes=deslocamento),
+            fim=inicio + timedelta(minutes=deslocamento + 60),
+        )
+        for deslocamento in (0, 30)
+    ]
+
+    async def reservar(pedido):
+        # Sessões separadas, como duas requisições simultâneas.
+        async with AsyncSessionLocal() as db:
+            return await agendamentos_crud.create_agendamento(db=db, agendamento=pedido, tenant_id=clinic.tenant_id)
+
+    async def em_paralelo():
+        return await asyncio.gather(*(reservar(p) for p in pedidos), return_exceptions=True)
+
+    resultados = run_async(em_paralelo())
+
+    criados = [r for r in resultados if not isinstance(r, BaseException)]
+    conflitos = [r for r in resultados if isinstance(r, HTTPException)]
+    assert len(criados) == 1 and len(conflitos) == 1, resultados
+    assert conflitos[0].status_code == 409
+    causa = conflitos[0].__context__
+    assert isinstance(causa, IntegrityError)
+    assert getattr(causa.orig, "sqlstate", None) == "23P01"
+
+
+def test_partial_update_moving_inicio_past_fim_is_rejected(clinic):
+    inicio = datetime.now().replace(microsecond=0) + timedelta(days=6)
+    pedido = AgendamentoCreate(
+        paciente_id=clinic.paciente_id,
+        academico_id=clinic.academico.id,
+        inicio=inicio,
+        fim=inicio + timedelta(hours=1),
+    )
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            agendamento = await agendamentos_crud.create_agendamento(db=db, agendamento=pedido, tenant_id=clinic.tenant_id)
+        async with AsyncSessionLocal() as db:
+            # Só `inicio` no corpo: o validador de `fim` do schema não roda.
+            with pytest.raises(HTTPException) as erro:
+                await agendamentos_crud.update_agendamento(
+                    db, agendamento.id, AgendamentoUpdate(inicio=inicio + timedelta(hours=2)), clinic.tenant_id
+                )
+        async with AsyncSessionLocal() as db:
+            salvo = await db.get(Agendamento, agendamento.id)
+        return erro.value, salvo
+
+    erro, salvo = run_async(scenario())
+
+    assert erro.status_code == 422
+    assert (salvo.inicio, salvo.fim) == (inicio, inicio + timedelta(hours=1))
@@ -0,0 +1,45 @@
+from decimal import Decimal
+
+import pytest
+
+from app.crud import estoque as estoque_crud
+from app.db.database import AsyncSessionLocal
+from app.models.estoque import Estoque
+from app.models.movimentacoes_estoque import MovimentacaoEstoque, TipoMovimentacao
+from conftest import run_async
+
+
+def test_comprovante_pdf_is_removed_when_document_insert_fails(clinic, tmp_path, monkeypatch):
+    # O comprovante é gravado em storage/ relativo ao diretório de trabalho.
+    monkeypatch.chdir(tmp_path)
+
+    async def render_pdf(template, context, tenant_id=None):
+        return b"%PDF-1.4 comprovante"
+
+    async def create_documento_paciente(db, documento):
+        raise RuntimeError("falha no INSERT")
+
+    monkeypatch.setattr(estoque_crud, "render_pdf", render_pdf)
+    monkeypatch.setattr(estoque_crud, "create_documento_paciente", create_documento_paciente)
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            produto = Estoque(tenant_id=clinic.tenant_id, nome="Luva", quantidade=Decimal("10"), unidade="un")
+            db.add(produto)
+            await db.flush()
+            movimentacao = MovimentacaoEstoque(
+                tenant_id=clinic.tenant_id,
+                produto_id=produto.id,
+                paciente_id=clinic.paciente_id,
+                tipo=TipoMovimentacao.saida,
+                quantidade=Decimal("1"),
+            )
+            db.add(movimentacao)
+            await db.commit()
+
+            with pytest.raises(RuntimeError):
+                await estoque_crud.gerar_comprovante_retirada(db, movimentacao.id, clinic.tenant_id)
+
+    run_async(scenario())
+
+    assert [p for p in (tmp_path / "storage").rglob("*") if p.is_file()] == []
@@ -0,0 +1,78 @@
+import uuid
+from datetime import datetime, timedelta
+
+from app.crud import email_outbox as email_outbox_crud, pdf_jobs as pdf_jobs_crud
+from app.db.database import AsyncSessionLocal
+from app.models.email_outbox import EmailOutbox, EmailOutboxStatus
+from app.models.pdf_jobs import PdfJob, PdfJobStatus, PdfJobTipo
+from conftest import run_async
+
+MAX_ATTEMPTS = 3
+STALE_SECONDS = 600
+
+
+def test_stale_pdf_job_is_not_reclaimed_after_max_attempts(clinic):
+    abandonado_ha = datetime.now() - timedelta(hours=1)
+    # Os jobs do teste ficam à frente da fila (mais antigos que qualquer outro), o
+    # esgotado primeiro: uma única reserva tem de pular o esgotado e pegar o
+    # retomável, sem tocar nos jobs de outros testes.
+    criado_em = datetime(2000, 1, 1)
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            esgotado, retomavel = (
+                PdfJob(
+                    tenant_id=clinic.tenant_id,
+                    tipo=PdfJobTipo.atendimento,
+                    referencia_id=uuid.uuid4(),
+                    status=PdfJobStatus.processando,
+                    tentativas=tentativas,
+                    started_at=abandonado_ha,
+                    created_at=criado_em + timedelta(seconds=posicao),
+                )
+                for posicao, tentativas in enumerate((MAX_ATTEMPTS, MAX_ATTEMPTS - 1))
+            )
+            db.add_all([esgotado, retomavel])
+            await db.commit()
+
+            job = await pdf_jobs_crud.claim_next_pdf_job(db, STALE_SECONDS, MAX_ATTEMPTS)
+
+            assert job is not None and job.id == retomavel.id
+            await db.refresh(esgotado)
+            assert esgotado.status == PdfJobStatus.erro
+            assert esgotado.finished_at is not None
+
+    run_async(scenario())
+
+
+def test_stale_email_is_not_reclaimed_after_max_attempts(clinic):
+    abandonado_ha = datetime.now() - timedelta(hours=1)
+    # Mesma ideia do teste de PDF: os e-mails do teste ficam à frente da fila, o
+    # esgotado primeiro, e uma única reserva de um e-mail pega o retomável.
+    tentativa_em = datetime(2000, 1, 1)
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            esgotado, retomavel = (
+                EmailOutbox(
+                    tenant_id=clinic.tenant_id,
+                    to_email="paciente@example.com",
+                    subject="Lembrete",
+                    body="Olá",
+                    status=EmailOutboxStatus.enviando,
+                    tentativas=tentativas,
+                    started_at=abandonado_ha,
+                    proxima_tentativa_em=tentativa_em + timedelta(seconds=posicao),
+                )
+                for posicao, tentativas in enumerate((MAX_ATTEMPTS, MAX_ATTEMPTS - 1))
+            )
+            db.add_all([esgotado, retomavel])
+            await db.commit()
+
+            emails = await email_outbox_crud.claim_email_batch(db, 1, STALE_SECONDS, MAX_ATTEMPTS)
+
+            assert [email.id for email in emails] == [retomavel.id]
+            await db.refresh(esgotado)
+            assert esgotado.status == EmailOutboxStatus.erro
+
+    run_async(scenario())
@@ -0,0 +1,77 @@
+import asyncio
+import io
+import uuid
+
+from fastapi import UploadFile
+
+from app.crud import file_blobs as file_blobs_crud, prontuarios as prontuarios_crud
+from app.db.database import AsyncSessionLocal
+from app.schemas.prontuario import ProntuarioCreate, ProntuarioUpdate
+from app.services.file_storage_service import file_storage_service
+from conftest import run_async
+
+
+def _upload(data: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename="arquivo.pdf")
+
+
+def test_released_file_survives_concurrent_reupload(clinic):
+    """
+    A última referência é liberada e, antes de o arquivo ser apagado, outro upload
+    do mesmo conteúdo recria o blob no mesmo caminho: o arquivo novo não pode sumir.
+    """
+    clinica = f"clinica-{uuid.uuid4().hex[:8]}"
+    conteudo = uuid.uuid4().bytes * 64
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            stored = await file_storage_service.save_prontuario_upload(db, clinica, _upload(conteudo), "pdf")
+            await db.commit()
+            assert await file_storage_service.release_file(db, stored.relative_path)
+            await db.commit()
+
+        async with AsyncSessionLocal() as db_upload, AsyncSessionLocal() as db_delete:
+            reenviado = await file_storage_service.save_prontuario_upload(db_upload, clinica, _upload(conteudo), "pdf")
+            assert reenviado.relative_path == stored.relative_path
+
+            remocao = asyncio.create_task(file_storage_service.delete_released_file(db_delete, stored.relative_path))
+            await asyncio.sleep(0.2)
+            assert not remocao.done()  # espera o lock do caminho, mantido até o commit do upload
+            await db_upload.commit()
+            assert await remocao is False
+
+        assert (file_storage_service.base_upload_dir / stored.relative_path).read_bytes() == conteudo
+
+    run_async(scenario())
+
+
+def test_update_moves_blob_reference_and_frees_old_file(clinic):
+    clinica = f"clinica-{uuid.uuid4().hex[:8]}"
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            antigo = await file_storage_service.save_prontuario_upload(db, clinica, _upload(b"antigo" * 100), "pdf")
+            novo = await file_storage_service.save_prontuario_upload(db, clinica, _upload(b"novo" * 100), "pdf")
+            db_prontuario = await prontuarios_crud.create_prontuario(db, ProntuarioCreate(
+                paciente_id=clinic.paciente_id,
+                conteudo="Evolução",
+                caminho_arquivo=antigo.relative_path,
+                checksum_sha256=antigo.sha256,
+                tamanho_bytes=antigo.size,
+            ))
+
+            atualizado, liberado = await prontuarios_crud.update_prontuario(db, db_prontuario.id, ProntuarioUpdate(
+                paciente_id=clinic.paciente_id,
+                conteudo="Evolução",
+                caminho_arquivo=novo.relative_path,
+            ))
+            assert liberado == antigo.relative_path
+            assert atualizado.checksum_sha256 == novo.sha256
+            assert atualizado.tamanho_bytes == novo.size
+            assert await file_blobs_crud.get_blob_by_path(db, antigo.relative_path) is None
+            assert (await file_blobs_crud.get_blob_by_path(db, novo.relative_path)).refcount == 2
+
+            assert await file_storage_service.delete_released_file(db, liberado)
+            assert not (file_storage_service.base_upload_dir / antigo.relative_path).exists()
+
+    run_async(scenario())
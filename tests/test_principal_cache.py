@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+
+import httpx
+
+from app.main import app
+from conftest import auth_headers, run_async
+
+
+def _agendamento(clinic, inicio):
+    return {
+        "paciente_id": str(clinic.paciente_id),
+        "academico_id": str(clinic.academico.id),
+        "inicio": inicio.isoformat(),
+        "fim": (inicio + timedelta(minutes=30)).isoformat(),
+    }
+
+
+def test_cached_user_survives_rollback_in_previous_request(clinic):
+    """
+    A requisição que coloca o usuário no cache termina em 409 (rollback da sessão
+    pela restrição de sobreposição); a próxima, atendida pelo cache, não pode falhar.
+    """
+    headers = auth_headers(clinic.recepcao)
+    inicio = datetime.now().replace(microsecond=0) + timedelta(days=3)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # Outro usuário cria o horário, assim o conflito é a primeira requisição da recepção.
+            first = await client.post("/agendamentos/", json=_agendamento(clinic, inicio), headers=auth_headers(clinic.academico))
+            assert first.status_code == 201, first.text
+            conflict = await client.post("/agendamentos/", json=_agendamento(clinic, inicio), headers=headers)
+            assert conflict.status_code == 409, conflict.text
+
+            me = await client.get("/users/me", headers=headers)
+            assert me.status_code == 200, me.text
+            assert me.json()["username"] == clinic.recepcao.username
+            created = await client.post("/agendamentos/", json=_agendamento(clinic, inicio + timedelta(hours=2)), headers=headers)
+            assert created.status_code == 201, created.text
+
+    run_async(scenario())
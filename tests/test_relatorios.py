@@ -0,0 +1,95 @@
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from sqlalchemy import event
+
+from app.crud import atendimentos_diarios as atendimentos_diarios_crud, relatorios as relatorios_crud
+from app.db.database import AsyncSessionLocal, engine
+from app.models.agendamentos import Agendamento, AppointmentStatus
+from app.models.servicos import Servico
+from app.models.tratamento_servicos import TratamentoServico
+from app.models.tratamentos import Tratamento
+from conftest import run_async
+
+
+@contextmanager
+def count_statements():
+    """Conta as instruções SQL enviadas ao banco dentro do bloco."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_custos_tratamento_uses_a_single_statement(clinic):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            limpeza = Servico(tenant_id=clinic.tenant_id, nome="Limpeza", valor=Decimal("80.00"))
+            restauracao = Servico(tenant_id=clinic.tenant_id, nome="Restauração", valor=Decimal("150.00"))
+            db.add_all([limpeza, restauracao])
+            tratamentos = [
+                Tratamento(tenant_id=clinic.tenant_id, paciente_id=clinic.paciente_id, nome=f"Tratamento {i}")
+                for i in range(3)
+            ]
+            db.add_all(tratamentos)
+            await db.flush()
+            db.add_all([
+                TratamentoServico(tenant_id=clinic.tenant_id, tratamento_id=tratamentos[0].id, servico_id=limpeza.id, quantidade=2),
+                TratamentoServico(tenant_id=clinic.tenant_id, tratamento_id=tratamentos[0].id, servico_id=restauracao.id, quantidade=1),
+                TratamentoServico(tenant_id=clinic.tenant_id, tratamento_id=tratamentos[1].id, servico_id=restauracao.id, quantidade=None),
+            ])
+            await db.commit()
+
+        inicio, fim = datetime.now() - timedelta(days=1), datetime.now() + timedelta(days=1)
+        async with AsyncSessionLocal() as db:
+            with count_statements() as statements:
+                relatorio = await relatorios_crud.get_custos_tratamento_por_periodo(db, clinic.tenant_id, inicio, fim)
+
+        assert len(statements) == 1, statements
+        custos = {item.nome_tratamento: item.custo_total_tratamento for item in relatorio.relatorio}
+        assert custos == {"Tratamento 0": 310.0, "Tratamento 1": 150.0, "Tratamento 2": 0.0}
+        assert relatorio.total_geral_custos == 460.0
+
+    run_async(scenario())
+
+
+def test_horas_atendimento_respects_end_boundary_on_closed_days(clinic):
+    # Período de dias já fechados terminando à meia-noite: o atendimento que vira
+    # a noite termina depois de end_date e não entra, como na leitura direta.
+    fim_periodo = datetime.combine(date.today() - timedelta(days=3), time.min)
+    inicio_periodo = fim_periodo - timedelta(days=3)
+
+    def agendamento(inicio, duracao):
+        return Agendamento(
+            tenant_id=clinic.tenant_id,
+            paciente_id=clinic.paciente_id,
+            academico_id=clinic.academico.id,
+            inicio=inicio,
+            fim=inicio + duracao,
+            status=AppointmentStatus.concluido,
+        )
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            db.add_all([
+                agendamento(inicio_periodo + timedelta(days=1, hours=10), timedelta(hours=1)),
+                agendamento(fim_periodo - timedelta(hours=14), timedelta(hours=1)),
+                agendamento(fim_periodo - timedelta(hours=1), timedelta(minutes=90)),
+            ])
+            await db.flush()
+            await atendimentos_diarios_crud.contabilizar_agendamentos(db, Agendamento.tenant_id == clinic.tenant_id)
+            await db.commit()
+
+        async with AsyncSessionLocal() as db:
+            return await relatorios_crud.get_horas_atendimento_academico(db, clinic.tenant_id, inicio_periodo, fim_periodo)
+
+    relatorio = run_async(scenario())
+
+    assert [(item.profissional_id, item.total_horas) for item in relatorio.relatorio] == [(clinic.academico.id, 2.0)]